@@ -0,0 +1,212 @@
+"""
+Benchmark suite for the recommender and local analytics.
+
+- Generates seeded power-law graphs of several sizes (social_graph.synthetic).
+- Runs every benchmark against the in-process InMemoryAsyncDriver, so results
+  measure this package's code paths, not network or database variance.
+- Measures cold import time of the package entry points in fresh
+  interpreters, so a heavy dependency creeping back into module import
+  shows up as a regression.
+- Records throughput, latency percentiles and peak traced memory per
+  benchmark into a JSON results file; pass --baseline to compare with a
+  previous run.
+- run with: uv run python scripts/benchmark.py --sizes 500,1000,2000
+"""
+
+import asyncio
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import typer
+from rich.console import Console
+from rich.table import Table
+
+from social_graph import analytics_local
+from social_graph.testing import InMemoryAsyncDriver
+from social_graph.metrics import LatencyRecorder
+from social_graph.recommender import Recommender
+from social_graph.synthetic import power_law_graph
+
+app = typer.Typer(add_completion=False)
+console = Console()
+
+# Entry points whose cold import time is tracked
+IMPORT_TARGETS = [
+    "social_graph",
+    "social_graph.service",
+    "social_graph.service_async",
+    "social_graph.recommender",
+    "social_graph.analytics_local",
+]
+
+_IMPORT_SNIPPET = """
+import time
+started = time.perf_counter()
+import {module}
+print(time.perf_counter() - started)
+"""
+
+async def measure(
+    name: str,
+    size: int,
+    num_edges: int,
+    op: Callable[[int], Awaitable[Any]],
+    repeat: int,
+) -> Dict[str, Any]:
+    """
+    Run `op(i)` `repeat` times for latency, then once more under tracemalloc
+    for peak memory (tracing is kept out of the timed loop).
+    """
+    latencies = LatencyRecorder()
+    started = time.perf_counter()
+    for i in range(repeat):
+        t0 = time.perf_counter()
+        await op(i)
+        latencies.record(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    await op(0)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "benchmark": name,
+        "users": size,
+        "friendships": num_edges,
+        "ops": repeat,
+        "throughput_per_s": round(repeat / elapsed, 3) if elapsed else 0.0,
+        "latency": latencies.summary(),
+        "peak_memory_mb": round(peak / 2**20, 3),
+    }
+
+def measure_import(module: str, repeat: int) -> Dict[str, Any]:
+    """Time `import module` in `repeat` fresh interpreters."""
+    latencies = LatencyRecorder()
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", _IMPORT_SNIPPET.format(module=module)],
+            capture_output=True, text=True, check=True,
+        )
+        latencies.record(float(out.stdout.strip()))
+    return {
+        "benchmark": f"import {module}",
+        "users": 0,
+        "friendships": 0,
+        "ops": repeat,
+        "throughput_per_s": 0.0,
+        "latency": latencies.summary(),
+        "peak_memory_mb": 0.0,
+    }
+
+async def run_size(
+    size: int,
+    edges_per_user: int,
+    supernodes: int,
+    seed: int,
+    requests: int,
+    analytics_repeat: int,
+    skip_communities: bool,
+) -> List[Dict[str, Any]]:
+    nodes, edges = power_law_graph(
+        size, edges_per_user=edges_per_user, num_supernodes=supernodes, seed=seed
+    )
+    driver = InMemoryAsyncDriver(nodes, edges)
+    recommender = Recommender(driver=driver)
+    targets = random.Random(seed).choices(nodes, k=requests)
+    m = len(edges)
+
+    results = [
+        await measure(
+            "recommend_top_k", size, m,
+            lambda i: recommender.recommend_top_k(targets[i], k=10), requests,
+        ),
+        await measure(
+            "fetch_snapshot", size, m,
+            lambda _: analytics_local.fetch_snapshot(driver), analytics_repeat,
+        ),
+        await measure(
+            "pagerank_local", size, m,
+            lambda _: analytics_local.pagerank_local(driver=driver), analytics_repeat,
+        ),
+    ]
+    if not skip_communities:
+        results.append(await measure(
+            "detect_communities_local", size, m,
+            lambda _: analytics_local.detect_communities_local(driver=driver), analytics_repeat,
+        ))
+    return results
+
+def print_results(results: List[Dict[str, Any]], baseline: Optional[Dict[tuple, Dict]]) -> None:
+    table = Table(title="Benchmark results")
+    for col in ("benchmark", "users", "ops/s", "p50 ms", "p95 ms", "p99 ms", "peak MB", "vs baseline p50"):
+        table.add_column(col, justify="right" if col != "benchmark" else "left")
+
+    for r in results:
+        lat = r["latency"]
+        delta = ""
+        if baseline is not None:
+            prev = baseline.get((r["benchmark"], r["users"]))
+            if prev and prev["latency"]["p50_ms"]:
+                ratio = lat["p50_ms"] / prev["latency"]["p50_ms"]
+                delta = f"{ratio:.2f}x"
+        table.add_row(
+            r["benchmark"], str(r["users"]), f'{r["throughput_per_s"]:.1f}',
+            f'{lat["p50_ms"]:.3f}', f'{lat["p95_ms"]:.3f}', f'{lat["p99_ms"]:.3f}',
+            f'{r["peak_memory_mb"]:.2f}', delta,
+        )
+    console.print(table)
+
+@app.command()
+def main(
+    sizes: str = typer.Option("500,1000,2000", help="Comma-separated graph sizes (users)."),
+    edges_per_user: int = typer.Option(5, help="Friendships per new user (BA parameter)."),
+    supernodes: int = typer.Option(2, help="Number of high-degree supernodes."),
+    seed: int = typer.Option(42, help="Random seed for graph and request sampling."),
+    requests: int = typer.Option(200, help="recommend_top_k calls per size."),
+    analytics_repeat: int = typer.Option(3, help="Runs per analytics benchmark."),
+    import_repeat: int = typer.Option(5, help="Fresh interpreters per import benchmark (0 to skip)."),
+    skip_communities: bool = typer.Option(False, help="Skip community detection (slow on big graphs)."),
+    output: Path = typer.Option(Path("bench_results.json"), help="Results file to write."),
+    baseline: Optional[Path] = typer.Option(None, help="Previous results file to compare against."),
+):
+    """Benchmark recommender and local analytics across synthetic graph sizes."""
+    results: List[Dict[str, Any]] = []
+    if import_repeat:
+        results += [measure_import(module, import_repeat) for module in IMPORT_TARGETS]
+    for size in (int(s) for s in sizes.split(",") if s.strip()):
+        console.print(f"[bold]Benchmarking {size} users...[/bold]")
+        results += asyncio.run(run_size(
+            size, edges_per_user, supernodes, seed, requests, analytics_repeat, skip_communities
+        ))
+
+    previous = None
+    if baseline is not None:
+        data = json.loads(baseline.read_text())
+        previous = {(r["benchmark"], r["users"]): r for r in data["results"]}
+    print_results(results, previous)
+
+    payload = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": seed,
+            "edges_per_user": edges_per_user,
+            "supernodes": supernodes,
+        },
+        "results": results,
+    }
+    output.write_text(json.dumps(payload, indent=2))
+    console.print(f"Results written to {output}")
+
+if __name__ == "__main__":
+    app()
@@ -47,7 +47,7 @@ async def demo_pagerank():
         print(f"  - {user}: {score}")
 
 async def demo_community_detection():
-    print("\nCommunity detection (mock grouping):")
+    print("\nCommunity detection (label propagation):")
     communities = await analytics.community_detection()
     for user, group in communities.items():
         print(f"  - {user}: {group}")
@@ -0,0 +1,190 @@
+"""
+Load-testing CLI for service_async and the Recommender.
+
+- Drives a configurable read/write mix (list_friends, recommend_top_k,
+  add_user, add_friendship) in closed-loop (--concurrency) or open-loop
+  (--rate) mode, with a live table of throughput, p50/p95/p99/p999 latency
+  and error rates.
+- --target memory (default) uses the in-process InMemoryAsyncDriver over a
+  synthetic power-law graph; --target neo4j uses the configured Aura
+  instance, reads from existing users and is read-only unless
+  --allow-writes is passed.
+- With --allow-writes against Neo4j, writes only touch `load_*` users:
+  add_user creates them and add_friendship links a pool of them created
+  up front. They are deleted (DETACH DELETE) after the run; if a run is
+  killed before that, clean up with
+  MATCH (u:User) WHERE u.username STARTS WITH 'load_' DETACH DELETE u
+- run with: uv run python scripts/load_test.py --duration 30 --rate 500
+"""
+
+import asyncio
+import json
+import random
+import uuid
+from pathlib import Path
+from typing import List, Optional
+
+import typer
+from rich.console import Console
+from rich.live import Live
+from rich.table import Table
+
+from social_graph import service_async
+from social_graph.analytics_local import list_usernames
+from social_graph.db_async import close_driver, get_driver, run_batched
+from social_graph.testing import InMemoryAsyncDriver
+from social_graph.loadgen import LoadResult, Operation, run_load
+from social_graph.models import Friendship, User
+from social_graph.recommender import Recommender
+from social_graph.synthetic import power_law_graph
+
+app = typer.Typer(add_completion=False)
+console = Console()
+
+LOAD_PREFIX = "load_"
+# load_* users created before a Neo4j write run for add_friendship to link
+LOAD_POOL_SIZE = 100
+
+DELETE_LOAD_USERS = """
+    MATCH (u:User)
+    WHERE u.username STARTS WITH $prefix AND ($after IS NULL OR u.username > $after)
+    WITH u ORDER BY u.username LIMIT $batch_size
+    WITH collect(u) AS batch, max(u.username) AS last
+    FOREACH (u IN batch | DETACH DELETE u)
+    RETURN size(batch) AS updated, last
+    """
+
+def load_username() -> str:
+    return f"{LOAD_PREFIX}{uuid.uuid4().hex[:12]}"
+
+async def create_load_users(driver, count: int) -> List[str]:
+    usernames = [load_username() for _ in range(count)]
+    for username in usernames:
+        await service_async.add_user(User(username), driver=driver)
+    return usernames
+
+async def delete_load_users(driver, batch_size: int = 1000) -> int:
+    """Delete every `load_*` user and its friendships; returns users deleted."""
+    rows = await run_batched(DELETE_LOAD_USERS, {"prefix": LOAD_PREFIX}, batch_size, driver)
+    return sum(row["updated"] for row in rows)
+
+def build_operations(
+    driver,
+    users: List[str],
+    read_ratio: float,
+    k: int,
+    friend_pool: Optional[List[str]] = None,
+) -> List[Operation]:
+    """
+    Split read_ratio evenly over read ops and the rest over write ops.
+
+    Reads sample `users`; add_friendship samples `friend_pool` (default
+    `users`).
+    """
+    recommender = Recommender(driver=driver)
+    pool = users if friend_pool is None else friend_pool
+    reads, writes = read_ratio / 2, (1 - read_ratio) / 2
+
+    async def list_friends(rng: random.Random):
+        return await service_async.list_friends(rng.choice(users), driver=driver)
+
+    async def recommend(rng: random.Random):
+        return await recommender.recommend_top_k(rng.choice(users), k=k)
+
+    async def add_user(rng: random.Random):
+        return await service_async.add_user(User(load_username()), driver=driver)
+
+    async def add_friendship(rng: random.Random):
+        a, b = rng.sample(pool, 2)
+        return await service_async.add_friendship(Friendship(a, b), driver=driver)
+
+    ops = [
+        Operation("list_friends", reads, list_friends),
+        Operation("recommend_top_k", reads, recommend),
+        Operation("add_user", writes, add_user),
+        Operation("add_friendship", writes, add_friendship),
+    ]
+    return [op for op in ops if op.weight > 0]
+
+def render(result: LoadResult) -> Table:
+    table = Table(title=f"{result.elapsed:.1f}s elapsed — {result.completed} ok, {result.shed} shed")
+    for col in ("operation", "ops/s", "p50 ms", "p95 ms", "p99 ms", "p999 ms", "errors"):
+        table.add_column(col, justify="left" if col == "operation" else "right")
+    for name, row in result.summary().items():
+        table.add_row(
+            name, f'{row["throughput_per_s"]:.1f}', f'{row["p50_ms"]:.2f}',
+            f'{row["p95_ms"]:.2f}', f'{row["p99_ms"]:.2f}', f'{row["p999_ms"]:.2f}',
+            f'{row["errors"]} ({row["error_rate"]:.2%})',
+        )
+    return table
+
+async def run(
+    target: str, users: int, latency_ms: float, read_ratio: float, k: int,
+    duration: float, concurrency: int, rate: Optional[float], seed: int,
+) -> LoadResult:
+    friend_pool: Optional[List[str]] = None
+    writes = target == "neo4j" and read_ratio < 1
+    if target == "memory":
+        nodes, edges = power_law_graph(users, seed=seed)
+        driver = InMemoryAsyncDriver(nodes, edges, latency=latency_ms / 1000)
+    elif target == "neo4j":
+        driver = get_driver()
+        nodes = await list_usernames(driver)
+        if len(nodes) < 2:
+            raise typer.BadParameter("target database needs at least two users")
+    else:
+        raise typer.BadParameter("target must be 'memory' or 'neo4j'")
+
+    try:
+        if writes:
+            friend_pool = await create_load_users(driver, LOAD_POOL_SIZE)
+        operations = build_operations(driver, nodes, read_ratio, k, friend_pool)
+        with Live(render(LoadResult()), console=console, refresh_per_second=4) as live:
+            return await run_load(
+                operations, duration, concurrency=concurrency, rate=rate, seed=seed,
+                on_progress=lambda r: live.update(render(r)),
+            )
+    finally:
+        if target == "neo4j":
+            try:
+                if writes:
+                    deleted = await delete_load_users(driver)
+                    console.print(f"Deleted {deleted} {LOAD_PREFIX}* users")
+            finally:
+                await close_driver()
+
+@app.command()
+def main(
+    target: str = typer.Option("memory", help="'memory' (in-process stand-in) or 'neo4j'."),
+    duration: float = typer.Option(10.0, help="Run time in seconds."),
+    concurrency: int = typer.Option(32, help="Workers (closed loop) or in-flight cap (open loop)."),
+    rate: Optional[float] = typer.Option(None, help="Open-loop arrival rate per second."),
+    read_ratio: float = typer.Option(0.9, min=0.0, max=1.0, help="Fraction of read operations."),
+    k: int = typer.Option(10, help="k for recommend_top_k."),
+    users: int = typer.Option(5000, help="Synthetic graph size for --target memory."),
+    latency_ms: float = typer.Option(1.0, help="Simulated round trip for --target memory."),
+    seed: int = typer.Option(42, help="Random seed."),
+    allow_writes: bool = typer.Option(
+        False, help="Allow writes against --target neo4j (load_* users, deleted afterwards)."
+    ),
+    output: Optional[Path] = typer.Option(None, help="Optional JSON file for the final summary."),
+):
+    """Drive service_async and Recommender with a read/write mix."""
+    if target == "neo4j" and read_ratio < 1 and not allow_writes:
+        console.print("[yellow]--target neo4j is read-only without --allow-writes; "
+                      "running reads only[/yellow]")
+        read_ratio = 1.0
+    result = asyncio.run(run(
+        target, users, latency_ms, read_ratio, k, duration, concurrency, rate, seed
+    ))
+    if output is not None:
+        output.write_text(json.dumps({
+            "target": target, "duration": duration, "concurrency": concurrency,
+            "rate": rate, "read_ratio": read_ratio, "allow_writes": allow_writes,
+            "shed": result.shed,
+            "operations": result.summary(),
+        }, indent=2))
+        console.print(f"Summary written to {output}")
+
+if __name__ == "__main__":
+    app()
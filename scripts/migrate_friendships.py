@@ -0,0 +1,46 @@
+"""
+Migrate friendships from two directed relationships to one.
+
+- Set FRIENDSHIP_STORAGE=single for the application first, so new
+  friendships are written once; then run this script.
+- Deletes the reverse FRIEND_WITH relationship of every pair stored in
+  both directions (see social_graph.migrations). Safe to rerun.
+- --dry-run only reports how many friendships would be collapsed.
+- run with: uv run python scripts/migrate_friendships.py --batch-size 1000
+"""
+
+import asyncio
+import time
+
+import typer
+from rich.console import Console
+
+from social_graph.db_async import close_driver, get_driver
+from social_graph.migrations import collapse_duplicate_friendships, count_duplicate_friendships
+
+app = typer.Typer(add_completion=False)
+console = Console()
+
+async def run(batch_size: int, dry_run: bool) -> int:
+    driver = get_driver()
+    try:
+        duplicates = await count_duplicate_friendships(driver=driver)
+        console.print(f"{duplicates} friendships stored in both directions")
+        if dry_run or duplicates == 0:
+            return 0
+        return await collapse_duplicate_friendships(batch_size=batch_size, driver=driver)
+    finally:
+        await close_driver()
+
+@app.command()
+def main(
+    batch_size: int = typer.Option(1000, help="Users visited per write query."),
+    dry_run: bool = typer.Option(False, help="Only count duplicate relationships."),
+):
+    """Collapse double FRIEND_WITH relationships into single ones."""
+    start = time.perf_counter()
+    removed = asyncio.run(run(batch_size, dry_run))
+    console.print(f"Deleted {removed} relationships in {time.perf_counter() - start:.1f}s")
+
+if __name__ == "__main__":
+    app()
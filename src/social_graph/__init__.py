@@ -1,5 +1,21 @@
 """Social Graph Backend Package."""
 __version__ = "0.1.0"
 
-# Optional: expose main classes/functions
-from .db import Neo4jDriver
+# Optional: expose main classes/functions.
+# Resolved on first access (PEP 562) so `import social_graph` does not pull
+# in the neo4j driver; submodules load their heavy dependencies on first use.
+_LAZY_ATTRS = {
+    "Neo4jDriver": ".db",
+    "AsyncNeo4jDriver": ".db_async",
+}
+
+__all__ = ["__version__", *_LAZY_ATTRS]
+
+def __getattr__(name: str):
+    if name in _LAZY_ATTRS:
+        import importlib
+
+        value = getattr(importlib.import_module(_LAZY_ATTRS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
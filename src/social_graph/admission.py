@@ -0,0 +1,217 @@
+"""
+Admission control: bounded concurrency and load shedding for queries.
+
+Without a limit, every coroutine that calls the driver opens a session and
+waits for a pooled connection; under overload the waiters pile up, latency
+grows without bound and every request times out together. An
+AdmissionController puts a gate in front of the driver instead:
+
+- Separate lanes for reads and writes, each running at most `max_reads` /
+  `max_writes` queries at once, so a burst of batch writes cannot starve
+  reads (or the other way round).
+- A bounded wait queue per lane. When it is full, a new query is rejected
+  at once with Overloaded (load shedding) instead of queueing forever.
+- Priorities. Waiters are served in priority order, then FIFO. When the
+  queue is full, an interactive query evicts the newest batch waiter
+  rather than being rejected itself.
+- A queue timeout: a query that waited `queue_timeout` seconds for a slot
+  is rejected with Overloaded too.
+
+The priority comes from a context variable: queries default to
+Priority.INTERACTIVE; wrap batch work in `with priority(Priority.BATCH):`
+or decorate it with @batch_priority (as the analytics, precompute and
+migration jobs are).
+
+stats() reports, per lane, running and queued queries, the queue-depth
+high-water mark, admissions, rejections (queue full, timed out, evicted)
+and queue-wait percentiles.
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from enum import IntEnum
+from functools import wraps
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+from .metrics import LatencyRecorder
+
+T = TypeVar("T")
+
+class Priority(IntEnum):
+    """Query priority; lower values are admitted first."""
+    INTERACTIVE = 0
+    BATCH = 1
+
+class Overloaded(RuntimeError):
+    """Raised when a query is shed instead of being run."""
+
+@dataclass(slots=True)
+class AdmissionPolicy:
+    """
+    Concurrency limits and queueing for an AdmissionController.
+
+    Attributes:
+        max_reads: read queries running at once.
+        max_writes: write queries (and write units of work) running at once.
+        max_queue: queries allowed to wait for a slot, per lane.
+        queue_timeout: seconds a query may wait for a slot (None = no limit).
+    """
+    max_reads: int = 64
+    max_writes: int = 16
+    max_queue: int = 256
+    queue_timeout: Optional[float] = 1.0
+
+_priority: ContextVar[Priority] = ContextVar(
+    "social_graph_query_priority", default=Priority.INTERACTIVE
+)
+
+@contextmanager
+def priority(level: Priority) -> Iterator[None]:
+    """Run the queries issued inside the block at priority `level`."""
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+def batch_priority(fn: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+    """Decorator: queries issued by the async function run at Priority.BATCH."""
+    @wraps(fn)
+    async def wrapper(*args, **kwargs):
+        with priority(Priority.BATCH):
+            return await fn(*args, **kwargs)
+    return wrapper
+
+class AdmissionController:
+    """
+    Gate queries through a read lane and a write lane.
+
+    Attributes:
+        policy: the AdmissionPolicy in effect.
+        reads: lane for read-only queries.
+        writes: lane for writes.
+    """
+
+    def __init__(self, policy: Optional[AdmissionPolicy] = None):
+        self.policy = policy or AdmissionPolicy()
+        self.reads = _Lane("read", self.policy.max_reads, self.policy)
+        self.writes = _Lane("write", self.policy.max_writes, self.policy)
+
+    @asynccontextmanager
+    async def slot(self, read_only: bool) -> AsyncIterator[None]:
+        """
+        Hold a slot in the read or write lane for the block.
+
+        Raises:
+            Overloaded: the lane's queue is full or the wait timed out.
+        """
+        lane = self.reads if read_only else self.writes
+        await lane.acquire(_priority.get())
+        try:
+            yield
+        finally:
+            lane.release()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return per-lane queue depth, rejection and wait metrics."""
+        return {"read": self.reads.stats(), "write": self.writes.stats()}
+
+class _Lane:
+    """One concurrency limit with its priority wait queue."""
+
+    def __init__(self, name: str, limit: int, policy: AdmissionPolicy):
+        self.name = name
+        self.limit = limit
+        self.max_queue = policy.max_queue
+        self.queue_timeout = policy.queue_timeout
+        self.active = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.evicted = 0
+        self.max_queued = 0
+        self.waits = LatencyRecorder(max_samples=1_000)
+        # (priority, arrival, future); arrival keeps FIFO order per priority
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._arrivals = itertools.count()
+
+    async def acquire(self, level: Priority) -> None:
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            self.admitted += 1
+            self.waits.record(0.0)
+            return
+        if len(self._waiters) >= self.max_queue:
+            self._shed(level)
+
+        entry = (int(level), next(self._arrivals), asyncio.get_running_loop().create_future())
+        heapq.heappush(self._waiters, entry)
+        self.max_queued = max(self.max_queued, len(self._waiters))
+        started = time.perf_counter()
+        try:
+            async with asyncio.timeout(self.queue_timeout):
+                await entry[2]
+        except TimeoutError:
+            self._abandon(entry)
+            self.timed_out += 1
+            raise Overloaded(
+                f"{self.name} query waited more than {self.queue_timeout}s for a slot"
+            ) from None
+        except asyncio.CancelledError:
+            self._abandon(entry)
+            raise
+        self.waits.record(time.perf_counter() - started)
+
+    def release(self) -> None:
+        # Hand the slot straight to the best waiter, if any
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                self.admitted += 1
+                return
+        self.active -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "active": self.active,
+            "queued": len(self._waiters),
+            "max_queued": self.max_queued,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "evicted": self.evicted,
+            "wait_p50_ms": round(self.waits.percentile(50) * 1000, 3),
+            "wait_p99_ms": round(self.waits.percentile(99) * 1000, 3),
+        }
+
+    def _shed(self, level: Priority) -> None:
+        """Make room in a full queue for a `level` query, or reject it."""
+        worst = max(self._waiters, default=None)
+        if worst is None or worst[0] <= level:
+            self.rejected += 1
+            raise Overloaded(f"{self.name} queue is full ({self.max_queue} waiting)")
+        self._remove(worst)
+        self.evicted += 1
+        worst[2].set_exception(
+            Overloaded(f"{self.name} query evicted by a higher-priority query")
+        )
+
+    def _abandon(self, entry: Tuple[int, int, asyncio.Future]) -> None:
+        """Clean up after a waiter that stopped waiting."""
+        future = entry[2]
+        if entry in self._waiters:
+            self._remove(entry)
+        elif future.done() and not future.cancelled() and future.exception() is None:
+            # Granted a slot just before giving up: pass it on
+            self.release()
+
+    def _remove(self, entry: Tuple[int, int, asyncio.Future]) -> None:
+        self._waiters.remove(entry)
+        heapq.heapify(self._waiters)
@@ -9,17 +9,28 @@ without requiring APOC, GDS, or external computation frameworks.
 Included Analytics
 ------------------
 - degree(username): returns the number of direct friendships for a user.
+- degrees(usernames): batched degree lookup in a single UNWIND round trip.
+- degree_distribution(): server-side histogram of {degree: user_count}.
+- refresh_degree_index(): materializes degrees as an indexed `degree` property.
+- degree_index_is_current(): whether the graph changed since the last refresh.
 - pagerank(top_n): computes an influence-style ranking based on connection counts.
-- detect_communities(): identifies simple community groupings using Cypher queries.
+- community_detection(): label propagation run inside Neo4j with plain Cypher.
 
 Notes
 -----
 This module focuses on small, dependency-free analytics suitable for
 demonstrating graph reasoning, async patterns, and Neo4j integration.
+Whole-graph analytics and batched writes run at batch priority under
+admission control (see admission.py); degree lookups stay interactive.
 """
 
-from typing import List, Tuple, Dict, Optional
-from .db_async import get_driver, AsyncNeo4jDriver
+from typing import Any, List, Tuple, Dict, Optional
+from .admission import batch_priority
+from .db_async import get_driver, run_batched, AsyncNeo4jDriver
+from .graph_version import VERSION_QUERY, format_version
+
+# Graph version the `degree` properties were computed at (set by refresh_degree_index)
+_INDEX_VERSION_QUERY = 'OPTIONAL MATCH (m:DegreeIndex {id: "degree"}) RETURN m.version AS version'
 
 async def degree(
         username: str, 
@@ -41,12 +52,136 @@ async def degree(
     """
     if driver is None:
         driver = get_driver()
-    result = await driver.run_query(query, {"username": username})
+    result = await driver.execute_read(query, {"username": username})
     return result[0]["degree"] if result else 0
 
+async def degrees(
+        usernames: List[str],
+        driver: Optional[AsyncNeo4jDriver] = None
+    ) -> Dict[str, int]:
+    """
+    Return the degree of many users in one round trip.
+
+    Args:
+        usernames: users to measure (unknown users map to 0).
+        driver: optional injected driver instance.
+
+    Returns:
+        Dict[username, degree]
+    """
+    unique = list(dict.fromkeys(usernames))
+    if not unique:
+        return {}
+    query = """
+    UNWIND $usernames AS username
+    OPTIONAL MATCH (:User {username: username})-[:FRIEND_WITH]-(f:User)
+    RETURN username, count(DISTINCT f) AS degree
+    """
+    if driver is None:
+        driver = get_driver()
+    result = await driver.execute_read(query, {"usernames": unique})
+    found = {row["username"]: row["degree"] for row in result}
+    return {username: found.get(username, 0) for username in unique}
+
+@batch_priority
+async def degree_distribution(
+        driver: Optional[AsyncNeo4jDriver] = None
+    ) -> Dict[int, int]:
+    """
+    Return the degree histogram, aggregated inside Neo4j.
+
+    Args:
+        driver: optional injected driver instance.
+
+    Returns:
+        Dict[degree, number_of_users], ordered by degree (includes degree 0).
+    """
+    query = """
+    MATCH (u:User)
+    OPTIONAL MATCH (u)-[:FRIEND_WITH]-(f:User)
+    WITH u, count(DISTINCT f) AS degree
+    RETURN degree, count(u) AS users
+    ORDER BY degree
+    """
+    if driver is None:
+        driver = get_driver()
+    result = await driver.execute_read(query, {})
+    return {row["degree"]: row["users"] for row in result}
+
+@batch_priority
+async def refresh_degree_index(
+        batch_size: int = 10_000,
+        driver: Optional[AsyncNeo4jDriver] = None
+    ) -> int:
+    """
+    Store every user's degree as an indexed `degree` property.
+
+    Users are updated in keyset-paginated batches (ordered by username),
+    so each write transaction stays small. pagerank(use_degree_index=True)
+    then reads the top N from the index instead of scanning FRIEND_WITH.
+
+    Writes do not maintain `degree`: the graph version (see
+    graph_version.py) read before the first batch is stored on a
+    (:DegreeIndex {id: "degree"}) node, and the index counts as current
+    only while the graph is still at that version. Rerun this after
+    writes to keep using the index.
+
+    Args:
+        batch_size: users updated per write query.
+        driver: optional injected driver instance.
+
+    Returns:
+        int: number of users updated.
+    """
+    index_query = "CREATE INDEX user_degree IF NOT EXISTS FOR (u:User) ON (u.degree)"
+    constraint_query = (
+        "CREATE CONSTRAINT degree_index_id IF NOT EXISTS "
+        "FOR (m:DegreeIndex) REQUIRE m.id IS UNIQUE"
+    )
+    marker_query = 'MERGE (m:DegreeIndex {id: "degree"}) SET m.version = $version'
+    batch_query = """
+    MATCH (u:User)
+    WHERE $after IS NULL OR u.username > $after
+    WITH u ORDER BY u.username LIMIT $batch_size
+    OPTIONAL MATCH (u)-[:FRIEND_WITH]-(f:User)
+    WITH u, count(DISTINCT f) AS degree
+    SET u.degree = degree
+    RETURN count(u) AS updated, max(u.username) AS last
+    """
+    if driver is None:
+        driver = get_driver()
+    await driver.execute_write(index_query, {})
+    await driver.execute_write(constraint_query, {})
+
+    # Read first: a write during the refresh leaves the index marked stale
+    version = await _graph_version(driver)
+    rows = await run_batched(batch_query, {}, batch_size, driver)
+    await driver.execute_write(marker_query, {"version": version})
+    return sum(row["updated"] for row in rows)
+
+async def degree_index_is_current(driver: Optional[AsyncNeo4jDriver] = None) -> bool:
+    """
+    Return True when the `degree` properties match the graph, i.e. no user
+    or friendship was added or removed since the last refresh_degree_index().
+
+    Args:
+        driver: optional injected driver instance.
+    """
+    if driver is None:
+        driver = get_driver()
+    rows = await driver.execute_read(_INDEX_VERSION_QUERY, {})
+    indexed = rows[0].get("version") if rows else None
+    return indexed is not None and indexed == await _graph_version(driver)
+
+async def _graph_version(driver: AsyncNeo4jDriver) -> str:
+    rows = await driver.execute_read(VERSION_QUERY, {})
+    return format_version(rows[0] if rows else {})
+
+@batch_priority
 async def pagerank(
         top_n: int = 10, 
-        driver: Optional[AsyncNeo4jDriver] = None
+        driver: Optional[AsyncNeo4jDriver] = None,
+        use_degree_index: bool = False
     ) -> List[Tuple[str, float]]:
     """
     Simulate influence ranking by counting user connections.
@@ -54,19 +189,34 @@ async def pagerank(
     Args:
         top_n: number of top users to return.
         driver: optional injected driver instance.
+        use_degree_index: read the `degree` property stored by
+            refresh_degree_index() instead of counting FRIEND_WITH edges.
+            When the graph changed since the refresh (or it never ran),
+            degrees are counted live instead of read from a stale index.
 
     Returns:
         List of (username, pseudo_score) tuples.
     """
-    query = """
-    MATCH (u:User)-[:FRIEND_WITH]-(f:User)
-    RETURN u.username AS username, count(DISTINCT f) AS degree
-    ORDER BY degree DESC, username
-    LIMIT $top_n
-    """
     if driver is None:
         driver = get_driver()
-    result = await driver.run_query(query, {"top_n": top_n})
+    if use_degree_index and not await degree_index_is_current(driver):
+        use_degree_index = False
+    if use_degree_index:
+        query = """
+        MATCH (u:User)
+        WHERE u.degree > 0
+        RETURN u.username AS username, u.degree AS degree
+        ORDER BY degree DESC, username
+        LIMIT $top_n
+        """
+    else:
+        query = """
+        MATCH (u:User)-[:FRIEND_WITH]-(f:User)
+        RETURN u.username AS username, count(DISTINCT f) AS degree
+        ORDER BY degree DESC, username
+        LIMIT $top_n
+        """
+    result = await driver.execute_read(query, {"top_n": top_n})
     if not result:
         return []
     max_deg = max(row["degree"] for row in result)
@@ -74,26 +224,81 @@ async def pagerank(
         (row["username"], round(row["degree"] / max_deg, 3)) for row in result
     ]
 
+@batch_priority
 async def community_detection(
-        driver: Optional[AsyncNeo4jDriver] = None
+        driver: Optional[AsyncNeo4jDriver] = None,
+        max_iterations: int = 20,
+        tolerance: float = 0.0,
+        batch_size: int = 5_000,
+        sample_rate: float = 1.0
     ) -> Dict[str, str]:
     """
-    Placeholder for community detection.
-    Assigns mock community groups deterministically by username hash.
+    Detect communities with label propagation executed inside Neo4j.
+
+    Every user starts with its own username as `community` label. Each sweep
+    visits users in keyset-paginated batches and sets the label to the one
+    most common among its friends (ties keep the current label, otherwise
+    the smallest label wins, so results are deterministic). Labels are
+    written as node properties, so the graph never leaves the database.
 
     Args:
         driver: optional injected driver instance.
+        max_iterations: cap on the number of sweeps.
+        tolerance: stop once the fraction of users that changed label in a
+            sweep is <= tolerance (0.0 = run until no label changes).
+        batch_size: users processed per write query.
+        sample_rate: fraction of users (0, 1] updated per sweep; values
+            below 1 trade accuracy for speed on very large graphs.
 
     Returns:
-        Dict[username, community_group]
+        Dict[username, community_label]
+    """
+    init_query = """
+    MATCH (u:User)
+    WHERE $after IS NULL OR u.username > $after
+    WITH u ORDER BY u.username LIMIT $batch_size
+    SET u.community = u.username
+    RETURN count(u) AS updated, max(u.username) AS last
+    """
+    sweep_query = """
+    MATCH (u:User)
+    WHERE $after IS NULL OR u.username > $after
+    WITH u ORDER BY u.username LIMIT $batch_size
+    WITH collect(u) AS batch
+    CALL (batch) {
+        UNWIND batch AS u
+        WITH u WHERE rand() < $sample_rate
+        MATCH (u)-[:FRIEND_WITH]-(v:User)
+        WITH u, v.community AS label, count(DISTINCT v) AS votes
+        ORDER BY votes DESC, label = u.community DESC, label
+        WITH u, collect(label)[0] AS best
+        WHERE best <> u.community
+        SET u.community = best
+        RETURN count(u) AS changed
+    }
+    RETURN size(batch) AS updated, batch[-1].username AS last, changed
+    """
+    result_query = """
+    MATCH (u:User)
+    RETURN u.username AS username, u.community AS community
     """
-    query = "MATCH (u:User) RETURN u.username AS username"
+    if not 0.0 < sample_rate <= 1.0:
+        raise ValueError("sample_rate must be in (0, 1]")
     if driver is None:
         driver = get_driver()
-    result = await driver.run_query(query, {})
-    communities: Dict[str, str] = {}
-    for record in result:
-        uid = record["username"]
-        # Simple alternating grouping for demonstration
-        communities[uid] = f"group_{hash(uid) % 2}"
-    return communities
+
+    rows = await run_batched(init_query, {}, batch_size, driver)
+    total_users = sum(row["updated"] for row in rows)
+    if total_users == 0:
+        return {}
+
+    for _ in range(max_iterations):
+        rows = await run_batched(
+            sweep_query, {"sample_rate": sample_rate}, batch_size, driver
+        )
+        changed = sum(row.get("changed", 0) for row in rows)
+        if changed / total_users <= tolerance:
+            break
+
+    result = await driver.execute_read(result_query, {})
+    return {record["username"]: record["community"] for record in result}
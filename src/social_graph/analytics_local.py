@@ -1,7 +1,19 @@
-import networkx as nx
-from typing import List, Tuple, Dict, Optional
+import asyncio
+import os
+import time
+from dataclasses import dataclass, field
+import numpy as np
+from typing import TYPE_CHECKING, Any, Callable, List, Tuple, Dict, Optional
 from typing import Set
-from .db_async import get_driver, AsyncNeo4jDriver
+from .config import single_edge_storage
+from .admission import batch_priority
+from .db_async import get_driver, AsyncNeo4jDriver, AsyncUnitOfWork
+from .graph_version import VERSION_QUERY, format_version
+from .snapshot import GraphSnapshot
+from .analytics_runner import AnalyticsRunner
+
+if TYPE_CHECKING:
+    import networkx as nx
 
 async def pagerank_local(
     top_n: int = 10,
@@ -9,6 +21,8 @@ async def pagerank_local(
     max_iter: int = 100,
     tol: float = 1e-06,
     driver: Optional[AsyncNeo4jDriver] = None,
+    runner: Optional[AnalyticsRunner] = None,
+    timeout: Optional[float] = None,
 ) -> List[Tuple[str, float]]:
     """
     Compute PageRank locally (NetworkX) as a fallback when GDS is unavailable.
@@ -16,14 +30,306 @@ async def pagerank_local(
     Notes:
         NetworkX implements the power-iteration algorithm — repeatedly updating
         PageRank scores until the change between iterations is below `tol`.
+        Pass a `runner` to compute in a worker process instead of on the
+        event loop; `timeout` then bounds the wait for the worker.
 
     Returns:
         List of (username, score) sorted by score desc, then username asc.
         Scores are rounded to 3 decimal places for presentation.
     """
+    if runner is not None:
+        snapshot = await fetch_snapshot(driver)
+        if snapshot.num_nodes == 0:
+            return []
+        return await runner.run(
+            _pagerank_task, snapshot, top_n, alpha, max_iter, tol, timeout=timeout
+        )
+
+    G = await _create_graph(driver)
+    if G.number_of_nodes() == 0:
+        return []
+    return _pagerank_top(G, top_n, alpha, max_iter, tol)
+
+async def detect_communities_local(
+    driver: Optional[AsyncNeo4jDriver] = None,
+    runner: Optional[AnalyticsRunner] = None,
+    timeout: Optional[float] = None,
+) -> List[Set[str]]:
+    """
+    Detect user communities using NetworkX greedy modularity algorithm.
+
+    Pass a `runner` to compute in a worker process instead of on the
+    event loop; `timeout` then bounds the wait for the worker.
+
+    Returns:
+        A list of communities, each community is a set of usernames.
+        Communities are sorted by descending size.
+    """
+    if runner is not None:
+        snapshot = await fetch_snapshot(driver)
+        if snapshot.num_nodes == 0:
+            return []
+        return await runner.run(_communities_task, snapshot, timeout=timeout)
+
     G = await _create_graph(driver)
     if G.number_of_nodes() == 0:
         return []
+    return _communities_sorted(G)
+
+@dataclass(slots=True)
+class AnalyticsReport:
+    """
+    Combined output of analytics_report().
+
+    Attributes:
+        num_users / num_friendships: snapshot size.
+        degree_distribution: {degree: number of users with that degree}.
+        pagerank: top-N (username, score), same ordering as pagerank_local().
+        communities: greedy modularity communities, largest first.
+        community_sizes: len() of each community, same order.
+        modularity: modularity of the community partition.
+        num_components / largest_component: connected component stats.
+        timings: wall-clock seconds per stage ("graph" is building the
+            NetworkX graph PageRank and communities share), plus "total".
+    """
+    num_users: int = 0
+    num_friendships: int = 0
+    degree_distribution: Dict[int, int] = field(default_factory=dict)
+    pagerank: List[Tuple[str, float]] = field(default_factory=list)
+    communities: List[Set[str]] = field(default_factory=list)
+    community_sizes: List[int] = field(default_factory=list)
+    modularity: float = 0.0
+    num_components: int = 0
+    largest_component: int = 0
+    timings: Dict[str, float] = field(default_factory=dict)
+
+async def analytics_report(
+    top_n: int = 10,
+    alpha: float = 0.85,
+    max_iter: int = 100,
+    tol: float = 1e-06,
+    snapshot: Optional[GraphSnapshot] = None,
+    driver: Optional[AsyncNeo4jDriver] = None,
+    runner: Optional[AnalyticsRunner] = None,
+    timeout: Optional[float] = None,
+) -> AnalyticsReport:
+    """
+    Compute degree distribution, PageRank, communities and components
+    from a single graph snapshot.
+
+    The snapshot is fetched once (unless passed in) and the NetworkX graph
+    PageRank and community detection need is built once and shared by
+    both. With a `runner` the degree, graph and component stages run in
+    parallel worker processes (attached to one shared-memory copy of the
+    snapshot); without one they run one after another in a single worker
+    thread, which keeps the event loop free but adds no parallelism.
+
+    Returns:
+        AnalyticsReport with per-stage timings in seconds.
+    """
+    started = time.perf_counter()
+    timings: Dict[str, float] = {}
+
+    if snapshot is None:
+        snapshot = await fetch_snapshot(driver)
+        timings["snapshot"] = time.perf_counter() - started
+
+    report = AnalyticsReport(
+        num_users=snapshot.num_nodes,
+        num_friendships=snapshot.num_edges,
+        timings=timings,
+    )
+    if snapshot.num_nodes == 0:
+        timings["total"] = time.perf_counter() - started
+        return report
+
+    stages: List[Tuple[Callable[..., Tuple[Any, float]], Tuple[Any, ...]]] = [
+        (_degree_stage, ()),
+        (_graph_stage, (top_n, alpha, max_iter, tol)),
+        (_component_stage, ()),
+    ]
+    if runner is not None:
+        # One shared-memory export serves every stage; it is unlinked only
+        # after all of them have finished or been cancelled
+        with runner.shared(snapshot) as shared:
+            jobs = [
+                asyncio.ensure_future(runner.run(fn, shared, *args, timeout=timeout))
+                for fn, args in stages
+            ]
+            try:
+                results = await asyncio.gather(*jobs)
+            except BaseException:
+                for job in jobs:
+                    job.cancel()
+                await asyncio.gather(*jobs, return_exceptions=True)
+                raise
+    else:
+        results = await asyncio.to_thread(_run_stages, stages, snapshot)
+    degrees, ((pagerank, communities), timings["graph"]), components = results
+
+    report.degree_distribution, timings["degrees"] = degrees
+    report.pagerank, timings["pagerank"] = pagerank
+    (report.communities, report.modularity), timings["communities"] = communities
+    (report.num_components, report.largest_component), timings["components"] = components
+    report.community_sizes = [len(c) for c in report.communities]
+
+    timings["total"] = time.perf_counter() - started
+    return report
+
+@dataclass(slots=True)
+class ClusteringReport:
+    """
+    Output of clustering_local().
+
+    Attributes:
+        top_triangles: top-N (username, triangles), count desc then username.
+        top_clustering: top-N (username, coefficient) among users with at
+            least `min_degree` friends, coefficient desc then username.
+        triangle_distribution: {triangles: number of users}.
+        clustering_distribution: {bin lower edge: number of users} over
+            equal-width bins on [0, 1].
+        total_triangles: triangles in the whole graph.
+        average_clustering: mean local clustering coefficient (all users).
+        transitivity: 3 * triangles / connected triples.
+        approximate: True when estimated by wedge sampling.
+    """
+    top_triangles: List[Tuple[str, int]] = field(default_factory=list)
+    top_clustering: List[Tuple[str, float]] = field(default_factory=list)
+    triangle_distribution: Dict[int, int] = field(default_factory=dict)
+    clustering_distribution: Dict[float, int] = field(default_factory=dict)
+    total_triangles: int = 0
+    average_clustering: float = 0.0
+    transitivity: float = 0.0
+    approximate: bool = False
+
+async def clustering_local(
+    top_n: int = 10,
+    min_degree: int = 2,
+    bins: int = 10,
+    wedge_samples: Optional[int] = None,
+    seed: int = 0,
+    snapshot: Optional[GraphSnapshot] = None,
+    driver: Optional[AsyncNeo4jDriver] = None,
+    runner: Optional[AnalyticsRunner] = None,
+    timeout: Optional[float] = None,
+) -> ClusteringReport:
+    """
+    Compute per-user triangle counts and clustering coefficients.
+
+    Exact counts come from the sparse product (A @ A) masked by the upper
+    triangle of A, evaluated in row blocks. With `wedge_samples` set, each
+    user's coefficient is instead estimated from that many random pairs of
+    their friends (wedge sampling), which bounds the work on huge graphs.
+
+    Args:
+        top_n: size of the top triangle / clustering lists.
+        min_degree: users with fewer friends are left out of top_clustering
+            (a degree-2 user with one triangle would otherwise score 1.0).
+        bins: number of clustering distribution bins.
+        wedge_samples: sampled wedges per user; None for exact counts.
+        seed: random seed for wedge sampling.
+        snapshot: optional pre-fetched snapshot.
+        driver: optional injected driver instance.
+        runner: optional AnalyticsRunner to compute in a worker process;
+            without one the computation runs in a worker thread, off the
+            event loop.
+        timeout: bound on the wait for the worker.
+
+    Returns:
+        ClusteringReport (triangle counts are rounded estimates when approximate).
+    """
+    if snapshot is None:
+        snapshot = await fetch_snapshot(driver)
+    if snapshot.num_nodes == 0:
+        return ClusteringReport(approximate=wedge_samples is not None)
+    args = (top_n, min_degree, bins, wedge_samples, seed)
+    if runner is not None:
+        return await runner.run(_clustering_task, snapshot, *args, timeout=timeout)
+    return await asyncio.to_thread(_clustering_task, snapshot, *args)
+
+async def fetch_snapshot(
+    driver: Optional[AsyncNeo4jDriver] = None,
+) -> GraphSnapshot:
+    """
+    Fetch the user graph from the database as a CSR GraphSnapshot.
+    """
+    nodes, edges = await _fetch_graph_snapshot(driver)
+    return GraphSnapshot.from_edges(nodes, edges)
+
+async def list_usernames(
+    driver: Optional[AsyncNeo4jDriver] = None,
+) -> List[str]:
+    """
+    Return the usernames of all users (isolated users included).
+    """
+    if driver is None:
+        driver = get_driver()
+    async with driver.unit_of_work(read_only=True) as uow:
+        return await _fetch_user_nodes(uow)
+
+async def fetch_snapshot_version(
+    driver: Optional[AsyncNeo4jDriver] = None,
+) -> str:
+    """
+    Return a version string that changes whenever the graph changes.
+
+    Notes:
+        Built from the User and FRIEND_WITH counts (answered from Neo4j's
+        count store) and the newest `created_at` stamp the service writes
+        set on new users and friendships (see graph_version.py), so adds,
+        deletes and a delete plus an add all change it. Run
+        migrations.create_version_indexes() once so the stamps are read
+        from an index. Property-only updates do not change it.
+    """
+    if driver is None:
+        driver = get_driver()
+    result = await driver.execute_read(VERSION_QUERY, {})
+    return format_version(result[0] if result else {})
+
+async def load_snapshot(
+    path: str,
+    driver: Optional[AsyncNeo4jDriver] = None,
+) -> GraphSnapshot:
+    """
+    Open the memory-mapped snapshot at `path`, refreshing it when stale.
+
+    The stored version is compared with fetch_snapshot_version(); when the
+    file is missing, unreadable or out of date, the graph is fetched from
+    the database and the file is rewritten atomically.
+
+    Returns:
+        A file-backed GraphSnapshot (pass it to AnalyticsRunner so workers
+        map the same file instead of receiving a copy).
+    """
+    if driver is None:
+        driver = get_driver()
+    # Read the version before the graph, so writes racing with the fetch
+    # leave the file looking stale rather than current.
+    current = await fetch_snapshot_version(driver)
+
+    if os.path.exists(path):
+        try:
+            snapshot = GraphSnapshot.open(path)
+        except ValueError:
+            snapshot = None
+        if snapshot is not None and snapshot.version == current:
+            return snapshot
+
+    nodes, edges = await _fetch_graph_snapshot(driver)
+    GraphSnapshot.from_edges(nodes, edges, version=current).save(path)
+    return GraphSnapshot.open(path)
+
+def _pagerank_top(
+    G: "nx.Graph",
+    top_n: int,
+    alpha: float,
+    max_iter: int,
+    tol: float,
+) -> List[Tuple[str, float]]:
+    """
+    Run NetworkX PageRank and return the rounded top-N (username, score) list.
+    """
+    import networkx as nx
 
     # Compute PageRank (no fallback; bubble up errors if any)
     pr: Dict[str, float] = nx.pagerank(
@@ -39,19 +345,11 @@ async def pagerank_local(
     top = sorted_items[:top_n]
     return [(user, round(score, 3)) for user, score in top]
 
-async def detect_communities_local(
-    driver: Optional[AsyncNeo4jDriver] = None,
-) -> List[Set[str]]:
+def _communities_sorted(G: "nx.Graph") -> List[Set[str]]:
     """
-    Detect user communities using NetworkX greedy modularity algorithm.
-
-    Returns:
-        A list of communities, each community is a set of usernames.
-        Communities are sorted by descending size.
+    Run greedy modularity community detection, largest community first.
     """
-    G = await _create_graph(driver)
-    if G.number_of_nodes() == 0:
-        return []
+    import networkx as nx
 
     communities = nx.algorithms.community.greedy_modularity_communities(G)
     communities_sorted = sorted(communities, key=lambda c: -len(c))
@@ -59,7 +357,183 @@ async def detect_communities_local(
     # Convert frozensets -> plain sets for easier JSON debugging
     return [set(c) for c in communities_sorted]
 
-def print_adjacency_list(G: nx.Graph) -> None:
+def _triangle_counts(snapshot: GraphSnapshot, block_rows: int = 4096) -> np.ndarray:
+    """
+    Exact triangles per node.
+
+    For each edge i < j, (A @ A)[i, j] counts common neighbours, i.e. the
+    triangles on that edge. Masking the product with the upper triangle keeps
+    each edge once; a node's triangles are half the support of its edges.
+    Rows are processed in blocks so the unmasked product stays small.
+    """
+    from scipy.sparse import triu
+
+    A = snapshot.adjacency_matrix()
+    n = snapshot.num_nodes
+    support = np.zeros(n, dtype=np.float64)
+    for start in range(0, n, block_rows):
+        block = A[start:start + block_rows]
+        upper = triu(block, k=start + 1, format="csr")
+        if upper.nnz == 0:
+            continue
+        masked = (block @ A).multiply(upper).tocoo()
+        np.add.at(support, masked.row + start, masked.data)
+        np.add.at(support, masked.col, masked.data)
+    return np.rint(support / 2).astype(np.int64)
+
+def _sampled_clustering(
+    snapshot: GraphSnapshot,
+    samples: int,
+    seed: int,
+) -> np.ndarray:
+    """
+    Estimate each node's clustering coefficient from `samples` random wedges.
+
+    A wedge (u, v) is a pair of distinct neighbours of a node; it is closed
+    when u-v is an edge. Edge membership is a binary search over the sorted
+    CSR keys row * n + col.
+    """
+    n = snapshot.num_nodes
+    indptr, indices = snapshot.indptr, snapshot.indices
+    degrees = snapshot.degrees()
+    keys = np.repeat(np.arange(n, dtype=np.int64), degrees) * n + indices
+    rng = np.random.default_rng(seed)
+
+    coefficients = np.zeros(n, dtype=np.float64)
+    nodes = np.flatnonzero(degrees >= 2)
+    # Chunk so the sampled arrays stay around a few million entries
+    chunk = max(1, 4_000_000 // max(samples, 1))
+    for start in range(0, len(nodes), chunk):
+        part = nodes[start:start + chunk]
+        deg = np.repeat(degrees[part], samples)
+        first = (rng.random(len(deg)) * deg).astype(np.int64)
+        second = (rng.random(len(deg)) * (deg - 1)).astype(np.int64)
+        second += second >= first
+        base = np.repeat(indptr[part], samples)
+        u = indices[base + first].astype(np.int64)
+        v = indices[base + second].astype(np.int64)
+        wanted = u * n + v
+        pos = np.minimum(np.searchsorted(keys, wanted), len(keys) - 1)
+        closed = (keys[pos] == wanted).reshape(len(part), samples)
+        coefficients[part] = closed.mean(axis=1)
+    return coefficients
+
+def _clustering_task(
+    snapshot: GraphSnapshot,
+    top_n: int,
+    min_degree: int,
+    bins: int,
+    wedge_samples: Optional[int],
+    seed: int,
+) -> ClusteringReport:
+    degrees = snapshot.degrees()
+    wedges = degrees * (degrees - 1) / 2
+    if wedge_samples is None:
+        triangles = _triangle_counts(snapshot)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            coefficients = np.where(wedges > 0, triangles / wedges, 0.0)
+    else:
+        coefficients = _sampled_clustering(snapshot, wedge_samples, seed)
+        triangles = np.rint(coefficients * wedges).astype(np.int64)
+
+    names = snapshot.usernames
+    # Ids follow username order, so a stable sort on the negated value
+    # yields value desc, then username asc
+    by_triangles = np.argsort(-triangles, kind="stable")[:top_n]
+    eligible = np.flatnonzero(degrees >= min_degree)
+    by_clustering = eligible[np.argsort(-coefficients[eligible], kind="stable")][:top_n]
+
+    counts = np.bincount(triangles)
+    histogram, edges = np.histogram(coefficients, bins=bins, range=(0.0, 1.0))
+    total_wedges = wedges.sum()
+    return ClusteringReport(
+        top_triangles=[(names[i], int(triangles[i])) for i in by_triangles if triangles[i] > 0],
+        top_clustering=[(names[i], round(float(coefficients[i]), 4)) for i in by_clustering],
+        triangle_distribution={int(t): int(c) for t, c in enumerate(counts) if c},
+        clustering_distribution={
+            round(float(lo), 4): int(c) for lo, c in zip(edges[:-1], histogram)
+        },
+        total_triangles=int(round(triangles.sum() / 3)),
+        average_clustering=round(float(coefficients.mean()), 4),
+        transitivity=round(float(triangles.sum() / total_wedges), 4) if total_wedges else 0.0,
+        approximate=wedge_samples is not None,
+    )
+
+# Worker-process entry points for AnalyticsRunner (must be module-level).
+
+def _pagerank_task(
+    snapshot: GraphSnapshot,
+    top_n: int,
+    alpha: float,
+    max_iter: int,
+    tol: float,
+) -> List[Tuple[str, float]]:
+    return _pagerank_top(snapshot.to_networkx(), top_n, alpha, max_iter, tol)
+
+def _communities_task(snapshot: GraphSnapshot) -> List[Set[str]]:
+    return _communities_sorted(snapshot.to_networkx())
+
+# analytics_report() stages: each returns (result, elapsed_seconds).
+
+def _degree_stage(snapshot: GraphSnapshot) -> Tuple[Dict[int, int], float]:
+    started = time.perf_counter()
+    counts = np.bincount(snapshot.degrees())
+    distribution = {int(d): int(c) for d, c in enumerate(counts) if c}
+    return distribution, time.perf_counter() - started
+
+def _pagerank_stage(
+    G: "nx.Graph",
+    top_n: int,
+    alpha: float,
+    max_iter: int,
+    tol: float,
+) -> Tuple[List[Tuple[str, float]], float]:
+    started = time.perf_counter()
+    top = _pagerank_top(G, top_n, alpha, max_iter, tol)
+    return top, time.perf_counter() - started
+
+def _community_stage(G: "nx.Graph") -> Tuple[Tuple[List[Set[str]], float], float]:
+    import networkx as nx
+
+    started = time.perf_counter()
+    communities = _communities_sorted(G)
+    modularity = nx.algorithms.community.modularity(G, communities) if G.number_of_edges() else 0.0
+    return (communities, round(modularity, 4)), time.perf_counter() - started
+
+def _graph_stage(
+    snapshot: GraphSnapshot,
+    top_n: int,
+    alpha: float,
+    max_iter: int,
+    tol: float,
+) -> Tuple[Tuple[Tuple[Any, float], Tuple[Any, float]], float]:
+    """
+    PageRank and community stages over one NetworkX graph.
+
+    Returns:
+        ((pagerank_stage, community_stage), seconds spent building the graph).
+    """
+    started = time.perf_counter()
+    G = snapshot.to_networkx()
+    built = time.perf_counter() - started
+    return (_pagerank_stage(G, top_n, alpha, max_iter, tol), _community_stage(G)), built
+
+def _component_stage(snapshot: GraphSnapshot) -> Tuple[Tuple[int, int], float]:
+    from scipy.sparse.csgraph import connected_components
+
+    started = time.perf_counter()
+    count, labels = connected_components(snapshot.adjacency_matrix(), directed=False)
+    largest = int(np.bincount(labels).max()) if count else 0
+    return (int(count), largest), time.perf_counter() - started
+
+def _run_stages(
+    stages: List[Tuple[Callable[..., Tuple[Any, float]], Tuple[Any, ...]]],
+    snapshot: GraphSnapshot,
+) -> List[Tuple[Any, float]]:
+    """Run analytics_report() stages one after another (no runner)."""
+    return [fn(snapshot, *args) for fn, args in stages]
+
+def print_adjacency_list(G: "nx.Graph") -> None:
     """
     Print an adjacency-list representation of the graph.
     Output is sorted for deterministic CLI/debugging display.
@@ -75,10 +549,12 @@ def print_adjacency_list(G: nx.Graph) -> None:
 
 async def _create_graph(
     driver: Optional[AsyncNeo4jDriver] = None,
-) -> nx.Graph:
+) -> "nx.Graph":
     """
     Create a NetworkX graph from the user graph in the database.
     """
+    import networkx as nx
+
     nodes, edges = await _fetch_graph_snapshot(driver)
 
     G = nx.Graph()
@@ -89,6 +565,7 @@ async def _create_graph(
 
     return G
 
+@batch_priority
 async def _fetch_graph_snapshot(
     driver: Optional[AsyncNeo4jDriver] = None,
 ) -> Tuple[List[str], List[Tuple[str, str]]]:
@@ -100,24 +577,22 @@ async def _fetch_graph_snapshot(
     if driver is None:
         driver = get_driver()
 
-    nodes = await _fetch_user_nodes(driver)
-    edges = await _fetch_friend_edges(driver)
+    # One read transaction, so nodes and edges come from the same state
+    async with driver.unit_of_work(read_only=True) as uow:
+        nodes = await _fetch_user_nodes(uow)
+        edges = await _fetch_friend_edges(uow)
 
     return nodes, edges
 
-async def _fetch_user_nodes(
-    driver: AsyncNeo4jDriver,
-) -> List[str]:
+async def _fetch_user_nodes(uow: AsyncUnitOfWork) -> List[str]:
     """
     Fetch all user nodes from the database.
     """
     node_query = "MATCH (u:User) RETURN u.username AS username"
-    node_rows = await driver.run_query(node_query, {})
+    node_rows = await uow.run(node_query, {})
     return [r["username"] for r in node_rows] if node_rows else []
 
-async def _fetch_friend_edges(
-    driver: AsyncNeo4jDriver,
-) -> List[Tuple[str, str]]:
+async def _fetch_friend_edges(uow: AsyncUnitOfWork) -> List[Tuple[str, str]]:
     """
     Fetch all friendship edges from the database.
     """
@@ -127,7 +602,15 @@ async def _fetch_friend_edges(
     WHERE u.username < v.username
     RETURN u.username AS src, v.username AS dst
     """
-    edge_rows = await driver.run_query(edge_query, {})
+    if single_edge_storage():
+        # Each relationship once, in whichever direction it was stored
+        edge_query = """
+    MATCH (u:User)-[:FRIEND_WITH]->(v:User)
+    RETURN DISTINCT
+           CASE WHEN u.username < v.username THEN u.username ELSE v.username END AS src,
+           CASE WHEN u.username < v.username THEN v.username ELSE u.username END AS dst
+    """
+    edge_rows = await uow.run(edge_query, {})
     edges: List[Tuple[str, str]] = []
     if edge_rows:
         for r in edge_rows:
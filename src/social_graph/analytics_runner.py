@@ -0,0 +1,242 @@
+"""
+Process-pool runner for CPU-bound local analytics.
+
+Overview
+--------
+NetworkX algorithms hold the GIL for their whole run, so calling them from
+an `async def` blocks every other coroutine on the event loop. The
+AnalyticsRunner ships a GraphSnapshot to a process pool and awaits the
+result instead.
+
+The snapshot arrays (CSR + username table) are copied once into shared
+memory blocks; workers attach to those blocks by name, so only a small
+handle is pickled per job. Blocks are unlinked as soon as the job finishes
+or is cancelled. To run several jobs on one snapshot, export it once with
+`runner.shared(snapshot)` and pass the handle to each run(). Snapshots
+opened from disk (GraphSnapshot.open) skip the copy: workers memory-map
+the same file.
+
+Usage
+-----
+    async with AnalyticsRunner(max_workers=4) as runner:
+        top = await pagerank_local(top_n=10, runner=runner, timeout=30)
+
+        with runner.shared(snapshot) as shared:
+            a, b = await asyncio.gather(runner.run(f, shared), runner.run(g, shared))
+
+Notes
+-----
+Jobs still waiting for a worker are dropped on cancellation or timeout.
+A job that is already running cannot be interrupted by ProcessPoolExecutor;
+its result is discarded and the worker becomes free once it finishes.
+"""
+
+import asyncio
+import multiprocessing
+import sys
+from contextlib import contextmanager
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Any, Callable, Iterator, List, Optional, Set, Tuple, Union
+
+import numpy as np
+
+from .snapshot import GraphSnapshot, UsernameTable
+
+@dataclass(frozen=True, slots=True)
+class _SharedArray:
+    """Name, dtype and shape of one array stored in shared memory."""
+    name: str
+    dtype: str
+    shape: Tuple[int, ...]
+
+@dataclass(frozen=True, slots=True)
+class SharedSnapshot:
+    """Picklable reference to a snapshot exported to shared memory (see AnalyticsRunner.shared)."""
+    indptr: _SharedArray
+    indices: _SharedArray
+    name_offsets: _SharedArray
+    name_blob: _SharedArray
+    version: Optional[str]
+
+class AnalyticsRunner:
+    """
+    Run snapshot-based analytics jobs in a process pool.
+
+    Attributes:
+        max_workers: number of worker processes (None = CPU count).
+        start_method: multiprocessing start method for the workers.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        start_method: str = "spawn",
+    ):
+        self.max_workers = max_workers
+        self.start_method = start_method
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending: Set[Future] = set()
+
+    async def run(
+        self,
+        func: Callable[..., Any],
+        snapshot: Union[GraphSnapshot, SharedSnapshot],
+        *args: Any,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """
+        Run `func(snapshot, *args)` in a worker process and await the result.
+
+        Args:
+            func: module-level (picklable) function taking the snapshot first.
+            snapshot: graph snapshot to share with the worker, or a handle
+                from shared() (nothing is copied per job then).
+            args: extra positional arguments for `func`.
+            timeout: optional seconds to wait before cancelling the job.
+
+        Raises:
+            TimeoutError: if the job does not finish within `timeout`.
+        """
+        if isinstance(snapshot, SharedSnapshot):
+            future = self._get_executor().submit(_run_job, func, snapshot, args)
+        elif snapshot.path is not None:
+            # File-backed snapshots are memory-mapped by each worker,
+            # sharing the OS page cache instead of copying arrays.
+            future = self._get_executor().submit(_run_job_from_file, func, snapshot.path, args)
+        else:
+            blocks, handle = _export_snapshot(snapshot)
+            try:
+                future = self._get_executor().submit(_run_job, func, handle, args)
+            except BaseException:
+                _release_blocks(blocks)
+                raise
+            future.add_done_callback(lambda _: _release_blocks(blocks))
+
+        self._pending.add(future)
+        future.add_done_callback(self._pending.discard)
+
+        # Cancelling the wrapped future (timeout or caller cancellation)
+        # cancels the underlying job if it has not started yet.
+        return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+
+    @contextmanager
+    def shared(self, snapshot: GraphSnapshot) -> Iterator[Union[GraphSnapshot, SharedSnapshot]]:
+        """
+        Export `snapshot` to shared memory once for several run() calls.
+
+        Pass the yielded value to run() in place of the snapshot. The blocks
+        are unlinked when the block exits, so finish or cancel its jobs
+        first. File-backed snapshots need no copy and are yielded unchanged.
+        """
+        if snapshot.path is not None:
+            yield snapshot
+            return
+        blocks, handle = _export_snapshot(snapshot)
+        try:
+            yield handle
+        finally:
+            _release_blocks(blocks)
+
+    def cancel_pending(self) -> int:
+        """Cancel all jobs that have not started yet; return how many were cancelled."""
+        return sum(1 for future in list(self._pending) if future.cancel())
+
+    def close(self, cancel_pending: bool = True) -> None:
+        """Shut down the worker pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=cancel_pending)
+            self._executor = None
+
+    async def __aenter__(self) -> "AnalyticsRunner":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.close()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context(self.start_method),
+            )
+        return self._executor
+
+# -------------------------------
+# Shared memory helpers
+# -------------------------------
+
+def _export_snapshot(
+    snapshot: GraphSnapshot,
+) -> Tuple[List[shared_memory.SharedMemory], SharedSnapshot]:
+    """Copy snapshot arrays into new shared memory blocks."""
+    names = snapshot.usernames
+    if not isinstance(names, UsernameTable):
+        names = UsernameTable.from_names(names)
+
+    blocks: List[shared_memory.SharedMemory] = []
+    specs: List[_SharedArray] = []
+    try:
+        for arr in (snapshot.indptr, snapshot.indices, names.offsets, names.blob):
+            arr = np.ascontiguousarray(arr)
+            # Zero-sized blocks are not allowed
+            shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+            blocks.append(shm)
+            view = np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)
+            view[...] = arr
+            del view
+            specs.append(_SharedArray(shm.name, arr.dtype.str, arr.shape))
+    except BaseException:
+        _release_blocks(blocks)
+        raise
+
+    return blocks, SharedSnapshot(*specs, version=snapshot.version)
+
+def _release_blocks(blocks: List[shared_memory.SharedMemory]) -> None:
+    """Close and unlink shared memory blocks owned by the parent process."""
+    for shm in blocks:
+        shm.close()
+        shm.unlink()
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Attach to an existing block without registering it for cleanup."""
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    return shared_memory.SharedMemory(name=name)
+
+def _run_job(
+    func: Callable[..., Any],
+    handle: SharedSnapshot,
+    args: Tuple[Any, ...],
+) -> Any:
+    """Worker entry point: attach to the snapshot and run the job."""
+    blocks: List[shared_memory.SharedMemory] = []
+    try:
+        arrays = []
+        for spec in (handle.indptr, handle.indices, handle.name_offsets, handle.name_blob):
+            shm = _attach(spec.name)
+            blocks.append(shm)
+            arrays.append(np.ndarray(spec.shape, dtype=np.dtype(spec.dtype), buffer=shm.buf))
+
+        indptr, indices, offsets, blob = arrays
+        snapshot = GraphSnapshot(UsernameTable(offsets, blob), indptr, indices, handle.version)
+        del arrays, indptr, indices, offsets, blob
+        return func(snapshot, *args)
+    finally:
+        snapshot = None
+        for shm in blocks:
+            try:
+                shm.close()
+            except BufferError:
+                # A traceback still references a view; the mapping is
+                # released when the worker drops it.
+                pass
+
+def _run_job_from_file(
+    func: Callable[..., Any],
+    path: str,
+    args: Tuple[Any, ...],
+) -> Any:
+    """Worker entry point for file-backed snapshots."""
+    return func(GraphSnapshot.open(path), *args)
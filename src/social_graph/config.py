@@ -1,14 +1,56 @@
-"""Configuration loader for Neo4j credentials."""
+"""
+Configuration loader for Neo4j credentials.
+
+Settings are read from the environment (and a .env file) on first access
+of a setting, not at import, so importing the package stays cheap.
+"""
 import os
-from dotenv import load_dotenv
 
-load_dotenv()
+# Setting name -> default when unset.
+#
+# FRIENDSHIP_STORAGE controls how friendships are stored:
+#   "double" - two directed FRIEND_WITH relationships per friendship (default)
+#   "single" - one relationship per friendship, from the lower to the higher
+#              username; run migrations.collapse_duplicate_friendships() after
+#              switching to remove the redundant reverse relationships
+#
+# HEDGED_READS ("true"/"false") enables hedged read-only queries on the
+# shared async driver (see hedging.py).
+#
+# ADMISSION_CONTROL ("true"/"false") puts the shared async driver behind an
+# AdmissionController with the default AdmissionPolicy (see admission.py).
+_SETTINGS = {
+    "NEO4J_URI": None,
+    "NEO4J_USER": None,
+    "NEO4J_PASSWORD": None,
+    "FRIENDSHIP_STORAGE": "double",
+    "HEDGED_READS": "false",
+    "ADMISSION_CONTROL": "false",
+}
+
+_loaded = False
+
+def load() -> None:
+    """Load .env once and publish the settings as module attributes."""
+    global _loaded
+    if _loaded:
+        return
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    for name, default in _SETTINGS.items():
+        # setdefault keeps values assigned before loading (e.g. in tests)
+        globals().setdefault(name, os.getenv(name, default))
+    _loaded = True
 
-NEO4J_URI = os.getenv("NEO4J_URI")
-NEO4J_USER = os.getenv("NEO4J_USER")
-NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD")
+def __getattr__(name: str):
+    if name in _SETTINGS:
+        load()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 def validate_config():
+    load()
     missing = [k for k, v in {
         "NEO4J_URI": NEO4J_URI,
         "NEO4J_USER": NEO4J_USER,
@@ -16,3 +58,22 @@ def validate_config():
     }.items() if not v]
     if missing:
         raise EnvironmentError(f"Missing required env vars: {', '.join(missing)}")
+
+def single_edge_storage() -> bool:
+    """Return True when friendships are stored as one relationship each."""
+    load()
+    if FRIENDSHIP_STORAGE not in ("double", "single"):
+        raise ValueError(
+            f"FRIENDSHIP_STORAGE must be 'double' or 'single', got {FRIENDSHIP_STORAGE!r}"
+        )
+    return FRIENDSHIP_STORAGE == "single"
+
+def hedged_reads() -> bool:
+    """Return True when the shared async driver should hedge reads."""
+    load()
+    return str(HEDGED_READS).lower() in ("1", "true", "yes")
+
+def admission_control() -> bool:
+    """Return True when the shared async driver should gate queries."""
+    load()
+    return str(ADMISSION_CONTROL).lower() in ("1", "true", "yes")
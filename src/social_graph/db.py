@@ -1,37 +1,121 @@
-"""Neo4j database connection wrapper."""
-from neo4j import GraphDatabase, basic_auth
-from .config import NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD, validate_config
+"""
+Neo4j database connection wrapper.
+
+Same API as db_async without hedging: execute_read() / execute_write() run
+one statement in a routed managed transaction, unit_of_work() runs several
+statements in one session and transaction, run_query() auto-commits.
+
+Thread safety: the underlying neo4j driver is thread-safe and every call
+opens its own session, so one Neo4jDriver can serve many threads (WSGI
+workers, service.ServiceBatchExecutor). get_driver() creates the shared
+instance under a lock.
+"""
+import threading
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Iterator
+from . import config
+
+if TYPE_CHECKING:
+    from neo4j import ManagedTransaction, Session, Transaction
+
+class UnitOfWork:
+    """Statements of one unit_of_work(), sharing a session and transaction."""
+
+    def __init__(self, tx: "Transaction"):
+        self._tx = tx
+
+    def run(self, query: str, params: dict | None = None) -> list[dict]:
+        """Execute a statement inside the unit's transaction."""
+        return [r.data() for r in self._tx.run(query, params or {})]
 
 class Neo4jDriver:
-    def __init__(self):
-        validate_config()
+    """
+    Manages a Neo4j driver instance; safe to share between threads.
+
+    Args:
+        max_connection_pool_size: connections kept per server; bounds how
+            many threads can run queries at the same time.
+    """
+
+    def __init__(self, max_connection_pool_size: int = 100):
+        # Imported here so importing the package does not load the driver
+        from neo4j import GraphDatabase, basic_auth
+
+        config.validate_config()
         self.driver = GraphDatabase.driver(
-            NEO4J_URI,
-            auth=basic_auth(NEO4J_USER, NEO4J_PASSWORD),
+            config.NEO4J_URI,
+            auth=basic_auth(config.NEO4J_USER, config.NEO4J_PASSWORD),
             max_connection_lifetime=100,
+            max_connection_pool_size=max_connection_pool_size,
             connection_timeout=10
         )
+        # Shared by all sessions: reads on replicas see earlier writes
+        self.bookmarks = GraphDatabase.bookmark_manager()
 
     def run_query(self, query: str, params: dict | None = None):
         """Execute a Cypher query and return a list of result records as dicts."""
-        with self.driver.session() as session:
+        with self._session(read_only=False) as session:
             result = session.run(query, params or {})
             return [r.data() for r in result]
 
+    def execute_read(self, query: str, params: dict | None = None) -> list[dict]:
+        """Run a read-only statement in a managed transaction on a reader."""
+        with self._session(read_only=True) as session:
+            return session.execute_read(_collect, query, params or {})
+
+    def execute_write(self, query: str, params: dict | None = None) -> list[dict]:
+        """Run a statement in a managed write transaction on the writer."""
+        with self._session(read_only=False) as session:
+            return session.execute_write(_collect, query, params or {})
+
+    @contextmanager
+    def unit_of_work(self, read_only: bool = False) -> Iterator[UnitOfWork]:
+        """
+        Run several statements in one session and transaction; a write unit
+        commits when the block exits normally, otherwise it is rolled back.
+        """
+        with self._session(read_only) as session:
+            tx = session.begin_transaction()
+            try:
+                yield UnitOfWork(tx)
+                if not read_only:
+                    tx.commit()
+            finally:
+                # Rolls back unless already committed
+                tx.close()
+
     def close(self):
         self.driver.close()
 
+    def _session(self, read_only: bool) -> "Session":
+        return self.driver.session(
+            default_access_mode="READ" if read_only else "WRITE",
+            bookmark_manager=self.bookmarks,
+        )
+
+def _collect(tx: "ManagedTransaction", query: str, params: dict) -> list[dict]:
+    """Transaction function: run one statement and consume its records."""
+    return [r.data() for r in tx.run(query, params)]
+
 # Singleton instance
 _driver_instance: Neo4jDriver | None = None
+_driver_lock = threading.Lock()
 
 def get_driver() -> Neo4jDriver:
+    """Return the singleton Neo4j driver, creating it once across threads."""
     global _driver_instance
-    if _driver_instance is None:
-        _driver_instance = Neo4jDriver()
-    return _driver_instance
+    driver = _driver_instance
+    if driver is None:
+        with _driver_lock:
+            # Re-check: another thread may have created it while we waited
+            if _driver_instance is None:
+                _driver_instance = Neo4jDriver()
+            driver = _driver_instance
+    return driver
 
 def close_driver():
     global _driver_instance
-    if _driver_instance is not None:
-        _driver_instance.close()
-        _driver_instance = None
+    with _driver_lock:
+        driver, _driver_instance = _driver_instance, None
+    if driver is not None:
+        driver.close()
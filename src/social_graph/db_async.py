@@ -1,32 +1,195 @@
-"""Async Neo4j database connection wrapper."""
-from neo4j import AsyncGraphDatabase, AsyncDriver, basic_auth
-from .config import NEO4J_URI, NEO4J_USER, NEO4J_PASSWORD, validate_config
+"""
+Async Neo4j database connection wrapper.
+
+Three ways to run Cypher:
+
+- execute_read() / execute_write(): one statement in a managed transaction
+  (retried by the driver on transient errors), routed to readers or the
+  writer of the cluster.
+- unit_of_work(read_only=...): several statements in one session and one
+  explicit transaction, paying session setup once; a write unit commits on
+  successful exit and rolls back on error.
+- run_query(): one auto-commit statement (kept for ad-hoc use).
+
+execute_*() and run_query() open a session per statement and release it
+(and its pooled connection) as soon as the statement's records are read.
+A unit of work instead holds its session, connection and transaction, and
+its admission slot when admission control is on, for the whole `async
+with` block, including any time the caller spends between statements.
+Keep units to the statements that belong together (e.g. one
+recommendation request).
+
+run_batched() repeats a keyset-paginated write (one execute_write() per
+batch) until a short batch comes back; bulk jobs and migrations use it.
+
+All sessions share one bookmark manager, so a read routed to a replica
+still sees the writes made earlier through this driver.
+
+Hedged reads (opt-in): with a HedgePolicy, or HEDGED_READS=true for the
+shared get_driver() instance, execute_read() and run_query(...,
+read_only=True) race a duplicate of a read that is slower than the recent
+latency percentile on a second pooled session; see hedging.py. Writes and
+units of work are never hedged.
+
+Admission control (opt-in): with an AdmissionPolicy, or
+ADMISSION_CONTROL=true for the shared get_driver() instance, every statement
+and unit of work first takes a slot in the read or write lane of an
+AdmissionController, which bounds concurrency and sheds load with
+Overloaded when its queue is full; see admission.py. A statement gives
+its slot back when it finishes, a unit of work when its block exits. Each
+hedge attempt takes its own read slot.
+"""
+from contextlib import asynccontextmanager, nullcontext, suppress
+from typing import TYPE_CHECKING, Any, AsyncContextManager, AsyncIterator, Dict, List, Optional
+from . import config
+from .admission import AdmissionController, AdmissionPolicy, batch_priority
+from .hedging import Hedger, HedgePolicy
+
+if TYPE_CHECKING:
+    from neo4j import AsyncDriver, AsyncManagedTransaction, AsyncSession, AsyncTransaction
+
+class AsyncUnitOfWork:
+    """Statements of one unit_of_work(), sharing a session and transaction."""
+
+    def __init__(self, tx: "AsyncTransaction"):
+        self._tx = tx
+
+    async def run(self, query: str, params: dict | None = None) -> list[dict]:
+        """Execute a statement inside the unit's transaction."""
+        result = await self._tx.run(query, params or {})
+        return [record.data() async for record in result]
 
 class AsyncNeo4jDriver:
-    """Manages an asynchronous Neo4j driver instance."""
+    """
+    Manages an asynchronous Neo4j driver instance.
+
+    Attributes:
+        hedger: Hedger for read-only queries, or None when hedging is off.
+        admission: AdmissionController gating all queries, or None when
+            admission control is off.
+    """
+
+    def __init__(
+        self,
+        hedge_policy: Optional[HedgePolicy] = None,
+        admission_policy: Optional[AdmissionPolicy] = None,
+    ):
+        # Imported here so importing the package does not load the driver
+        from neo4j import AsyncGraphDatabase, basic_auth
 
-    def __init__(self):
-        validate_config()
-        self.driver: AsyncDriver = AsyncGraphDatabase.driver(
-            NEO4J_URI,
-            auth=basic_auth(NEO4J_USER, NEO4J_PASSWORD),
+        config.validate_config()
+        self.driver: "AsyncDriver" = AsyncGraphDatabase.driver(
+            config.NEO4J_URI,
+            auth=basic_auth(config.NEO4J_USER, config.NEO4J_PASSWORD),
             max_connection_lifetime=100,
             connection_timeout=10
         )
+        self.bookmarks = AsyncGraphDatabase.bookmark_manager()
+        self.hedger = Hedger(hedge_policy) if hedge_policy is not None else None
+        self.admission = (
+            AdmissionController(admission_policy) if admission_policy is not None else None
+        )
+
+    async def execute_read(self, query: str, params: dict | None = None) -> list[dict]:
+        """Run a read-only statement in a managed transaction on a reader."""
+        if self.hedger is not None:
+            return await self.hedger.run(lambda: self._execute(query, params, read_only=True))
+        return await self._execute(query, params, read_only=True)
+
+    async def execute_write(self, query: str, params: dict | None = None) -> list[dict]:
+        """Run a statement in a managed write transaction on the writer."""
+        return await self._execute(query, params, read_only=False)
+
+    @asynccontextmanager
+    async def unit_of_work(self, read_only: bool = False) -> AsyncIterator[AsyncUnitOfWork]:
+        """
+        Run several statements in one session and transaction.
 
-    async def run_query(self, query: str, params: dict | None = None) -> list[dict]:
-        """Execute a Cypher query asynchronously and return result records as dicts."""
-        async with self.driver.session() as session:
+        Usage:
+            async with driver.unit_of_work(read_only=True) as uow:
+                a = await uow.run(query_a, params_a)
+                b = await uow.run(query_b, params_b)
+
+        A write unit commits when the block exits normally; a read unit has
+        nothing to commit. On error (or for reads) the transaction is rolled
+        back when the session closes. The session (with its pooled
+        connection) and, with admission control, one slot are held until
+        the block exits, not released after each statement.
+        """
+        async with self._slot(read_only), self._session(read_only) as session:
+            tx = await session.begin_transaction()
+            try:
+                yield AsyncUnitOfWork(tx)
+                if not read_only:
+                    await tx.commit()
+            finally:
+                if read_only:
+                    # Nothing to roll back; a statement cancelled mid-flight
+                    # (e.g. by a deadline) may have left the transaction
+                    # unusable, and the session discards its connection anyway
+                    with suppress(Exception):
+                        await tx.close()
+                else:
+                    # Rolls back unless already committed
+                    await tx.close()
+
+    async def run_query(
+        self, query: str, params: dict | None = None, read_only: bool = False
+    ) -> list[dict]:
+        """
+        Execute a Cypher query asynchronously and return result records as dicts.
+
+        Args:
+            read_only: the query does not write; it is routed to readers and
+                may be hedged when hedging is enabled.
+        """
+        if read_only and self.hedger is not None:
+            return await self.hedger.run(lambda: self._run(query, params, read_only))
+        return await self._run(query, params, read_only)
+
+    def hedge_stats(self) -> Dict[str, Any]:
+        """Return the hedger's counters ({} when hedging is off)."""
+        return self.hedger.stats() if self.hedger is not None else {}
+
+    def admission_stats(self) -> Dict[str, Any]:
+        """Return per-lane admission metrics ({} when admission control is off)."""
+        return self.admission.stats() if self.admission is not None else {}
+
+    def _slot(self, read_only: bool) -> AsyncContextManager[None]:
+        if self.admission is None:
+            return nullcontext()
+        return self.admission.slot(read_only)
+
+    def _session(self, read_only: bool) -> "AsyncSession":
+        # Each call opens its own session, so a hedge runs on another
+        # pooled connection; cancelling it closes the session.
+        return self.driver.session(
+            default_access_mode="READ" if read_only else "WRITE",
+            bookmark_manager=self.bookmarks,
+        )
+
+    async def _run(self, query: str, params: dict | None, read_only: bool) -> list[dict]:
+        async with self._slot(read_only), self._session(read_only) as session:
             result = await session.run(query, params or {})
             records = []
             async for record in result:
                 records.append(record.data())
             return records
 
+    async def _execute(self, query: str, params: dict | None, read_only: bool) -> list[dict]:
+        async with self._slot(read_only), self._session(read_only) as session:
+            work = session.execute_read if read_only else session.execute_write
+            return await work(_collect, query, params or {})
+
     async def close(self):
         """Close the underlying driver asynchronously."""
         await self.driver.close()
 
+async def _collect(tx: "AsyncManagedTransaction", query: str, params: dict) -> list[dict]:
+    """Transaction function: run one statement and consume its records."""
+    result = await tx.run(query, params)
+    return [record.data() async for record in result]
+
 # Singleton instance
 _driver_instance: AsyncNeo4jDriver | None = None
 
@@ -34,7 +197,10 @@ def get_driver() -> AsyncNeo4jDriver:
     """Return the singleton async Neo4j driver instance."""
     global _driver_instance
     if _driver_instance is None:
-        _driver_instance = AsyncNeo4jDriver()
+        _driver_instance = AsyncNeo4jDriver(
+            hedge_policy=HedgePolicy() if config.hedged_reads() else None,
+            admission_policy=AdmissionPolicy() if config.admission_control() else None,
+        )
     return _driver_instance
 
 async def close_driver():
@@ -43,3 +209,33 @@ async def close_driver():
     if _driver_instance is not None:
         await _driver_instance.close()
         _driver_instance = None
+
+@batch_priority
+async def run_batched(
+        query: str,
+        params: Dict[str, Any],
+        batch_size: int,
+        driver: AsyncNeo4jDriver
+    ) -> List[Dict[str, Any]]:
+    """
+    Run a keyset-paginated write query until a short batch is returned.
+
+    The query receives `$after` (last username of the previous batch, or
+    null) and `$batch_size`, and must return `updated` and `last`. Runs at
+    batch priority under admission control. Used by the analytics index
+    jobs and the migrations.
+
+    Returns:
+        The result row of every batch, in order.
+    """
+    rows: List[Dict[str, Any]] = []
+    after: Optional[str] = None
+    while True:
+        result = await driver.execute_write(
+            query, {**params, "after": after, "batch_size": batch_size}
+        )
+        row = result[0] if result else {"updated": 0, "last": None}
+        rows.append(row)
+        if row["updated"] < batch_size:
+            return rows
+        after = row["last"]
@@ -0,0 +1,229 @@
+"""
+Spectral node embeddings with approximate nearest-neighbour retrieval.
+
+Friends-of-friends and short random walks only reach users close to the
+target. Embeddings place structurally similar users near each other even
+across communities, which helps cold-start and cross-community
+recommendations.
+
+- spectral_embeddings(): leading eigenvectors of the normalized adjacency
+  D^-1/2 A D^-1/2 (scipy eigsh), scaled by their eigenvalues and
+  L2-normalized, stored as a compact float32 (num_users, dim) matrix.
+- RandomProjectionIndex: cosine LSH. Each of `num_tables` tables hashes a
+  vector to the sign pattern of `num_bits` random hyperplanes; a query only
+  scores users sharing a bucket in some table, so retrieval touches a
+  small fraction of the graph instead of all users.
+- EmbeddingCandidateSource: candidate rows for Recommender /
+  LocalRecommender (`candidate_source=`), answering many users per index
+  query.
+"""
+
+import asyncio
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .recommender_local import _feature_rows, candidate_features
+from .snapshot import GraphSnapshot
+
+def spectral_embeddings(
+    snapshot: GraphSnapshot,
+    dim: int = 32,
+    tol: float = 1e-4,
+    seed: int = 0,
+) -> np.ndarray:
+    """
+    Embed every user with the top eigenvectors of the normalized adjacency.
+
+    The leading eigenvector only encodes degree, so it is skipped. Isolated
+    users get a zero vector (they match nobody). `tol` is the eigsh
+    convergence tolerance; a loose one is plenty for similarity search
+    and converges much faster than eigsh's machine-precision default.
+
+    Returns:
+        float32 array of shape (num_users, dim'), dim' = min(dim, num_users - 2),
+        rows of unit length (or zero).
+    """
+    from scipy.sparse import diags
+    from scipy.sparse.linalg import eigsh
+
+    n = snapshot.num_nodes
+    dim = max(0, min(dim, n - 2))
+    if dim == 0:
+        return np.zeros((n, 0), dtype=np.float32)
+
+    degrees = snapshot.degrees().astype(np.float64)
+    with np.errstate(divide="ignore"):
+        scale = np.where(degrees > 0, 1.0 / np.sqrt(degrees), 0.0)
+    D = diags(scale)
+    M = D @ snapshot.adjacency_matrix() @ D
+
+    # Deterministic start vector so results are reproducible
+    v0 = np.random.default_rng(seed).random(n)
+    values, vectors = eigsh(M, k=dim + 1, which="LA", v0=v0, tol=tol)
+    order = np.argsort(-values)[1:]
+    vectors = vectors[:, order] * np.abs(values[order])
+    # eigsh returns each eigenvector up to sign; fix it for reproducibility
+    vectors *= np.sign(vectors[np.abs(vectors).argmax(axis=0), np.arange(dim)])
+    # Isolated users are eigenvectors of eigenvalue 0 on their own; drop them
+    vectors[degrees == 0] = 0.0
+    return _normalize(vectors).astype(np.float32)
+
+class RandomProjectionIndex:
+    """
+    Cosine-similarity LSH index over an embedding matrix.
+
+    Attributes:
+        embeddings: the indexed (num_users, dim) float32 matrix.
+        planes: random hyperplanes, (num_tables, num_bits, dim).
+    """
+
+    def __init__(
+        self,
+        embeddings: np.ndarray,
+        num_tables: int = 16,
+        num_bits: int = 8,
+        seed: int = 0,
+    ):
+        if num_bits > 62:
+            raise ValueError("num_bits must be at most 62")
+        self.embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+        rng = np.random.default_rng(seed)
+        self.planes = rng.standard_normal(
+            (num_tables, num_bits, self.embeddings.shape[1])
+        ).astype(np.float32)
+
+        # Per table: ids sorted by bucket code, plus each bucket's code and extent
+        self._order: List[np.ndarray] = []
+        self._codes: List[np.ndarray] = []
+        self._bounds: List[np.ndarray] = []
+        nonzero = np.flatnonzero(np.abs(self.embeddings).sum(axis=1) > 0)
+        for codes in self._hash(self.embeddings[nonzero]):
+            order = np.argsort(codes, kind="stable")
+            unique, starts = np.unique(codes[order], return_index=True)
+            self._order.append(nonzero[order])
+            self._codes.append(unique)
+            self._bounds.append(np.append(starts, len(order)))
+
+    def query(
+        self,
+        vectors: np.ndarray,
+        limit: int = 10,
+        exclude: Optional[Sequence[np.ndarray]] = None,
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Approximate nearest neighbours for a batch of query vectors.
+
+        Args:
+            vectors: (batch, dim) query embeddings.
+            limit: neighbours returned per query.
+            exclude: optional per-query id arrays to leave out.
+
+        Returns:
+            One (ids, cosine similarities) pair per query, similarity desc
+            then id asc.
+        """
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        query_codes = self._hash(vectors)
+        results = []
+        for q, vector in enumerate(vectors):
+            buckets = []
+            for table in range(len(self._codes)):
+                codes, bounds = self._codes[table], self._bounds[table]
+                at = np.searchsorted(codes, query_codes[table, q])
+                if at < len(codes) and codes[at] == query_codes[table, q]:
+                    buckets.append(self._order[table][bounds[at]:bounds[at + 1]])
+            ids = np.unique(np.concatenate(buckets)) if buckets else np.empty(0, dtype=np.int64)
+            if exclude is not None and len(exclude[q]):
+                ids = ids[~np.isin(ids, exclude[q])]
+            sims = self.embeddings[ids] @ vector
+            order = np.lexsort((ids, -sims))[:limit]
+            results.append((ids[order], sims[order]))
+        return results
+
+    def _hash(self, vectors: np.ndarray) -> np.ndarray:
+        """Return bucket codes, shape (num_tables, len(vectors))."""
+        bits = np.einsum("tbd,nd->tnb", self.planes, vectors) > 0
+        weights = np.left_shift(np.int64(1), np.arange(bits.shape[2], dtype=np.int64))
+        return (bits * weights).sum(axis=2)
+
+class EmbeddingCandidateSource:
+    """
+    Candidate source returning each user's nearest non-friends in embedding
+    space.
+
+    Called as source(username, limit), it returns rows shaped like
+    Recommender's candidate-feature rows plus "similarity". query_many()
+    answers many users in one batched index query, and batched() is an async
+    variant that gathers concurrent callers into one query_many() call.
+    """
+
+    def __init__(
+        self,
+        snapshot: GraphSnapshot,
+        embeddings: np.ndarray,
+        index: Optional[RandomProjectionIndex] = None,
+    ):
+        self.snapshot = snapshot
+        self.embeddings = embeddings
+        self.index = index or RandomProjectionIndex(embeddings)
+        self._pending: Dict[Tuple[str, int], asyncio.Future] = {}
+
+    def __call__(self, username: str, limit: int) -> List[Dict[str, Any]]:
+        return self.query_many([username], limit)[0]
+
+    def query_many(self, usernames: Sequence[str], limit: int) -> List[List[Dict[str, Any]]]:
+        """Return candidate rows for every user, from one batched index query."""
+        uids = [self.snapshot.id_of(u) for u in usernames]
+        known = [uid for uid in uids if uid is not None]
+        exclude = [np.append(self.snapshot.neighbors(uid), uid) for uid in known]
+        answers = iter(self.index.query(self.embeddings[known], limit, exclude) if known else [])
+
+        names = self.snapshot.usernames
+        results: List[List[Dict[str, Any]]] = []
+        for uid in uids:
+            if uid is None:
+                results.append([])
+                continue
+            ids, sims = next(answers)
+            rows = _feature_rows(
+                [names[c] for c in ids.tolist()],
+                candidate_features(self.snapshot, uid, ids),
+            )
+            for row, sim in zip(rows, sims.tolist()):
+                row["similarity"] = sim
+            results.append(rows)
+        return results
+
+    async def batched(self, username: str, limit: int) -> List[Dict[str, Any]]:
+        """
+        Async candidate source: calls made in the same event-loop iteration
+        are answered by a single query_many() per limit.
+        """
+        key = (username, limit)
+        future = self._pending.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            if not self._pending:
+                loop.call_soon(self._flush)
+            future = self._pending[key] = loop.create_future()
+        return list(await asyncio.shield(future))
+
+    def _flush(self) -> None:
+        pending, self._pending = self._pending, {}
+        by_limit: Dict[int, List[str]] = {}
+        for username, limit in pending:
+            by_limit.setdefault(limit, []).append(username)
+        for limit, usernames in by_limit.items():
+            try:
+                answers = self.query_many(usernames, limit)
+            except Exception as exc:
+                for username in usernames:
+                    pending[(username, limit)].set_exception(exc)
+                continue
+            for username, rows in zip(usernames, answers):
+                pending[(username, limit)].set_result(rows)
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
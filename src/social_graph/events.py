@@ -0,0 +1,222 @@
+"""
+In-process change feed for graph writes.
+
+service_async publishes a ChangeEvent on `service_async.change_bus` after
+each successful write (UserAdded, FriendshipAdded). In-memory structures
+subscribe to it and update incrementally instead of being re-fetched on a
+timer; see live.py for a live snapshot (with degrees) and a recommendation
+cache.
+
+Delivery
+--------
+publish() never blocks the write path: it appends the event to a bounded
+buffer per subscription. Each subscription has its own delivery task that
+hands events to its handler in batches of up to `max_batch`, waiting up to
+`max_delay` seconds for a batch to fill, so a slow subscriber does not
+delay the others and a burst of writes costs one handler call per batch.
+
+Queues and delivery tasks belong to the event loop that runs them. When
+events are published from a new loop (a second asyncio.run(), a restarted
+worker), the subscription moves its undelivered events to a fresh queue
+and starts a new delivery task there, so a module-level bus such as
+service_async.change_bus keeps working across loops.
+
+Events are delivered in publish order. A subscription whose buffer is full
+drops new events and counts them in `dropped`; its state is then stale and
+should be rebuilt (e.g. from a fresh snapshot). A handler that raises is
+counted in `errors` and keeps receiving later batches.
+
+Usage
+-----
+    live = LiveSnapshot(snapshot)
+    change_bus.subscribe(live.handle)
+    ...
+    await change_bus.flush()   # wait until published events are handled
+"""
+
+import asyncio
+import inspect
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+
+@dataclass(frozen=True, slots=True)
+class UserAdded:
+    """A user node was created (or already existed)."""
+    username: str
+
+@dataclass(frozen=True, slots=True)
+class FriendshipAdded:
+    """A friendship between two existing users was created (or already existed)."""
+    user1: str
+    user2: str
+
+ChangeEvent = Union[UserAdded, FriendshipAdded]
+
+# Receives one batch of events; may be a plain function or a coroutine function
+Handler = Callable[[List[ChangeEvent]], Union[None, Awaitable[None]]]
+
+class Subscription:
+    """
+    One subscriber's buffer and delivery task.
+
+    Attributes:
+        handler: callable receiving each batch of events.
+        delivered: events handed to the handler.
+        batches: handler calls.
+        dropped: events discarded because the buffer was full.
+        errors: handler calls that raised; `last_error` keeps the latest.
+    """
+
+    def __init__(self, bus: "ChangeBus", handler: Handler, max_batch: int,
+                 max_delay: float, max_pending: int):
+        self.bus = bus
+        self.handler = handler
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.delivered = 0
+        self.batches = 0
+        self.dropped = 0
+        self.errors = 0
+        self.last_error: Optional[BaseException] = None
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": self._queue.qsize(),
+            "delivered": self.delivered,
+            "batches": self.batches,
+            "dropped": self.dropped,
+            "errors": self.errors,
+        }
+
+    def _offer(self, event: ChangeEvent) -> None:
+        self._ensure_running()
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    def _ensure_running(self) -> None:
+        """Start the delivery task in the running loop unless it is already there."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._task is not None and not self._task.done():
+            return
+        # First use, a new event loop, or a delivery task that stopped: a
+        # fresh queue (bound to this loop, with no stale unfinished count)
+        # takes over the events not delivered yet
+        old = self._queue
+        self._queue = asyncio.Queue(maxsize=old.maxsize)
+        while not old.empty():
+            self._queue.put_nowait(old.get_nowait())
+        self._loop = loop
+        self._task = loop.create_task(self._deliver())
+
+    async def _deliver(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    async with asyncio.timeout(remaining):
+                        batch.append(await self._queue.get())
+                except TimeoutError:
+                    break
+            try:
+                result = self.handler(batch)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as exc:
+                self.errors += 1
+                self.last_error = exc
+            finally:
+                self.delivered += len(batch)
+                self.batches += 1
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _close(self) -> None:
+        task, self._task = self._task, None
+        # A task of an earlier, finished loop was already cancelled with it
+        if task is not None and not task.done() and self._loop is asyncio.get_running_loop():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+class ChangeBus:
+    """
+    Publish/subscribe hub for ChangeEvents.
+
+    Args:
+        max_batch: most events per handler call.
+        max_delay: seconds to wait for a batch to fill once it has an event.
+        max_pending: buffered events per subscription before dropping.
+
+    Attributes:
+        published: events published so far.
+    """
+
+    def __init__(self, max_batch: int = 256, max_delay: float = 0.01, max_pending: int = 10_000):
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.max_pending = max_pending
+        self.published = 0
+        self._subscriptions: List[Subscription] = []
+
+    def subscribe(
+        self,
+        handler: Handler,
+        max_batch: Optional[int] = None,
+        max_delay: Optional[float] = None,
+    ) -> Subscription:
+        """Deliver events published from now on to `handler`, in batches."""
+        subscription = Subscription(
+            self,
+            handler,
+            max_batch=self.max_batch if max_batch is None else max_batch,
+            max_delay=self.max_delay if max_delay is None else max_delay,
+            max_pending=self.max_pending,
+        )
+        self._subscriptions.append(subscription)
+        return subscription
+
+    async def unsubscribe(self, subscription: Subscription) -> None:
+        """Stop delivery to a subscription; undelivered events are discarded."""
+        if subscription in self._subscriptions:
+            self._subscriptions.remove(subscription)
+        await subscription._close()
+
+    def publish(self, event: ChangeEvent) -> None:
+        """Queue an event for every subscriber without waiting for delivery."""
+        self.published += 1
+        for subscription in self._subscriptions:
+            subscription._offer(event)
+
+    async def flush(self) -> None:
+        """Wait until every event published so far has been handled."""
+        for subscription in list(self._subscriptions):
+            if not subscription._queue.empty():
+                subscription._ensure_running()
+            await subscription._queue.join()
+
+    async def close(self) -> None:
+        """Cancel all delivery tasks and remove all subscriptions."""
+        for subscription in list(self._subscriptions):
+            await self.unsubscribe(subscription)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the published count and per-subscription counters."""
+        return {
+            "published": self.published,
+            "subscriptions": [s.stats() for s in self._subscriptions],
+        }
@@ -0,0 +1,170 @@
+"""
+Compact exclusion sets for local candidate generation.
+
+IdBitset
+--------
+A packed bitset over interned snapshot ids (one bit per user). The local
+recommender marks the user and their friends in a per-request bitset and
+drops already-connected friends-of-friends with one vectorized lookup,
+instead of a sort-based membership test (np.isin) or Python sets of
+usernames. Allocation is n / 8 bytes of zeroed memory.
+
+BloomFilter
+-----------
+A Bloom filter over int64 keys, for large, bulk-loaded exclusion lists
+such as users a person blocked or dismissed from their recommendations.
+Keys are hashed with splitmix64 and double hashing, so adding or testing a
+whole array of keys is a handful of numpy operations. Membership tests may
+return false positives (at about `false_positive_rate`), never false
+negatives: a dismissed candidate is always excluded, and a small fraction
+of other candidates may be excluded too.
+
+dismissal_filter() builds one from (user, dismissed user) username pairs,
+keyed by pair_keys() over snapshot ids.
+"""
+
+import math
+from typing import Iterable, Tuple
+
+import numpy as np
+
+from .snapshot import GraphSnapshot
+
+class IdBitset:
+    """
+    Packed set of ids in [0, size).
+
+    Attributes:
+        size: number of representable ids.
+        bits: packed little-endian bits, one byte per eight ids.
+    """
+
+    __slots__ = ("size", "bits")
+
+    def __init__(self, size: int):
+        self.size = size
+        self.bits = np.zeros((size + 7) >> 3, dtype=np.uint8)
+
+    @classmethod
+    def from_ids(cls, size: int, ids: np.ndarray) -> "IdBitset":
+        bitset = cls(size)
+        bitset.add(ids)
+        return bitset
+
+    def add(self, ids: np.ndarray) -> None:
+        """Add every id in `ids`."""
+        _set_bits(self.bits, np.asarray(ids, dtype=np.int64))
+
+    def contains(self, ids: np.ndarray) -> np.ndarray:
+        """Boolean mask: which of `ids` are in the set."""
+        return _test_bits(self.bits, np.asarray(ids, dtype=np.int64))
+
+    @property
+    def nbytes(self) -> int:
+        return self.bits.nbytes
+
+class BloomFilter:
+    """
+    Bloom filter over int64 keys with vectorized add and lookup.
+
+    Args:
+        capacity: expected number of keys.
+        false_positive_rate: target false-positive rate at `capacity` keys.
+        seed: hash seed.
+
+    Attributes:
+        num_bits: size of the bit array.
+        num_hashes: bit positions set per key.
+        count: keys added so far (duplicates included).
+    """
+
+    def __init__(self, capacity: int, false_positive_rate: float = 0.01, seed: int = 0):
+        if not 0.0 < false_positive_rate < 1.0:
+            raise ValueError("false_positive_rate must be between 0 and 1")
+        capacity = max(capacity, 1)
+        optimal_bits = math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2)
+        self.num_hashes = max(1, round(optimal_bits / capacity * math.log(2)))
+        # Small filters get a floor so a few keys cannot saturate them
+        self.num_bits = max(_MIN_BITS, optimal_bits)
+        self.count = 0
+        self.bits = np.zeros((self.num_bits + 7) >> 3, dtype=np.uint8)
+        self._seed = np.uint64(seed)
+
+    @classmethod
+    def from_keys(
+        cls, keys: np.ndarray, false_positive_rate: float = 0.01, seed: int = 0
+    ) -> "BloomFilter":
+        """Build a filter sized for, and holding, `keys`."""
+        keys = np.asarray(keys, dtype=np.int64)
+        bloom = cls(len(keys), false_positive_rate, seed)
+        bloom.add(keys)
+        return bloom
+
+    def add(self, keys: np.ndarray) -> None:
+        """Add every key in `keys`."""
+        keys = np.asarray(keys, dtype=np.int64)
+        _set_bits(self.bits, self._positions(keys).ravel())
+        self.count += len(keys)
+
+    def contains(self, keys: np.ndarray) -> np.ndarray:
+        """Boolean mask: which of `keys` may have been added."""
+        keys = np.asarray(keys, dtype=np.int64)
+        if len(keys) == 0:
+            return np.zeros(0, dtype=bool)
+        positions = self._positions(keys)
+        return _test_bits(self.bits, positions.ravel()).reshape(positions.shape).all(axis=1)
+
+    @property
+    def nbytes(self) -> int:
+        return self.bits.nbytes
+
+    def _positions(self, keys: np.ndarray) -> np.ndarray:
+        """(len(keys), num_hashes) bit positions, by double hashing."""
+        h1 = _splitmix64(keys.astype(np.uint64) + self._seed)
+        h2 = _splitmix64(h1) | np.uint64(1)
+        rounds = np.arange(self.num_hashes, dtype=np.uint64)
+        positions = (h1[:, None] + rounds[None, :] * h2[:, None]) % np.uint64(self.num_bits)
+        return positions.astype(np.int64)
+
+def pair_keys(user_ids: np.ndarray, candidate_ids: np.ndarray, num_nodes: int) -> np.ndarray:
+    """Interned key of each (user id, candidate id) pair."""
+    user_ids = np.asarray(user_ids, dtype=np.int64)
+    return user_ids * np.int64(num_nodes) + np.asarray(candidate_ids, dtype=np.int64)
+
+def dismissal_filter(
+    snapshot: GraphSnapshot,
+    pairs: Iterable[Tuple[str, str]],
+    false_positive_rate: float = 0.01,
+) -> BloomFilter:
+    """
+    Bloom filter of (username, excluded username) pairs, e.g. blocked or
+    dismissed users, for LocalRecommender(dismissed=...). Pairs naming a
+    user missing from the snapshot are skipped.
+    """
+    users, candidates = [], []
+    for user, candidate in pairs:
+        uid, cid = snapshot.id_of(user), snapshot.id_of(candidate)
+        if uid is not None and cid is not None:
+            users.append(uid)
+            candidates.append(cid)
+    keys = pair_keys(np.array(users, dtype=np.int64), np.array(candidates, dtype=np.int64),
+                     snapshot.num_nodes)
+    return BloomFilter.from_keys(keys, false_positive_rate)
+
+_MIN_BITS = 512
+
+_SPLITMIX_1 = np.uint64(0xBF58476D1CE4E5B9)
+_SPLITMIX_2 = np.uint64(0x94D049BB133111EB)
+
+def _splitmix64(x: np.ndarray) -> np.ndarray:
+    # uint64 array arithmetic wraps around, as the mixer expects
+    x = (x ^ (x >> np.uint64(30))) * _SPLITMIX_1
+    x = (x ^ (x >> np.uint64(27))) * _SPLITMIX_2
+    return x ^ (x >> np.uint64(31))
+
+def _set_bits(bits: np.ndarray, positions: np.ndarray) -> None:
+    # .at: several positions may fall into the same byte
+    np.bitwise_or.at(bits, positions >> 3, (1 << (positions & 7)).astype(np.uint8))
+
+def _test_bits(bits: np.ndarray, positions: np.ndarray) -> np.ndarray:
+    return ((bits[positions >> 3] >> (positions & 7).astype(np.uint8)) & 1).astype(bool)
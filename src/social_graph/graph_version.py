@@ -0,0 +1,50 @@
+"""
+Graph change signal used to version snapshots.
+
+The service writes stamp what they create: add_user() sets `created_at`
+on a new User, add_friendship() on each new FRIEND_WITH relationship
+(`ON CREATE SET ... = timestamp()`, written out in the queries). A MERGE
+that matched existing data, or a write that matched no users, stamps
+nothing. Only the created node or relationship is touched, so concurrent
+writes do not contend on shared state.
+
+VERSION_QUERY combines the User and FRIEND_WITH counts (answered from
+Neo4j's count store) with the newest stamp of each (read through the
+range indexes migrations.create_version_indexes() creates):
+
+- an add raises the newest stamp (and a count);
+- a delete lowers a count;
+- a delete plus an add keeps the counts but raises the newest stamp.
+
+Stamps have millisecond resolution: a delete and an add in the same
+millisecond as the previous version read can go unnoticed until the next
+write.
+"""
+
+VERSION_QUERY = """
+    RETURN COUNT { (:User) } AS users,
+           COUNT { ()-[:FRIEND_WITH]->() } AS friendships,
+           COLLECT {
+               MATCH (u:User) WHERE u.created_at IS NOT NULL
+               RETURN u.created_at ORDER BY u.created_at DESC LIMIT 1
+           } AS user_stamp,
+           COLLECT {
+               MATCH ()-[r:FRIEND_WITH]->() WHERE r.created_at IS NOT NULL
+               RETURN r.created_at ORDER BY r.created_at DESC LIMIT 1
+           } AS friendship_stamp
+    """
+
+# Run by migrations.create_version_indexes()
+VERSION_INDEXES = (
+    "CREATE RANGE INDEX user_created_at IF NOT EXISTS FOR (u:User) ON (u.created_at)",
+    "CREATE RANGE INDEX friend_with_created_at IF NOT EXISTS "
+    "FOR ()-[r:FRIEND_WITH]-() ON (r.created_at)",
+)
+
+def format_version(row: dict) -> str:
+    """Version string of a VERSION_QUERY row."""
+    stamps = [s for key in ("user_stamp", "friendship_stamp") for s in row.get(key) or []]
+    return (
+        f"users={row.get('users', 0)};friendships={row.get('friendships', 0)};"
+        f"last_write={max(stamps, default=0)}"
+    )
@@ -0,0 +1,157 @@
+"""
+Hedged reads: cut tail latency by racing a duplicate of a slow read.
+
+Most reads finish quickly, but a few percent take far longer (a slow
+replica, a GC pause, a congested connection). A Hedger starts the read and,
+if it has not finished after `delay()` - a high percentile of recent read
+latencies - starts an identical second attempt. Whichever finishes first
+wins; the other is cancelled. Only idempotent, read-only work may be hedged.
+
+A hedge budget caps the extra load: at most `budget` hedges per read on
+average (e.g. 0.05 = 5% more queries), so a global slowdown, where every
+read crosses the threshold, cannot double the load on the database.
+
+The delay is learned from the primary (first) attempts only. A hedge that
+wins answers sooner than the primary would have, so counting its latency
+would pull the percentile down and trigger ever more hedges. When a hedge
+wins, the primary's latency is unknown and the time it had run by then is
+recorded as a lower bound instead.
+
+stats() reports the hedge rate (hedges / reads) and win rate (hedges that
+beat the original / hedges).
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+from .metrics import LatencyRecorder
+
+T = TypeVar("T")
+
+@dataclass(slots=True)
+class HedgePolicy:
+    """
+    When and how often to hedge.
+
+    Attributes:
+        percentile: latency percentile of recent reads used as hedge delay.
+        min_delay: lower bound on the delay in seconds.
+        max_delay: upper bound on the delay in seconds.
+        initial_delay: delay used until `min_samples` reads were observed.
+        min_samples: reads needed before the percentile is trusted.
+        budget: maximum hedges per read, averaged over all reads.
+        window: number of recent read latencies kept.
+        refresh_every: reads between recomputations of the percentile.
+    """
+    percentile: float = 95.0
+    min_delay: float = 0.005
+    max_delay: float = 1.0
+    initial_delay: float = 0.1
+    min_samples: int = 50
+    budget: float = 0.05
+    window: int = 1_000
+    refresh_every: int = 50
+
+class Hedger:
+    """
+    Run read attempts with at most one hedge each.
+
+    Attributes:
+        policy: the HedgePolicy in effect.
+        latencies: recent primary-attempt latencies.
+        reads: reads started.
+        hedged: reads for which a hedge was issued.
+        hedge_wins: hedged reads answered by the hedge.
+        budget_denied: reads past the delay that were not hedged because
+            the budget was used up.
+    """
+
+    def __init__(self, policy: Optional[HedgePolicy] = None):
+        self.policy = policy or HedgePolicy()
+        self.latencies = LatencyRecorder(max_samples=self.policy.window)
+        self.reads = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.budget_denied = 0
+        self._delay = self.policy.initial_delay
+
+    def delay(self) -> float:
+        """Seconds to wait for the first attempt before hedging."""
+        return self._delay
+
+    async def run(self, attempt: Callable[[], Awaitable[T]]) -> T:
+        """
+        Await attempt(), racing a second attempt() if the first is slow.
+
+        Returns the first successful result. If the winner failed while the
+        other attempt is still running, the other attempt's outcome is used.
+        Attempts still running on return (or cancellation) are cancelled.
+        """
+        self.reads += 1
+        started = time.perf_counter()
+        primary_finished: List[float] = []
+
+        async def timed_primary() -> T:
+            try:
+                return await attempt()
+            finally:
+                primary_finished.append(time.perf_counter())
+
+        primary = asyncio.ensure_future(timed_primary())
+        tasks = [primary]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self._delay)
+            if not done:
+                if self._within_budget():
+                    self.hedged += 1
+                    tasks.append(asyncio.ensure_future(attempt()))
+                else:
+                    self.budget_denied += 1
+            winner = await _first_success(tasks)
+            if winner is not primary:
+                self.hedge_wins += 1
+            result = winner.result()
+        finally:
+            # A primary still running here ran at least this long
+            self._observe((primary_finished or [time.perf_counter()])[0] - started)
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Return read, hedge and win counters plus the current delay."""
+        return {
+            "reads": self.reads,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "budget_denied": self.budget_denied,
+            "hedge_rate": round(self.hedged / self.reads, 4) if self.reads else 0.0,
+            "win_rate": round(self.hedge_wins / self.hedged, 4) if self.hedged else 0.0,
+            "delay_ms": round(self._delay * 1000, 3),
+        }
+
+    def _within_budget(self) -> bool:
+        return self.hedged + 1 <= self.policy.budget * self.reads
+
+    def _observe(self, seconds: float) -> None:
+        self.latencies.record(seconds)
+        policy = self.policy
+        if self.latencies.count >= policy.min_samples and (
+            self.latencies.count % policy.refresh_every == 0
+            or self.latencies.count == policy.min_samples
+        ):
+            pct = self.latencies.percentile(policy.percentile)
+            self._delay = min(max(pct, policy.min_delay), policy.max_delay)
+
+async def _first_success(tasks: list) -> asyncio.Future:
+    """Return the first task to succeed, or the last one to fail."""
+    pending = set(tasks)
+    while True:
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        # Prefer the original attempt when both finished in the same step
+        for task in sorted(done, key=tasks.index):
+            if task.exception() is None or not pending:
+                return task
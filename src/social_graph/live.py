@@ -0,0 +1,222 @@
+"""
+In-memory structures kept current by the change feed (see events.py).
+
+LiveSnapshot
+------------
+A GraphSnapshot plus the users and friendships added since it was taken.
+degree() and neighbors() answer from the base CSR arrays and the delta;
+snapshot() folds the delta into a fresh GraphSnapshot (rebuilt only when
+something changed), ready for LocalRecommender or local analytics.
+Re-published friendships (MERGE on an existing pair) are recognized and
+ignored, so degrees stay exact.
+
+RecommendationCache
+-------------------
+Caches recommend_top_k() results per (username, k) and drops the entries a
+new friendship can change: both users, their friends (whose mutual-friend
+counts with the other user change), and every cached list that contains
+either user (whose degree changed). Pass `neighbors` (e.g.
+LiveSnapshot.neighbors) to enable the friends rule; without it only the
+other two rules apply.
+
+Usage
+-----
+    live = LiveSnapshot(await fetch_snapshot())
+    cache = RecommendationCache(Recommender(), neighbors=live.neighbors)
+    change_bus.subscribe(live.handle)
+    change_bus.subscribe(cache.handle)
+"""
+
+import inspect
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .events import ChangeEvent, FriendshipAdded, UserAdded
+from .snapshot import GraphSnapshot
+
+class LiveSnapshot:
+    """
+    Graph snapshot updated incrementally from change events.
+
+    Attributes:
+        base: the last materialized GraphSnapshot.
+        pending: users and friendships added since `base` was built.
+    """
+
+    def __init__(self, snapshot: GraphSnapshot):
+        self.base = snapshot
+        self.pending = 0
+        self._new_users: Set[str] = set()
+        self._new_friends: Dict[str, Set[str]] = {}
+
+    def handle(self, events: List[ChangeEvent]) -> None:
+        """Apply a batch of change events (a ChangeBus handler)."""
+        for event in events:
+            if isinstance(event, UserAdded):
+                self._add_user(event.username)
+            elif isinstance(event, FriendshipAdded):
+                self._add_friendship(event.user1, event.user2)
+
+    def has_user(self, username: str) -> bool:
+        return username in self._new_users or self.base.id_of(username) is not None
+
+    def has_friendship(self, user_a: str, user_b: str) -> bool:
+        if user_b in self._new_friends.get(user_a, ()):
+            return True
+        a, b = self.base.id_of(user_a), self.base.id_of(user_b)
+        if a is None or b is None:
+            return False
+        row = self.base.neighbors(a)
+        i = int(np.searchsorted(row, b))
+        return i < len(row) and row[i] == b
+
+    def degree(self, username: str) -> int:
+        """Current number of friends of `username` (0 if unknown)."""
+        uid = self.base.id_of(username)
+        base = 0 if uid is None else int(self.base.indptr[uid + 1] - self.base.indptr[uid])
+        return base + len(self._new_friends.get(username, ()))
+
+    def neighbors(self, username: str) -> List[str]:
+        """Current friends of `username`, sorted."""
+        names = self.base.usernames
+        uid = self.base.id_of(username)
+        friends = set() if uid is None else {names[i] for i in self.base.neighbors(uid).tolist()}
+        return sorted(friends | self._new_friends.get(username, set()))
+
+    def snapshot(self) -> GraphSnapshot:
+        """Return a GraphSnapshot including every change applied so far."""
+        if self.pending:
+            src, dst = self.base.edge_arrays()
+            names = self.base.usernames
+            edges = [(names[s], names[d]) for s, d in zip(src.tolist(), dst.tolist())]
+            edges += [(a, b) for a, friends in self._new_friends.items() for b in friends if a < b]
+            self.base = GraphSnapshot.from_edges(list(names) + sorted(self._new_users), edges)
+            self._new_users.clear()
+            self._new_friends.clear()
+            self.pending = 0
+        return self.base
+
+    def _add_user(self, username: str) -> None:
+        if not self.has_user(username):
+            self._new_users.add(username)
+            self.pending += 1
+
+    def _add_friendship(self, user_a: str, user_b: str) -> None:
+        if user_a == user_b or self.has_friendship(user_a, user_b):
+            return
+        self._add_user(user_a)
+        self._add_user(user_b)
+        self._new_friends.setdefault(user_a, set()).add(user_b)
+        self._new_friends.setdefault(user_b, set()).add(user_a)
+        self.pending += 1
+
+class RecommendationCache:
+    """
+    LRU cache of recommend_top_k() results invalidated by change events.
+
+    Args:
+        recommender: object with an async recommend_top_k(username, k)
+            (Recommender) or a sync one (LocalRecommender).
+        neighbors: optional username -> current friends callable.
+        max_entries: cached (username, k) results kept.
+
+    Attributes:
+        hits, misses, invalidations: cache counters.
+    """
+
+    def __init__(
+        self,
+        recommender: Any,
+        neighbors: Optional[Callable[[str], Iterable[str]]] = None,
+        max_entries: int = 10_000,
+    ):
+        self.recommender = recommender
+        self.neighbors = neighbors
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries: "OrderedDict[Tuple[str, int], List[Dict[str, Any]]]" = OrderedDict()
+        # username -> cached keys for that user / whose result lists them
+        self._owned: Dict[str, Set[Tuple[str, int]]] = {}
+        self._mentions: Dict[str, Set[Tuple[str, int]]] = {}
+        self._generation = 0
+
+    async def recommend_top_k(self, username: str, k: int = 10) -> List[Dict[str, Any]]:
+        """Cached recommend_top_k(); a miss computes and stores the result."""
+        key = (username, k)
+        cached = self._entries.get(key)
+        if cached is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return list(cached)
+        self.misses += 1
+        generation = self._generation
+        result = self.recommender.recommend_top_k(username, k)
+        if inspect.isawaitable(result):
+            result = await result
+        # A change arrived while computing: the result may be stale
+        if generation == self._generation and not getattr(result, "partial", False):
+            self._store(key, list(result))
+        return list(result)
+
+    def handle(self, events: List[ChangeEvent]) -> None:
+        """Drop the entries a batch of change events can affect (a ChangeBus handler)."""
+        owners: Set[str] = set()
+        changed: Set[str] = set()
+        for event in events:
+            if isinstance(event, UserAdded):
+                owners.add(event.username)
+            elif isinstance(event, FriendshipAdded):
+                changed.update((event.user1, event.user2))
+                if self.neighbors is not None:
+                    owners.update(self.neighbors(event.user1))
+                    owners.update(self.neighbors(event.user2))
+        owners |= changed
+        if not owners:
+            return
+        self._generation += 1
+        stale: Set[Tuple[str, int]] = set()
+        for username in owners:
+            stale |= self._owned.get(username, set())
+        for username in changed:
+            stale |= self._mentions.get(username, set())
+        for key in stale:
+            self._evict(key)
+        self.invalidations += len(stale)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+        }
+
+    def _store(self, key: Tuple[str, int], result: List[Dict[str, Any]]) -> None:
+        self._entries[key] = result
+        self._owned.setdefault(key[0], set()).add(key)
+        for row in result:
+            self._mentions.setdefault(row["username"], set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._evict(next(iter(self._entries)))
+
+    def _evict(self, key: Tuple[str, int]) -> None:
+        result = self._entries.pop(key, None)
+        if result is None:
+            return
+        _unindex(self._owned, key[0], key)
+        for row in result:
+            _unindex(self._mentions, row["username"], key)
+
+def _unindex(index: Dict[str, Set[Tuple[str, int]]], username: str, key: Tuple[str, int]) -> None:
+    keys = index.get(username)
+    if keys is not None:
+        keys.discard(key)
+        if not keys:
+            del index[username]
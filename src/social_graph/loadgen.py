@@ -0,0 +1,151 @@
+"""
+Async load generator for the service and recommender APIs.
+
+Overview
+--------
+run_load() drives a weighted mix of async operations for a fixed duration
+in one of two modes:
+
+- closed loop (rate=None): `concurrency` workers issue requests back to
+  back, which finds the throughput ceiling.
+- open loop (rate=N): requests arrive as a Poisson process at N/s whatever
+  the system does. Latency is measured from the scheduled arrival time, so
+  queueing delay is not hidden (no coordinated omission). At most
+  `concurrency` requests are in flight; arrivals beyond that are shed and
+  counted.
+
+The CLI lives in scripts/load_test.py.
+"""
+
+import asyncio
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .metrics import LatencyRecorder
+
+@dataclass(slots=True)
+class Operation:
+    """One entry of the request mix: `call(rng)` is awaited per request."""
+    name: str
+    weight: float
+    call: Callable[[random.Random], Awaitable[Any]]
+
+@dataclass(slots=True)
+class LoadResult:
+    """Live and final counters of a load run."""
+    latency: Dict[str, LatencyRecorder] = field(default_factory=dict)
+    errors: Dict[str, int] = field(default_factory=dict)
+    shed: int = 0
+    started_at: float = 0.0
+    finished_at: Optional[float] = None
+
+    @property
+    def completed(self) -> int:
+        return sum(r.count for r in self.latency.values())
+
+    @property
+    def elapsed(self) -> float:
+        end = self.finished_at if self.finished_at is not None else time.perf_counter()
+        return max(end - self.started_at, 1e-9)
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Per-operation throughput, latency percentiles and error rate."""
+        rows: Dict[str, Dict[str, Any]] = {}
+        for name in sorted(set(self.latency) | set(self.errors)):
+            recorder = self.latency.get(name, LatencyRecorder())
+            errors = self.errors.get(name, 0)
+            attempts = recorder.count + errors
+            rows[name] = {
+                "throughput_per_s": round(recorder.count / self.elapsed, 3),
+                "error_rate": round(errors / attempts, 4) if attempts else 0.0,
+                "errors": errors,
+                **recorder.summary(),
+            }
+        return rows
+
+async def run_load(
+    operations: List[Operation],
+    duration: float,
+    concurrency: int = 10,
+    rate: Optional[float] = None,
+    seed: int = 0,
+    on_progress: Optional[Callable[[LoadResult], None]] = None,
+    progress_interval: float = 1.0,
+) -> LoadResult:
+    """
+    Run the operation mix for `duration` seconds.
+
+    Args:
+        operations: weighted request mix.
+        duration: run time in seconds.
+        concurrency: closed loop: number of workers; open loop: in-flight cap.
+        rate: open-loop arrival rate per second (None = closed loop).
+        seed: seed for operation choice and arrival times.
+        on_progress: called every `progress_interval` seconds with the live result.
+
+    Returns:
+        LoadResult with per-operation latency recorders and error counts.
+    """
+    if not operations:
+        raise ValueError("operations must not be empty")
+    rng = random.Random(seed)
+    weights = [op.weight for op in operations]
+    result = LoadResult(
+        latency={op.name: LatencyRecorder() for op in operations},
+        started_at=time.perf_counter(),
+    )
+    deadline = result.started_at + duration
+
+    async def execute(op: Operation, started: float) -> None:
+        try:
+            await op.call(rng)
+        except Exception:
+            result.errors[op.name] = result.errors.get(op.name, 0) + 1
+        else:
+            result.latency[op.name].record(time.perf_counter() - started)
+
+    def pick() -> Operation:
+        return rng.choices(operations, weights)[0]
+
+    async def closed_loop_worker() -> None:
+        while time.perf_counter() < deadline:
+            await execute(pick(), time.perf_counter())
+
+    async def open_loop() -> None:
+        in_flight: set = set()
+        scheduled = result.started_at
+        while True:
+            scheduled += rng.expovariate(rate)
+            if scheduled >= deadline:
+                break
+            await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+            if len(in_flight) >= concurrency:
+                result.shed += 1
+                continue
+            task = asyncio.create_task(execute(pick(), scheduled))
+            in_flight.add(task)
+            task.add_done_callback(in_flight.discard)
+        if in_flight:
+            await asyncio.gather(*in_flight)
+
+    async def report() -> None:
+        while True:
+            await asyncio.sleep(progress_interval)
+            on_progress(result)
+
+    reporter = asyncio.create_task(report()) if on_progress else None
+    try:
+        if rate is None:
+            await asyncio.gather(*(closed_loop_worker() for _ in range(concurrency)))
+        else:
+            await open_loop()
+    finally:
+        result.finished_at = time.perf_counter()
+        if reporter is not None:
+            reporter.cancel()
+
+    if on_progress is not None:
+        on_progress(result)
+    return result
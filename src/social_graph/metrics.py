@@ -0,0 +1,65 @@
+"""
+Lightweight latency metrics shared by benchmarks, load tests and drivers.
+
+LatencyRecorder keeps raw samples (seconds) and reports nearest-rank
+percentiles, so results are exact and reproducible for a given run.
+"""
+
+import math
+from typing import Dict, List, Optional
+
+class LatencyRecorder:
+    """
+    Collect latency samples and summarize them as percentiles.
+
+    Attributes:
+        max_samples: keep only the most recent N samples (None = unbounded).
+    """
+
+    def __init__(self, max_samples: Optional[int] = None):
+        self.max_samples = max_samples
+        self._samples: List[float] = []
+        self.count = 0
+        self.total = 0.0
+
+    def record(self, seconds: float) -> None:
+        """Add one latency sample in seconds."""
+        self.count += 1
+        self.total += seconds
+        self._samples.append(seconds)
+        if self.max_samples is not None and len(self._samples) > self.max_samples:
+            # Amortized trim: drop the oldest half of the window at once
+            del self._samples[: len(self._samples) - self.max_samples // 2]
+
+    def percentile(self, pct: float) -> float:
+        """Return the nearest-rank percentile (0-100) of the retained samples."""
+        if not self._samples:
+            return 0.0
+        return _nearest_rank(sorted(self._samples), pct)
+
+    def summary(self) -> Dict[str, float]:
+        """
+        Return count, mean, p50/p95/p99/p999 and max, latencies in milliseconds.
+        """
+        if not self._samples:
+            return {"count": 0, "mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0,
+                    "p99_ms": 0.0, "p999_ms": 0.0, "max_ms": 0.0}
+        ordered = sorted(self._samples)
+
+        def pick(pct: float) -> float:
+            return round(_nearest_rank(ordered, pct) * 1000, 3)
+
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total / self.count * 1000, 3),
+            "p50_ms": pick(50),
+            "p95_ms": pick(95),
+            "p99_ms": pick(99),
+            "p999_ms": pick(99.9),
+            "max_ms": round(ordered[-1] * 1000, 3),
+        }
+
+def _nearest_rank(ordered: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted, non-empty list."""
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
@@ -0,0 +1,104 @@
+"""
+Data migrations for the friendship graph.
+
+Single-edge storage
+-------------------
+Friendships were originally stored as two directed FRIEND_WITH
+relationships, one each way. With FRIENDSHIP_STORAGE=single (see config),
+service writes store one relationship per friendship, pointing from the
+lower to the higher username, which halves relationship storage and the
+work of every traversal.
+
+Every read, in either storage mode, matches FRIEND_WITH undirected with
+DISTINCT, so both layouts (and a graph halfway through the migration)
+answer the same, and a process still running with "double" reads a
+collapsed pair correctly. Switch FRIENDSHIP_STORAGE to "single" for every
+writer first (a double-mode writer re-creates the reverse relationship of
+each friendship it touches), then run collapse_duplicate_friendships() to
+delete the redundant reverse relationships; rerunning it is a no-op. The
+CLI lives in scripts/migrate_friendships.py.
+
+Snapshot versions
+-----------------
+create_version_indexes() creates the range indexes on the `created_at`
+stamps that analytics_local.fetch_snapshot_version() reads (see
+graph_version.py) and deletes the GraphMeta counter node an earlier
+version kept. Run it once per database; rerunning it is a no-op.
+"""
+
+from typing import Optional
+
+from .admission import batch_priority
+from .db_async import get_driver, run_batched, AsyncNeo4jDriver
+from .graph_version import VERSION_INDEXES
+
+@batch_priority
+async def count_duplicate_friendships(driver: Optional[AsyncNeo4jDriver] = None) -> int:
+    """
+    Return the number of friendships still stored as two relationships.
+
+    Args:
+        driver: optional injected driver instance.
+
+    Returns:
+        int: pairs with a FRIEND_WITH relationship in both directions.
+    """
+    query = """
+    MATCH (u:User)-[:FRIEND_WITH]->(v:User)
+    WHERE u.username > v.username AND EXISTS { (v)-[:FRIEND_WITH]->(u) }
+    RETURN count(*) AS duplicates
+    """
+    if driver is None:
+        driver = get_driver()
+    result = await driver.execute_read(query, {})
+    return result[0]["duplicates"] if result else 0
+
+async def collapse_duplicate_friendships(
+        batch_size: int = 1_000,
+        driver: Optional[AsyncNeo4jDriver] = None
+    ) -> int:
+    """
+    Keep one relationship per friendship, deleting the reverse duplicates.
+
+    Users are visited in keyset-paginated batches (ordered by username);
+    for each user u, an outgoing u -> v relationship is deleted when
+    u.username > v.username and v -> u also exists, so the remaining
+    relationship always points from the lower to the higher username.
+    Friendships stored only once are left as they are.
+
+    Args:
+        batch_size: users visited per write query.
+        driver: optional injected driver instance.
+
+    Returns:
+        int: number of relationships deleted.
+    """
+    batch_query = """
+    MATCH (u:User)
+    WHERE $after IS NULL OR u.username > $after
+    WITH u ORDER BY u.username LIMIT $batch_size
+    OPTIONAL MATCH (u)-[r:FRIEND_WITH]->(v:User)
+    WHERE u.username > v.username AND EXISTS { (v)-[:FRIEND_WITH]->(u) }
+    WITH u, collect(r) AS duplicates
+    FOREACH (r IN duplicates | DELETE r)
+    RETURN count(u) AS updated, max(u.username) AS last, sum(size(duplicates)) AS removed
+    """
+    if driver is None:
+        driver = get_driver()
+    rows = await run_batched(batch_query, {}, batch_size, driver)
+    return sum(row.get("removed", 0) for row in rows)
+
+@batch_priority
+async def create_version_indexes(driver: Optional[AsyncNeo4jDriver] = None) -> None:
+    """
+    Index the `created_at` stamps behind the snapshot version and remove the
+    retired GraphMeta counter node.
+
+    Args:
+        driver: optional injected driver instance.
+    """
+    if driver is None:
+        driver = get_driver()
+    for statement in VERSION_INDEXES:
+        await driver.execute_write(statement, {})
+    await driver.execute_write("MATCH (meta:GraphMeta) DETACH DELETE meta", {})
@@ -0,0 +1,193 @@
+"""
+Degrees-of-separation queries ("how am I connected to X?").
+
+Two modes answer the same question:
+
+- shortest_path(): bounded-depth Cypher `shortestPath` inside Neo4j, for
+  one-off lookups against live data.
+- shortest_path_local() / shortest_paths_local(): bidirectional BFS over a
+  GraphSnapshot using integer ids and numpy frontiers, for batches of pairs
+  without round trips.
+
+Both return the path as a list of usernames from source to target, or None
+when the users are unknown or further apart than `max_hops`. The hop cut-off
+keeps latency bounded on large graphs: the search never looks beyond
+`max_hops` edges in total.
+"""
+
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .db_async import get_driver, AsyncNeo4jDriver
+from .snapshot import GraphSnapshot
+
+DEFAULT_MAX_HOPS = 6
+
+async def shortest_path(
+        source: str,
+        target: str,
+        max_hops: int = DEFAULT_MAX_HOPS,
+        driver: Optional[AsyncNeo4jDriver] = None
+    ) -> Optional[List[str]]:
+    """
+    Return one shortest friendship path between two users, computed in Neo4j.
+
+    Args:
+        source: starting username.
+        target: destination username.
+        max_hops: maximum path length in edges (Cypher requires the bound
+            as a literal, so it is validated before being inlined).
+        driver: optional injected driver instance.
+
+    Returns:
+        [source, ..., target], or None when no path of at most max_hops exists.
+
+    Raises:
+        ValueError: if max_hops is not a positive integer.
+    """
+    max_hops = _validate_max_hops(max_hops)
+    if driver is None:
+        driver = get_driver()
+
+    if source == target:
+        query = """
+        MATCH (u:User {username: $source})
+        RETURN [u.username] AS path
+        """
+    else:
+        query = f"""
+        MATCH (a:User {{username: $source}}), (b:User {{username: $target}})
+        MATCH p = shortestPath((a)-[:FRIEND_WITH*..{max_hops}]-(b))
+        RETURN [n IN nodes(p) | n.username] AS path
+        """
+    result = await driver.execute_read(query, {"source": source, "target": target})
+    return result[0]["path"] if result else None
+
+def shortest_path_local(
+        snapshot: GraphSnapshot,
+        source: str,
+        target: str,
+        max_hops: int = DEFAULT_MAX_HOPS
+    ) -> Optional[List[str]]:
+    """
+    Return one shortest path between two users using the snapshot.
+
+    Same contract as shortest_path(); ties between equally short paths are
+    broken towards the lowest meeting-node id, so results are deterministic.
+    """
+    return shortest_paths_local(snapshot, [(source, target)], max_hops)[0]
+
+def shortest_paths_local(
+        snapshot: GraphSnapshot,
+        pairs: Iterable[Tuple[str, str]],
+        max_hops: int = DEFAULT_MAX_HOPS
+    ) -> List[Optional[List[str]]]:
+    """
+    Answer many (source, target) path queries over one snapshot.
+
+    The per-node distance and parent arrays are allocated once for the whole
+    batch and only the entries a search touched are reset afterwards, so a
+    query costs time proportional to the nodes it visits, not to the graph.
+
+    Returns:
+        One path (or None) per pair, in input order.
+    """
+    max_hops = _validate_max_hops(max_hops)
+    search = _BidirectionalBFS(snapshot)
+    names = snapshot.usernames
+    paths: List[Optional[List[str]]] = []
+    for source, target in pairs:
+        src, dst = snapshot.id_of(source), snapshot.id_of(target)
+        if src is None or dst is None:
+            paths.append(None)
+            continue
+        ids = search.path(src, dst, max_hops)
+        paths.append(None if ids is None else [names[i] for i in ids])
+    return paths
+
+def _validate_max_hops(max_hops: int) -> int:
+    if isinstance(max_hops, bool) or not isinstance(max_hops, (int, np.integer)) or max_hops < 1:
+        raise ValueError(f"max_hops must be a positive integer, got {max_hops!r}")
+    return int(max_hops)
+
+class _BidirectionalBFS:
+    """Reusable search state for bidirectional BFS over one snapshot."""
+
+    def __init__(self, snapshot: GraphSnapshot):
+        n = snapshot.num_nodes
+        self.indptr = snapshot.indptr
+        self.indices = snapshot.indices
+        # Index 0 = forward (from source), 1 = backward (from target)
+        self.dist = np.full((2, n), -1, dtype=np.int32)
+        self.parent = np.full((2, n), -1, dtype=np.int32)
+
+    def path(self, src: int, dst: int, max_hops: int) -> Optional[List[int]]:
+        if src == dst:
+            return [src]
+        touched: List[np.ndarray] = []
+        try:
+            return self._search(src, dst, max_hops, touched)
+        finally:
+            for side, nodes in touched:
+                self.dist[side, nodes] = -1
+                self.parent[side, nodes] = -1
+
+    def _search(self, src: int, dst: int, max_hops: int, touched: list) -> Optional[List[int]]:
+        frontiers = [np.array([src], dtype=np.int64), np.array([dst], dtype=np.int64)]
+        depth = [0, 0]
+        for side, start in ((0, src), (1, dst)):
+            self.dist[side, start] = 0
+            touched.append((side, frontiers[side]))
+
+        while depth[0] + depth[1] < max_hops:
+            # Expand the side whose frontier has fewer outgoing edges
+            cost = [self._frontier_edges(f) for f in frontiers]
+            side = 0 if cost[0] <= cost[1] else 1
+            if cost[side] == 0:
+                return None
+
+            nbrs, parents = self._expand(frontiers[side])
+            fresh = self.dist[side, nbrs] == -1
+            # First occurrence wins; np.unique keeps the lowest-id parent because
+            # frontiers are sorted and neighbor lists are sorted per row
+            nbrs, first = np.unique(nbrs[fresh], return_index=True)
+            if len(nbrs) == 0:
+                return None
+            depth[side] += 1
+            self.dist[side, nbrs] = depth[side]
+            self.parent[side, nbrs] = parents[fresh][first]
+            touched.append((side, nbrs))
+            frontiers[side] = nbrs
+
+            other = self.dist[1 - side, nbrs]
+            met = nbrs[other != -1]
+            if len(met):
+                total = depth[side] + other[other != -1]
+                meet = int(met[np.argmin(total)])
+                return self._trace(meet)
+        return None
+
+    def _frontier_edges(self, frontier: np.ndarray) -> int:
+        return int((self.indptr[frontier + 1] - self.indptr[frontier]).sum())
+
+    def _expand(self, frontier: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (neighbor, parent) arrays for every edge leaving `frontier`."""
+        starts = self.indptr[frontier]
+        counts = self.indptr[frontier + 1] - starts
+        total = int(counts.sum())
+        # Position of each gathered edge inside its own row, then shift by row start
+        offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        nbrs = self.indices[np.repeat(starts, counts) + offsets].astype(np.int64)
+        return nbrs, np.repeat(frontier, counts)
+
+    def _trace(self, meet: int) -> List[int]:
+        forward = [meet]
+        while self.parent[0, forward[-1]] != -1:
+            forward.append(int(self.parent[0, forward[-1]]))
+        backward = []
+        node = meet
+        while self.parent[1, node] != -1:
+            node = int(self.parent[1, node])
+            backward.append(node)
+        return forward[::-1] + backward
@@ -0,0 +1,209 @@
+"""
+Offline, parallel precomputation of friend recommendations.
+
+Overview
+--------
+precompute_recommendations() splits all users into id-range partitions,
+ranks each partition in a worker process with LocalRecommender over a
+shared memory-mapped snapshot (analytics_local.load_snapshot), and writes
+the results back in UNWIND batches as User properties:
+
+    u.recommendations          [username, ...]
+    u.recommendation_scores    [score, ...]
+    u.recommendation_mutuals   [mutual_count, ...]
+
+Recommender.stored_recommendations() then serves them without traversal.
+
+Progress is checkpointed to a JSON file after each partition is written,
+so an interrupted run resumes where it stopped, provided the snapshot
+version and parameters are unchanged.
+
+The CLI lives in scripts/precompute_recommendations.py.
+"""
+
+import asyncio
+import json
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set
+
+from .admission import batch_priority
+from .analytics_runner import AnalyticsRunner
+from .db_async import get_driver, AsyncNeo4jDriver
+from .recommender_local import LocalRecommender
+from .snapshot import GraphSnapshot
+
+@dataclass(slots=True)
+class PrecomputeStats:
+    """Summary of a precompute run."""
+    partitions: int = 0
+    skipped_partitions: int = 0
+    users_written: int = 0
+
+@batch_priority
+async def precompute_recommendations(
+    snapshot: GraphSnapshot,
+    k: int = 10,
+    alpha: float = 0.7,
+    beta: float = 0.3,
+    partitions: int = 16,
+    workers: Optional[int] = None,
+    batch_size: int = 1_000,
+    checkpoint_path: Optional[str] = None,
+    driver: Optional[AsyncNeo4jDriver] = None,
+    runner: Optional[AnalyticsRunner] = None,
+) -> PrecomputeStats:
+    """
+    Compute recommend_top_k for every user and store the results in Neo4j.
+
+    Args:
+        snapshot: graph snapshot; a file-backed one (load_snapshot) is
+            mapped by the workers, any other is exported to shared memory
+            once for all partitions (AnalyticsRunner.shared()).
+        k, alpha, beta: same meaning as Recommender.recommend_top_k().
+        partitions: number of id-range partitions (units of checkpointing).
+        workers: process pool size when no `runner` is passed.
+        batch_size: users per UNWIND write query.
+        checkpoint_path: JSON progress file; enables resuming.
+        driver: optional injected driver instance.
+        runner: optional shared AnalyticsRunner.
+
+    Returns:
+        PrecomputeStats for this run.
+    """
+    if driver is None:
+        driver = get_driver()
+    ranges = partition_ranges(snapshot.num_nodes, partitions)
+    params = {"k": k, "alpha": alpha, "beta": beta, "partitions": len(ranges)}
+    done = _load_checkpoint(checkpoint_path, snapshot.version, params)
+    stats = PrecomputeStats(partitions=len(ranges), skipped_partitions=len(done))
+
+    todo = [i for i in range(len(ranges)) if i not in done]
+    if not todo:
+        return stats
+
+    own_runner = runner is None
+    if own_runner:
+        runner = AnalyticsRunner(max_workers=workers)
+    jobs: Dict[asyncio.Future, int] = {}
+    try:
+        # Every partition job attaches to one shared copy of the snapshot,
+        # so memory does not grow with the number of partitions
+        with runner.shared(snapshot) as shared:
+            jobs = {
+                asyncio.ensure_future(
+                    runner.run(_recommend_partition, shared, *ranges[i], k, alpha, beta)
+                ): i
+                for i in todo
+            }
+            try:
+                pending = set(jobs)
+                while pending:
+                    finished, pending = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for job in finished:
+                        rows = job.result()
+                        stats.users_written += await write_recommendations(
+                            rows, driver, batch_size
+                        )
+                        done.add(jobs[job])
+                        _save_checkpoint(checkpoint_path, snapshot.version, params, done)
+            except BaseException:
+                for job in jobs:
+                    job.cancel()
+                await asyncio.gather(*jobs, return_exceptions=True)
+                raise
+    finally:
+        if own_runner:
+            runner.close()
+    return stats
+
+@batch_priority
+async def write_recommendations(
+    rows: List[Dict[str, Any]],
+    driver: AsyncNeo4jDriver,
+    batch_size: int = 1_000,
+) -> int:
+    """
+    Store precomputed rows ({username, recommendations, scores, mutuals})
+    as User properties in UNWIND batches. Returns the number of users written.
+    """
+    query = """
+    UNWIND $rows AS row
+    MATCH (u:User {username: row.username})
+    SET u.recommendations = row.recommendations,
+        u.recommendation_scores = row.scores,
+        u.recommendation_mutuals = row.mutuals
+    RETURN count(u) AS written
+    """
+    written = 0
+    for start in range(0, len(rows), batch_size):
+        result = await driver.execute_write(query, {"rows": rows[start:start + batch_size]})
+        written += result[0]["written"] if result else 0
+    return written
+
+def partition_ranges(num_users: int, partitions: int) -> List[tuple]:
+    """Split ids [0, num_users) into up to `partitions` contiguous (start, stop) ranges."""
+    partitions = max(1, min(partitions, num_users))
+    step, extra = divmod(num_users, partitions)
+    ranges = []
+    start = 0
+    for i in range(partitions):
+        stop = start + step + (1 if i < extra else 0)
+        if stop > start:
+            ranges.append((start, stop))
+        start = stop
+    return ranges
+
+def _recommend_partition(
+    snapshot: GraphSnapshot,
+    start: int,
+    stop: int,
+    k: int,
+    alpha: float,
+    beta: float,
+) -> List[Dict[str, Any]]:
+    """Worker entry point: rank users with ids in [start, stop)."""
+    recommender = LocalRecommender(snapshot, alpha=alpha, beta=beta)
+    names = snapshot.usernames
+    rows = []
+    for uid in range(start, stop):
+        ranked = recommender.recommend_by_id(uid, k)
+        rows.append({
+            "username": names[uid],
+            "recommendations": [r["username"] for r in ranked],
+            "scores": [r["score"] for r in ranked],
+            "mutuals": [r["mutuals"] for r in ranked],
+        })
+    return rows
+
+def _load_checkpoint(
+    path: Optional[str],
+    version: Optional[str],
+    params: Dict[str, Any],
+) -> Set[int]:
+    """Return completed partition indexes, or an empty set if not resumable."""
+    if path is None or not os.path.exists(path):
+        return set()
+    with open(path) as f:
+        state = json.load(f)
+    if state.get("snapshot_version") != version or state.get("params") != params:
+        return set()
+    return set(state.get("completed", []))
+
+def _save_checkpoint(
+    path: Optional[str],
+    version: Optional[str],
+    params: Dict[str, Any],
+    done: Set[int],
+) -> None:
+    """Atomically write the checkpoint file."""
+    if path is None:
+        return
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(
+            {"snapshot_version": version, "params": params, "completed": sorted(done)}, f
+        )
+    os.replace(tmp_path, path)
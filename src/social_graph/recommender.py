@@ -8,12 +8,204 @@ simple scoring heuristics.
 
 All methods are asynchronous and integrate with the shared
 AsyncNeo4jDriver for non-blocking Neo4j operations.
+
+Profiling
+---------
+recommend_top_k(..., profile=True) (or a `profile_hook` on the Recommender)
+records a RecommendationProfile per request: wall time per stage, queries
+issued, rows transferred and candidates considered. When profiling is off
+the only overhead is a context-variable lookup per stage.
+
+Unprofiled recommend_top_k() calls for the same (username, k) that overlap
+in time are coalesced into one computation (see `Recommender.coalescer`).
+
+Scorers
+-------
+By default candidates are ranked with compute_score(). Passing a `scorer`
+(a scorers.Scorer or a name such as "jaccard", "adamic_adar",
+"resource_allocation" or "degree_penalty") instead fetches the features of
+all candidates in one aggregated query and scores them in one pass.
+
+Candidate sources
+-----------------
+A `candidate_source` callable (username, limit) -> rows (sync or async)
+adds candidates beyond friends-of-friends, e.g. ppr.PPRCandidateSource for
+users with sparse networks. Its rows use the candidate-feature row shape;
+they are merged after the 2nd-degree candidates and ranked by the same
+top-k heap.
+
+Batched mutual friends
+----------------------
+mutual_friends_many() answers mutual-friend counts (and optionally the
+first few mutual friends' names) for many user pairs in one UNWIND query,
+e.g. for pages that show "N mutual friends" badges on dozens of profiles.
+recommender_local.LocalRecommender.mutual_friends_many() is the snapshot
+equivalent.
+
+Read routing
+------------
+All queries are reads. A recommendation request runs its statements in
+one read unit of work (a single session and transaction on a reader,
+opened by the first query), so session setup is paid once per request
+rather than once per statement. The unit keeps its session, that
+session's pooled connection and, with admission control, one read slot
+from the first query until the request returns; nothing is released
+between statements.
+When the driver hedges reads, statements go through execute_read()
+individually instead, so each one can be hedged.
+
+Deadlines
+---------
+recommend_top_k(..., time_budget=0.05) bounds the request's wall time.
+Every query runs under asyncio.wait_for with the time left; when the budget
+runs out the in-flight query is cancelled, scoring stops, and the candidates
+ranked so far are returned with `result.partial` set to True. Returning
+closes the request's read unit of work, which releases its session,
+connection and admission slot.
 """
 
+import asyncio
+import inspect
 import math
 import heapq
-from typing import Any, List, Dict, Optional
+import time
+from contextlib import AsyncExitStack, asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import (
+    TYPE_CHECKING, Any, AsyncIterator, Awaitable, Callable, Iterator, List, Dict, Optional,
+    Sequence, Tuple, Union,
+)
 from .db_async import get_driver, AsyncNeo4jDriver
+from .singleflight import SingleFlight
+
+if TYPE_CHECKING:
+    # scorers needs numpy; only the scorer path imports it at runtime
+    from .scorers import Scorer
+
+@dataclass(slots=True)
+class RecommendationProfile:
+    """
+    Per-request cost breakdown of a recommend_top_k() call.
+
+    Attributes:
+        username: user the recommendations were computed for.
+        stage_seconds: wall time per stage ("candidate_discovery",
+            "scoring", "degree_lookup", "heap_selection"). degree_lookup is
+            nested inside scoring.
+        queries: number of Cypher queries issued.
+        rows: number of result rows transferred.
+        candidates: number of candidates considered for ranking.
+        total_seconds: wall time of the whole request.
+    """
+    username: str
+    stage_seconds: Dict[str, float] = field(default_factory=dict)
+    queries: int = 0
+    rows: int = 0
+    candidates: int = 0
+    total_seconds: float = 0.0
+
+class Recommendations(List[Dict[str, Any]]):
+    """
+    Ranked recommendation dicts, as a plain list.
+
+    Attributes:
+        profile: RecommendationProfile when profiling was requested, else None.
+        partial: True when the time budget ran out before every candidate
+            was scored; the list then holds the best candidates found so far.
+    """
+
+    def __init__(
+        self,
+        items=(),
+        profile: Optional[RecommendationProfile] = None,
+        partial: bool = False,
+    ):
+        super().__init__(items)
+        self.profile = profile
+        self.partial = partial
+
+class _DeadlineExceeded(Exception):
+    """Raised inside a request once its time budget is used up."""
+
+class _Deadline:
+    """Absolute deadline of one recommend_top_k() call."""
+
+    def __init__(self, time_budget: float):
+        self.expires_at = time.monotonic() + time_budget
+        self.expired = False
+
+    def remaining(self) -> float:
+        return self.expires_at - time.monotonic()
+
+    async def run(self, awaitable: Awaitable[Any], share: float = 1.0) -> Any:
+        """
+        Await `awaitable` for at most `share` of the remaining time; on expiry
+        it is cancelled and _DeadlineExceeded is raised.
+        """
+        remaining = self.remaining()
+        if remaining <= 0:
+            if inspect.iscoroutine(awaitable):
+                awaitable.close()
+            self.expired = True
+            raise _DeadlineExceeded()
+        try:
+            return await asyncio.wait_for(awaitable, remaining * share)
+        except asyncio.TimeoutError:
+            self.expired = True
+            raise _DeadlineExceeded() from None
+
+# (username, limit) -> candidate-feature rows, sync or async
+CandidateSource = Callable[
+    [str, int], Union[List[Dict[str, Any]], Awaitable[List[Dict[str, Any]]]]
+]
+
+# Profile of the request running in the current task, if any
+_active_profile: ContextVar[Optional[RecommendationProfile]] = ContextVar(
+    "recommendation_profile", default=None
+)
+
+# Deadline of the request running in the current task, if any
+_active_deadline: ContextVar[Optional[_Deadline]] = ContextVar(
+    "recommendation_deadline", default=None
+)
+
+class _LazyReadUnit:
+    """A request's read unit of work, opened on its first query."""
+
+    def __init__(self, driver: AsyncNeo4jDriver):
+        self._driver = driver
+        self._stack = AsyncExitStack()
+        self._uow = None
+
+    async def run(self, query: str, params: dict) -> list[dict]:
+        if self._uow is None:
+            self._uow = await self._stack.enter_async_context(
+                self._driver.unit_of_work(read_only=True)
+            )
+        return await self._uow.run(query, params)
+
+    async def close(self) -> None:
+        await self._stack.aclose()
+
+# Read unit of work of the request running in the current task, if any
+_active_unit: ContextVar[Optional[_LazyReadUnit]] = ContextVar(
+    "recommendation_unit", default=None
+)
+
+@contextmanager
+def _stage(name: str) -> Iterator[None]:
+    """Accumulate wall time for `name` on the active profile (no-op when off)."""
+    profile = _active_profile.get()
+    if profile is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        profile.stage_seconds[name] = profile.stage_seconds.get(name, 0.0) + elapsed
 
 class Recommender:
     """
@@ -23,6 +215,13 @@ class Recommender:
         driver: Optional shared async Neo4j driver.
         alpha: Weight for mutual friend count in scoring.
         beta:  Weight for degree normalization penalty.
+        profile_hook: Optional callback receiving a RecommendationProfile
+            for every recommend_top_k() call.
+        coalescer: SingleFlight shared by identical concurrent
+            recommend_top_k() calls (see coalescer.stats()).
+        scorer: Optional Scorer used to rank candidates from batched
+            features; None keeps the per-candidate compute_score() path.
+        candidate_source: Optional extra candidate source (see module docs).
     """
 
     def __init__(
@@ -30,10 +229,20 @@ class Recommender:
         driver: Optional[AsyncNeo4jDriver] = None,
         alpha: float = 0.7,
         beta: float = 0.3,
+        profile_hook: Optional[Callable[[RecommendationProfile], None]] = None,
+        scorer: Optional[Union[str, "Scorer"]] = None,
+        candidate_source: Optional[CandidateSource] = None,
     ):
         self.driver = driver or get_driver()
         self.alpha = alpha
         self.beta = beta
+        self.profile_hook = profile_hook
+        self.coalescer = SingleFlight()
+        self.scorer = None
+        if scorer is not None:
+            from .scorers import get_scorer
+            self.scorer = get_scorer(scorer, alpha, beta)
+        self.candidate_source = candidate_source
 
     # -------------------------------
     # Core Relationship Utilities
@@ -50,7 +259,7 @@ class Recommender:
         RETURN count(DISTINCT f) AS mutual_count
         """
         params = {"user_a": user_a, "user_b": user_b}
-        result = await self.driver.run_query(query, params)
+        result = await self._run_query(query, params)
         if not result:
             return 0
         return result[0].get("mutual_count", 0)
@@ -69,6 +278,53 @@ class Recommender:
         result = await self._run_query(query, params)
         return [r["mutual_friend"] for r in result if "mutual_friend" in r]
 
+    async def mutual_friends_many(
+        self, pairs: Sequence[Tuple[str, str]], names_limit: int = 0
+    ) -> List[Dict[str, Any]]:
+        """
+        Count mutual friends for many user pairs in a single query.
+
+        Args:
+            pairs: (user_a, user_b) pairs; duplicates are queried once.
+            names_limit: also return up to this many mutual friends per
+                pair (in username order); 0 returns counts only.
+
+        Returns:
+            One dict per input pair, in input order:
+            [{"user_a": "alice", "user_b": "bob", "mutual_count": 3,
+              "mutual_friends": ["carol", "dave"]}, ...]
+            Unknown users and (u, u) pairs have no mutual friends.
+        """
+        query = """
+        UNWIND $pairs AS pair
+        OPTIONAL MATCH (a:User {username: pair.user_a})-[:FRIEND_WITH]-(f:User)-[:FRIEND_WITH]-(b:User {username: pair.user_b})
+        WHERE a <> b
+        WITH pair, f ORDER BY f.username
+        WITH pair, collect(DISTINCT f.username) AS names
+        RETURN pair.idx AS idx, size(names) AS mutual_count, names[..$names_limit] AS mutual_friends
+        """
+        unique = list(dict.fromkeys((a, b) for a, b in pairs))
+        if not unique:
+            return []
+        params = {
+            "pairs": [{"idx": i, "user_a": a, "user_b": b} for i, (a, b) in enumerate(unique)],
+            "names_limit": max(names_limit, 0),
+        }
+        rows = {r["idx"]: r for r in await self._run_query(query, params)}
+        answers = {}
+        for i, (a, b) in enumerate(unique):
+            row = rows.get(i, {})
+            answers[a, b] = (row.get("mutual_count", 0), row.get("mutual_friends") or [])
+        return [
+            {
+                "user_a": a,
+                "user_b": b,
+                "mutual_count": answers[a, b][0],
+                "mutual_friends": list(answers[a, b][1]),
+            }
+            for a, b in pairs
+        ]
+
     # -------------------------------
     # Recommendation Algorithms
     # -------------------------------
@@ -112,7 +368,8 @@ class Recommender:
         """
         if mutual_count is None:
             mutual_count = await self.mutual_friend_count(user, candidate)
-        degree = await self._get_degree(candidate)
+        with _stage("degree_lookup"):
+            degree = await self._get_degree(candidate)
 
         # Defensive: avoid log(0)
         degree_penalty = math.log1p(degree)
@@ -121,8 +378,12 @@ class Recommender:
         return round(score, 4)
 
     async def recommend_top_k(
-        self, username: str, k: int = 10
-    ) -> List[Dict[str, Any]]:
+        self,
+        username: str,
+        k: int = 10,
+        profile: bool = False,
+        time_budget: Optional[float] = None,
+    ) -> Recommendations:
         """
         Generate top-k ranked friend recommendations for a user.
 
@@ -130,23 +391,194 @@ class Recommender:
           - suggest_friends_2nd_degree() for candidate discovery
           - compute_score() for ranking
 
+        Args:
+            profile: attach a RecommendationProfile to the result
+                (`result.profile`); also enabled by `profile_hook`.
+            time_budget: optional wall-time budget in seconds. When it runs
+                out, pending queries are cancelled and the best candidates
+                scored so far are returned with `result.partial` = True
+                (empty if candidate discovery itself did not finish).
+
         Returns a list of dicts with scoring metadata:
         [
             {"username": "bob", "score": 0.85, "mutuals": 3},
             {"username": "carol", "score": 0.65, "mutuals": 2},
         ]
         """
+        if not profile and self.profile_hook is None and time_budget is None:
+            # Identical concurrent requests share one computation
+            shared = await self.coalescer.do(
+                ("recommend_top_k", username, k),
+                lambda: self._recommend_top_k(username, k),
+            )
+            return Recommendations(dict(r) for r in shared)
+
+        # Budgeted requests are not coalesced: each has its own deadline
+        deadline = None if time_budget is None else _Deadline(time_budget)
+        deadline_token = _active_deadline.set(deadline)
+        request_profile = None
+        if profile or self.profile_hook is not None:
+            request_profile = RecommendationProfile(username=username)
+        token = _active_profile.set(request_profile)
+        started = time.perf_counter()
+        try:
+            results = await self._recommend_top_k(username, k)
+        finally:
+            if request_profile is not None:
+                request_profile.total_seconds = time.perf_counter() - started
+            _active_profile.reset(token)
+            _active_deadline.reset(deadline_token)
+
+        if self.profile_hook is not None:
+            self.profile_hook(request_profile)
+        return Recommendations(
+            results,
+            request_profile if profile else None,
+            partial=deadline is not None and deadline.expired,
+        )
+
+    async def stored_recommendations(self, username: str) -> List[Dict[str, Any]]:
+        """
+        Return recommendations precomputed by the offline batch job
+        (see precompute.py) without any graph traversal.
+
+        Returns the same shape as recommend_top_k(), or [] when nothing
+        has been stored for the user.
+        """
+        query = """
+        MATCH (u:User {username: $username})
+        RETURN u.recommendations AS usernames,
+               u.recommendation_scores AS scores,
+               u.recommendation_mutuals AS mutuals
+        """
+        result = await self._run_query(query, {"username": username})
+        if not result or not result[0].get("usernames"):
+            return []
+        row = result[0]
+        return [
+            {"username": u, "score": sc, "mutuals": m}
+            for u, sc, m in zip(row["usernames"], row["scores"], row["mutuals"])
+        ]
+
+    # -------------------------------
+    # Internal Helpers
+    # -------------------------------
+
+    async def _recommend_top_k(
+        self, username: str, k: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Internal helper: candidate discovery followed by top-k ranking.
+        """
+        async with self._read_unit():
+            if self.scorer is not None:
+                return await self._recommend_scored(username, k)
+            return await self._recommend_heuristic(username, k)
+
+    async def _recommend_heuristic(
+        self, username: str, k: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Internal helper: rank candidates with compute_score().
+        """
         # Step 1: discover 2nd-degree candidates
-        candidates = await self.suggest_friends_2nd_degree(username, limit=k * 3)
+        with _stage("candidate_discovery"):
+            try:
+                candidates = await self.suggest_friends_2nd_degree(username, limit=k * 3)
+            except _DeadlineExceeded:
+                return []
+            candidates = await self._add_extra_candidates(username, candidates, k * 3)
         if not candidates:
             return []
 
         # Step 2: get top-k without doing a full sort
         return await self._get_top_k_candidates(username, candidates, k)
 
-    # -------------------------------
-    # Internal Helpers
-    # -------------------------------
+    async def _recommend_scored(
+        self, username: str, k: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Internal helper: rank candidates with self.scorer from features
+        fetched in a single query.
+        """
+        with _stage("candidate_discovery"):
+            try:
+                rows = await self._candidate_features(username, limit=k * 3)
+            except _DeadlineExceeded:
+                return []
+            rows = await self._add_extra_candidates(username, rows, k * 3)
+        if not rows:
+            return []
+        profile = _active_profile.get()
+        if profile is not None:
+            profile.candidates += len(rows)
+
+        with _stage("scoring"):
+            from .scorers import CandidateFeatures
+            features = CandidateFeatures.from_rows(rows)
+            scores = self.scorer.score(features)
+        with _stage("heap_selection"):
+            return _top_k_scored(
+                [r["username"] for r in rows], features.mutuals, scores, k, self.scorer.digits
+            )
+
+    async def _add_extra_candidates(
+        self, username: str, candidates: List[Dict[str, Any]], limit: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Internal helper: merge rows from self.candidate_source, if any.
+        Under a deadline an async source gets half of the remaining time,
+        keeping the rest for scoring; if it is not done by then it is
+        cancelled and skipped.
+        """
+        if self.candidate_source is None:
+            return candidates
+        extra = self.candidate_source(username, limit)
+        if inspect.isawaitable(extra):
+            deadline = _active_deadline.get()
+            try:
+                extra = await (extra if deadline is None else deadline.run(extra, share=0.5))
+            except _DeadlineExceeded:
+                return candidates
+        return _merge_candidates(candidates, extra)
+
+    async def _candidate_features(
+        self, username: str, limit: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Internal helper: the same candidates as suggest_friends_2nd_degree()
+        with every scorer feature, aggregated server-side in one query.
+        """
+        query = """
+        MATCH (u:User {username: $username})
+        CALL (u) {
+            MATCH (u)-[:FRIEND_WITH]-(x:User)
+            RETURN count(DISTINCT x) AS user_degree
+        }
+        MATCH (u)-[:FRIEND_WITH]-(f:User)
+        WITH DISTINCT u, user_degree, f
+        CALL (f) {
+            MATCH (f)-[:FRIEND_WITH]-(x:User)
+            RETURN count(DISTINCT x) AS f_degree
+        }
+        MATCH (f)-[:FRIEND_WITH]-(fof:User)
+        WHERE fof <> u AND NOT (u)-[:FRIEND_WITH]-(fof)
+        WITH DISTINCT user_degree, fof, f, f_degree
+        WITH user_degree, fof,
+             count(f) AS mutual_count,
+             sum(1.0 / log(f_degree)) AS adamic_adar,
+             sum(1.0 / f_degree) AS resource_allocation
+        ORDER BY mutual_count DESC, fof.username
+        LIMIT $limit
+        CALL (fof) {
+            MATCH (fof)-[:FRIEND_WITH]-(x:User)
+            RETURN count(DISTINCT x) AS degree
+        }
+        RETURN fof.username AS username, mutual_count, degree, user_degree,
+               adamic_adar, resource_allocation
+        ORDER BY mutual_count DESC, username
+        """
+        return await self._run_query(query, {"username": username, "limit": limit})
 
     async def _get_degree(self, username: str) -> int:
         """
@@ -167,9 +599,14 @@ class Recommender:
     ) -> List[Dict[str, Any]]:
         """
         Internal helper to compute scores and return only the top-K candidates.
-        Uses a bounded heap for efficiency.
+        Uses a bounded heap for efficiency. Candidates arrive in mutual-count
+        order, so when the deadline stops scoring early the heap already holds
+        the strongest candidates.
         """
         scored_heap = []
+        profile = _active_profile.get()
+        if profile is not None:
+            profile.candidates += len(candidates)
 
         for c in candidates:
             candidate_username = c["username"]
@@ -177,25 +614,102 @@ class Recommender:
 
             # future improvement: consider moving the await outside the for loop 
             # to parallelize score computations
-            score = await self.compute_score(username, candidate_username, mutuals)
-
-            item = (score, candidate_username, mutuals)
-            if len(scored_heap) < k:
-                heapq.heappush(scored_heap, item)
-            else:
-                # Keep only top-K highest scoring entries
-                heapq.heappushpop(scored_heap, item)
-
-        # Convert heap into sorted descending list by score, ascending username
-        scored = [
-            {"username": uname, "score": sc, "mutuals": m}
-            for sc, uname, m in sorted(scored_heap, key=lambda x: (-x[0], x[1]))
-        ]
+            with _stage("scoring"):
+                try:
+                    score = await self.compute_score(username, candidate_username, mutuals)
+                except _DeadlineExceeded:
+                    break
 
-        return scored
+            with _stage("heap_selection"):
+                _push_top_k(scored_heap, (score, candidate_username, mutuals), k)
+
+        with _stage("heap_selection"):
+            return _ranked(scored_heap)
+
+    @asynccontextmanager
+    async def _read_unit(self) -> AsyncIterator[None]:
+        """
+        Internal helper: route the current request's queries through one
+        read unit of work (see module docs).
+        """
+        if getattr(self.driver, "hedger", None) is not None or _active_unit.get() is not None:
+            yield
+            return
+        unit = _LazyReadUnit(self.driver)
+        token = _active_unit.set(unit)
+        try:
+            yield
+        finally:
+            _active_unit.reset(token)
+            await unit.close()
 
     async def _run_query(self, query: str, params: dict[str, Any]) -> list[dict]:
         """
-        Execute an asynchronous Cypher query using the shared driver.
+        Execute a read query in the request's unit of work (or on its own
+        read transaction), within the active request deadline if any.
         """
-        return await self.driver.run_query(query, params)
+        uow = _active_unit.get()
+        pending = uow.run(query, params) if uow is not None else self.driver.execute_read(query, params)
+        deadline = _active_deadline.get()
+        if deadline is None:
+            result = await pending
+        else:
+            result = await deadline.run(pending)
+        profile = _active_profile.get()
+        if profile is not None:
+            profile.queries += 1
+            profile.rows += len(result)
+        return result
+
+# -------------------------------
+# Top-K heap helpers (shared with the local recommender)
+# -------------------------------
+
+def _push_top_k(heap: List[tuple], item: tuple, k: int) -> None:
+    """
+    Push a (score, username, mutuals) item onto a bounded min-heap of size k.
+    """
+    if len(heap) < k:
+        heapq.heappush(heap, item)
+    else:
+        # Keep only top-K highest scoring entries
+        heapq.heappushpop(heap, item)
+
+def _top_k_scored(
+    usernames: Sequence[str],
+    mutuals: Sequence[int],
+    scores: Sequence[float],
+    k: int,
+    digits: int = 4,
+) -> List[Dict[str, Any]]:
+    """
+    Rank aligned candidate arrays with the bounded heap; scores are rounded
+    to `digits` decimals, like compute_score().
+    """
+    heap: List[tuple] = []
+    for uname, m, sc in zip(usernames, mutuals, scores):
+        _push_top_k(heap, (round(float(sc), digits), uname, int(m)), k)
+    return _ranked(heap)
+
+def _merge_candidates(
+    primary: List[Dict[str, Any]], extra: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """
+    Append candidates from `extra` that are not in `primary`. Candidates in
+    both keep the primary row's values and gain the extra row's other keys
+    (e.g. "ppr").
+    """
+    by_name = {r["username"]: r for r in extra}
+    merged = [{**by_name.get(r["username"], {}), **r} for r in primary]
+    seen = {r["username"] for r in primary}
+    merged.extend(r for r in extra if r["username"] not in seen)
+    return merged
+
+def _ranked(heap: List[tuple]) -> List[Dict[str, Any]]:
+    """
+    Convert the heap into a list sorted by score desc, then username asc.
+    """
+    return [
+        {"username": uname, "score": sc, "mutuals": m}
+        for sc, uname, m in sorted(heap, key=lambda x: (-x[0], x[1]))
+    ]
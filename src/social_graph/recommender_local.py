@@ -0,0 +1,298 @@
+"""
+Friend recommendations computed from an in-memory GraphSnapshot.
+
+LocalRecommender mirrors Recommender (same candidate limit, scoring formula,
+rounding and tie-breaking) but reads a CSR snapshot instead of issuing
+Cypher, so it can rank every user in a batch job without any round trips.
+
+Candidates and their scorer features are gathered in one vectorized pass
+over the user's friends' adjacency rows (see _candidates()). An optional
+`candidate_source` (e.g. ppr.PPRCandidateSource) adds candidates beyond two
+hops, merged exactly as in Recommender.
+
+Exclusions are vectorized masks (see exclusion.py): each request marks the
+user and their friends in an IdBitset over snapshot ids, and an optional
+`dismissed` BloomFilter of (user, candidate) pair keys drops blocked or
+dismissed candidates. memory_usage() reports their size.
+
+mutual_friends_many() intersects the sorted adjacency rows of many user
+pairs at once: each row is tagged with its pair's index, so one
+np.intersect1d over the tagged rows yields every pair's mutual friends.
+"""
+
+import math
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .exclusion import BloomFilter, IdBitset, pair_keys
+from .recommender import CandidateSource, _merge_candidates, _top_k_scored
+from .scorers import CandidateFeatures, DegreePenaltyScorer, Scorer, get_scorer
+from .snapshot import GraphSnapshot
+
+class LocalRecommender:
+    """
+    Synchronous friend recommendation engine over a graph snapshot.
+
+    Attributes:
+        snapshot: CSR snapshot of the friendship graph.
+        alpha: Weight for mutual friend count in scoring.
+        beta:  Weight for degree normalization penalty.
+        scorer: Scorer ranking the candidates; defaults to the
+            alpha/beta degree-penalty formula of Recommender.compute_score().
+        candidate_source: optional synchronous extra candidate source.
+        dismissed: optional Bloom filter of (user, candidate) pair keys
+            (see exclusion.dismissal_filter) never recommended to the user.
+    """
+
+    def __init__(
+        self,
+        snapshot: GraphSnapshot,
+        alpha: float = 0.7,
+        beta: float = 0.3,
+        scorer: Optional[Union[str, Scorer]] = None,
+        candidate_source: Optional[CandidateSource] = None,
+        dismissed: Optional[BloomFilter] = None,
+    ):
+        self.snapshot = snapshot
+        self.alpha = alpha
+        self.beta = beta
+        self.candidate_source = candidate_source
+        self.dismissed = dismissed
+        self.scorer = (
+            DegreePenaltyScorer(alpha, beta) if scorer is None else get_scorer(scorer, alpha, beta)
+        )
+
+    def suggest_friends_2nd_degree(
+        self, username: str, limit: int = 10
+    ) -> List[Dict[str, Any]]:
+        """
+        Suggest friends-of-friends not already connected to the user,
+        ordered by mutual count desc, then username.
+        """
+        uid = self.snapshot.id_of(username)
+        if uid is None:
+            return []
+        ids, features = self._candidates(uid, limit)
+        names = self.snapshot.usernames
+        return [
+            {"username": names[c], "mutual_count": int(m)}
+            for c, m in zip(ids.tolist(), features.mutuals.tolist())
+        ]
+
+    def recommend_top_k(self, username: str, k: int = 10) -> List[Dict[str, Any]]:
+        """
+        Generate top-k ranked friend recommendations for a user.
+
+        Same contract as Recommender.recommend_top_k().
+        """
+        uid = self.snapshot.id_of(username)
+        if uid is None:
+            return []
+        return self.recommend_by_id(uid, k)
+
+    def mutual_friends_many(
+        self, pairs: Sequence[Tuple[str, str]], names_limit: int = 0
+    ) -> List[Dict[str, Any]]:
+        """
+        Count mutual friends for many user pairs in one vectorized pass.
+
+        Same contract as Recommender.mutual_friends_many().
+        """
+        snapshot = self.snapshot
+        a_ids = np.array([_id_or_missing(snapshot, a) for a, _ in pairs], dtype=np.int64)
+        b_ids = np.array([_id_or_missing(snapshot, b) for _, b in pairs], dtype=np.int64)
+        pair_of, common = _pair_intersections(snapshot, a_ids, b_ids)
+        counts = np.bincount(pair_of, minlength=len(pairs))
+
+        names = snapshot.usernames
+        first: List[List[str]] = [[] for _ in pairs]
+        if names_limit > 0:
+            # Within a pair, common ids ascend, i.e. follow username order
+            rank = np.arange(len(pair_of)) - np.searchsorted(pair_of, pair_of)
+            keep = rank < names_limit
+            for i, c in zip(pair_of[keep].tolist(), common[keep].tolist()):
+                first[i].append(names[c])
+        return [
+            {"user_a": a, "user_b": b, "mutual_count": int(counts[i]), "mutual_friends": first[i]}
+            for i, (a, b) in enumerate(pairs)
+        ]
+
+    def memory_usage(self) -> Dict[str, int]:
+        """
+        Bytes used by the exclusion structures: the bitset allocated per
+        request and the shared dismissal filter (0 without one).
+        """
+        return {
+            "friend_bitset_bytes": (self.snapshot.num_nodes + 7) >> 3,
+            "dismissed_filter_bytes": 0 if self.dismissed is None else self.dismissed.nbytes,
+        }
+
+    def compute_score(self, mutual_count: int, degree: int) -> float:
+        """
+        score = α * mutual_count - β * log(1 + degree(candidate))
+        """
+        score = self.alpha * mutual_count - self.beta * math.log1p(degree)
+        return round(score, 4)
+
+    def recommend_by_id(self, uid: int, k: int) -> List[Dict[str, Any]]:
+        """
+        recommend_top_k() for a snapshot node id, skipping the username
+        lookup; batch jobs that walk every id (precompute) call this.
+        """
+        ids, features = self._candidates(uid, k * 3)
+        names = self.snapshot.usernames
+        usernames = [names[c] for c in ids.tolist()]
+        if self.candidate_source is not None:
+            extra = self.candidate_source(names[uid], k * 3)
+            if self.dismissed is not None:
+                extra_ids = np.array(
+                    [_id_or_missing(self.snapshot, r["username"]) for r in extra], dtype=np.int64
+                )
+                keep = self._allowed(uid, extra_ids)
+                extra = [r for r, allowed in zip(extra, keep.tolist()) if allowed]
+            rows = _merge_candidates(_feature_rows(usernames, features), extra)
+            usernames = [r["username"] for r in rows]
+            features = CandidateFeatures.from_rows(rows)
+        if not usernames:
+            return []
+        scores = self.scorer.score(features)
+        return _top_k_scored(usernames, features.mutuals, scores, k, self.scorer.digits)
+
+    def _candidates(self, uid: int, limit: int) -> Tuple[np.ndarray, CandidateFeatures]:
+        """
+        Return the top `limit` friends-of-friends of `uid` (mutual count desc,
+        id asc; ids follow username order) with their scorer features.
+        """
+        ids, features = _fof_features(self.snapshot, uid)
+        if self.dismissed is not None:
+            keep = np.flatnonzero(self._allowed(uid, ids))
+            ids, features = ids[keep], _take(features, keep)
+        order = np.lexsort((ids, -features.mutuals))[:limit]
+        return ids[order], _take(features, order)
+
+    def _allowed(self, uid: int, ids: np.ndarray) -> np.ndarray:
+        """Mask of candidate ids not in the dismissal filter for `uid`."""
+        keys = pair_keys(np.full(len(ids), uid), ids, self.snapshot.num_nodes)
+        # Candidates outside the snapshot (id -1) cannot have been dismissed
+        return ~self.dismissed.contains(keys) | (ids < 0)
+
+def candidate_features(
+    snapshot: GraphSnapshot, uid: int, ids: np.ndarray
+) -> CandidateFeatures:
+    """
+    Scorer features of arbitrary candidate ids for user `uid`; candidates
+    sharing no friend with the user get zero mutual-friend features.
+    """
+    ids = np.asarray(ids, dtype=np.int64)
+    fof_ids, fof = _fof_features(snapshot, uid)
+    pos = np.searchsorted(fof_ids, ids)
+    found = pos < len(fof_ids)
+    found[found] = fof_ids[pos[found]] == ids[found]
+
+    mutuals = np.zeros(len(ids), dtype=np.int64)
+    adamic_adar = np.zeros(len(ids), dtype=np.float64)
+    resource_allocation = np.zeros(len(ids), dtype=np.float64)
+    mutuals[found] = fof.mutuals[pos[found]]
+    adamic_adar[found] = fof.adamic_adar[pos[found]]
+    resource_allocation[found] = fof.resource_allocation[pos[found]]
+    return CandidateFeatures(
+        mutuals=mutuals,
+        degree=snapshot.indptr[ids + 1] - snapshot.indptr[ids],
+        adamic_adar=adamic_adar,
+        resource_allocation=resource_allocation,
+        user_degree=fof.user_degree,
+    )
+
+def _fof_features(snapshot: GraphSnapshot, uid: int) -> Tuple[np.ndarray, CandidateFeatures]:
+    """
+    All friends-of-friends of `uid` (ascending ids) with their features,
+    from one vectorized pass over the friends' adjacency rows.
+    """
+    indptr = snapshot.indptr
+    friends = snapshot.neighbors(uid).astype(np.int64)
+
+    # Every (friend, friend-of-friend) edge, flattened
+    row_of, fof = _flatten_rows(snapshot, friends)
+    friend_degrees = indptr[friends + 1] - indptr[friends]
+    via = friend_degrees[row_of].astype(np.float64)
+
+    excluded = IdBitset.from_ids(snapshot.num_nodes, friends)
+    excluded.add([uid])
+    keep = ~excluded.contains(fof)
+    fof, via = fof[keep], via[keep]
+
+    ids, inverse, mutuals = np.unique(fof, return_inverse=True, return_counts=True)
+    ids = ids.astype(np.int64)
+    features = CandidateFeatures(
+        mutuals=mutuals.astype(np.int64),
+        degree=indptr[ids + 1] - indptr[ids],
+        # Mutual friends have degree >= 2, so the logs are positive
+        adamic_adar=np.bincount(inverse, weights=1.0 / np.log(via), minlength=len(ids)),
+        resource_allocation=np.bincount(inverse, weights=1.0 / via, minlength=len(ids)),
+        user_degree=len(friends),
+    )
+    return ids, features
+
+def _flatten_rows(snapshot: GraphSnapshot, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Concatenate the adjacency rows of `rows` (int64 ids); returns, per
+    entry, the position in `rows` it came from and the neighbor id.
+    """
+    indptr = snapshot.indptr
+    starts = indptr[rows]
+    lengths = indptr[rows + 1] - starts
+    total = int(lengths.sum())
+    row_of = np.repeat(np.arange(len(rows)), lengths)
+    offsets = np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return row_of, snapshot.indices[np.repeat(starts, lengths) + offsets].astype(np.int64)
+
+def _pair_intersections(
+    snapshot: GraphSnapshot, a_ids: np.ndarray, b_ids: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Mutual friends of every (a_ids[i], b_ids[i]) pair; ids of -1 (unknown
+    users) and pairs with a == b have none.
+
+    Returns (pair index, mutual friend id) arrays sorted by pair index,
+    then id.
+    """
+    valid = np.flatnonzero((a_ids >= 0) & (b_ids >= 0) & (a_ids != b_ids))
+    n = np.int64(snapshot.num_nodes)
+    # Key = pair * n + neighbor: unique within each side, so the sorted
+    # intersection of both sides is grouped by pair
+    a_row, a_nbr = _flatten_rows(snapshot, a_ids[valid])
+    b_row, b_nbr = _flatten_rows(snapshot, b_ids[valid])
+    common = np.intersect1d(
+        valid[a_row] * n + a_nbr, valid[b_row] * n + b_nbr, assume_unique=True
+    )
+    return common // n, common % n
+
+def _id_or_missing(snapshot: GraphSnapshot, username: str) -> int:
+    uid = snapshot.id_of(username)
+    return -1 if uid is None else uid
+
+def _feature_rows(usernames: List[str], features: CandidateFeatures) -> List[Dict[str, Any]]:
+    """Candidate-feature rows in the shape returned by Recommender's feature query."""
+    return [
+        {
+            "username": username,
+            "mutual_count": int(features.mutuals[i]),
+            "degree": int(features.degree[i]),
+            "user_degree": features.user_degree,
+            "adamic_adar": float(features.adamic_adar[i]),
+            "resource_allocation": float(features.resource_allocation[i]),
+        }
+        for i, username in enumerate(usernames)
+    ]
+
+def _take(features: CandidateFeatures, order: np.ndarray) -> CandidateFeatures:
+    return CandidateFeatures(
+        mutuals=features.mutuals[order],
+        degree=features.degree[order],
+        adamic_adar=features.adamic_adar[order],
+        resource_allocation=features.resource_allocation[order],
+        user_degree=features.user_degree,
+        ppr=None if features.ppr is None else features.ppr[order],
+        similarity=None if features.similarity is None else features.similarity[order],
+    )
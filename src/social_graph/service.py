@@ -1,13 +1,23 @@
-"""Business logic and Neo4j operations for the social graph."""
-from typing import Any
+"""
+Business logic and Neo4j operations for the social graph.
+
+ServiceBatchExecutor runs these functions concurrently on a thread pool
+(e.g. list_friends for many users at once), fanning the queries out over
+the driver's pooled connections.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, TypeVar
 from dataclasses import asdict
+from . import config
 from .db import get_driver
 from .models import User, Friendship
 
 def add_user(user: User, driver=None) -> list[dict[str, Any]]:
     """Create a user node if it doesn't exist."""
+    # created_at feeds the snapshot version (see graph_version.py)
     query = """
     MERGE (u:User {username: $username})
+    ON CREATE SET u.created_at = timestamp()
     RETURN u.username AS username
     """
     return _run_query(query, {"username": user.username}, driver)
@@ -16,22 +26,97 @@ def add_friendship(friendship: Friendship, driver=None) -> list[dict[str, Any]]:
     """Create mutual friendship between two users."""
     query = """
     MATCH (a:User {username: $user1}), (b:User {username: $user2})
-    MERGE (a)-[:FRIEND_WITH]->(b)
-    MERGE (b)-[:FRIEND_WITH]->(a)
+    MERGE (a)-[ab:FRIEND_WITH]->(b)
+    ON CREATE SET ab.created_at = timestamp()
+    MERGE (b)-[ba:FRIEND_WITH]->(a)
+    ON CREATE SET ba.created_at = timestamp()
     RETURN a.username AS user1, b.username AS user2
     """
-    return _run_query(query, asdict(friendship), driver)
+    params = asdict(friendship)
+    if config.single_edge_storage():
+        # One relationship per friendship, created lower -> higher username.
+        # The undirected MERGE also matches a pair stored the other way round.
+        query = """
+    MATCH (a:User {username: $low}), (b:User {username: $high})
+    MERGE (a)-[r:FRIEND_WITH]-(b)
+    ON CREATE SET r.created_at = timestamp()
+    RETURN $user1 AS user1, $user2 AS user2
+    """
+        low, high = sorted((friendship.user1, friendship.user2))
+        params.update(low=low, high=high)
+    return _run_query(query, params, driver)
 
 def list_friends(username: str, driver=None) -> list[str]:
     """Return list of friends for given user."""
+    # Either direction, so the same query serves both storage modes and a
+    # graph halfway through the migration; DISTINCT drops the second
+    # relationship of a pair stored both ways
     query = """
-    MATCH (u:User {username: $username})-[:FRIEND_WITH]->(f:User)
-    RETURN f.username AS friend
-    ORDER BY f.username
+    MATCH (u:User {username: $username})-[:FRIEND_WITH]-(f:User)
+    RETURN DISTINCT f.username AS friend
+    ORDER BY friend
     """
     result = _run_query(query, {"username": username}, driver)
     return [r["friend"] for r in result]
 
+T = TypeVar("T")
+R = TypeVar("R")
+
+class ServiceBatchExecutor:
+    """
+    Thread-pool executor for batches of service calls.
+
+    The sync driver is thread-safe and every call opens its own session, so
+    up to `max_workers` queries run at once, each on its own pooled
+    connection. Results keep the input order; the first failing call's
+    exception is raised. Use as a context manager, or call close().
+
+    Attributes:
+        max_workers: worker threads (concurrent queries).
+        driver: optional injected driver instance shared by all workers.
+    """
+
+    def __init__(self, max_workers: int = 8, driver=None):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self.max_workers = max_workers
+        self.driver = driver
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="social-graph")
+
+    def add_users(self, users: Iterable[User]) -> List[list[dict[str, Any]]]:
+        """Create many users concurrently; one add_user() result per user."""
+        return self._map(add_user, users)
+
+    def add_friendships(self, friendships: Iterable[Friendship]) -> List[list[dict[str, Any]]]:
+        """Create many friendships concurrently; one result per friendship."""
+        return self._map(add_friendship, friendships)
+
+    def list_friends_many(self, usernames: Iterable[str]) -> Dict[str, list[str]]:
+        """Return {username: friends} for every distinct username, in input order."""
+        unique = list(dict.fromkeys(usernames))
+        return dict(zip(unique, self._map(list_friends, unique)))
+
+    def close(self) -> None:
+        """Wait for running calls and stop the worker threads."""
+        self._pool.shutdown(wait=True)
+
+    def __enter__(self) -> "ServiceBatchExecutor":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _map(self, fn: Callable[..., R], items: Iterable[T]) -> List[R]:
+        driver = self.driver
+        return list(self._pool.map(lambda item: fn(item, driver=driver), items))
+
+def list_friends_many(
+    usernames: Iterable[str], driver=None, max_workers: int = 8
+) -> Dict[str, list[str]]:
+    """Return friends of many users, queried in parallel (see ServiceBatchExecutor)."""
+    with ServiceBatchExecutor(max_workers=max_workers, driver=driver) as executor:
+        return executor.list_friends_many(usernames)
+
 # Internal helper, not for external use.
 def _run_query(query: str, params: dict[str, Any], driver=None):
     """
@@ -1,43 +1,82 @@
 """Asynchronous business logic and Neo4j operations for the social graph."""
 from typing import Any
 from dataclasses import asdict
+from . import config
 from .db_async import get_driver
+from .events import ChangeBus, FriendshipAdded, UserAdded
 from .models import User, Friendship
+from .singleflight import SingleFlight
+
+# Coalesces identical concurrent reads; see read_coalescer.stats().
+read_coalescer = SingleFlight()
+
+# Change feed of successful writes; see events.py and live.py.
+change_bus = ChangeBus()
 
 async def add_user(user: User, driver=None) -> list[dict[str, Any]]:
     """Asynchronously create a user node if it doesn't exist."""
+    # created_at feeds the snapshot version (see graph_version.py)
     query = """
     MERGE (u:User {username: $username})
+    ON CREATE SET u.created_at = timestamp()
     RETURN u.username AS username
     """
-    return await _run_query(query, {"username": user.username}, driver)
+    result = await _run_query(query, {"username": user.username}, driver)
+    if result:
+        change_bus.publish(UserAdded(user.username))
+    return result
 
 async def add_friendship(friendship: Friendship, driver=None) -> list[dict[str, Any]]:
     """Asynchronously create mutual friendship between two users."""
     query = """
     MATCH (a:User {username: $user1}), (b:User {username: $user2})
-    MERGE (a)-[:FRIEND_WITH]->(b)
-    MERGE (b)-[:FRIEND_WITH]->(a)
+    MERGE (a)-[ab:FRIEND_WITH]->(b)
+    ON CREATE SET ab.created_at = timestamp()
+    MERGE (b)-[ba:FRIEND_WITH]->(a)
+    ON CREATE SET ba.created_at = timestamp()
     RETURN a.username AS user1, b.username AS user2
     """
-    return await _run_query(query, asdict(friendship), driver)
+    params = asdict(friendship)
+    if config.single_edge_storage():
+        # One relationship per friendship, created lower -> higher username.
+        # The undirected MERGE also matches a pair stored the other way round.
+        query = """
+    MATCH (a:User {username: $low}), (b:User {username: $high})
+    MERGE (a)-[r:FRIEND_WITH]-(b)
+    ON CREATE SET r.created_at = timestamp()
+    RETURN $user1 AS user1, $user2 AS user2
+    """
+        low, high = sorted((friendship.user1, friendship.user2))
+        params.update(low=low, high=high)
+    result = await _run_query(query, params, driver)
+    # No rows: one of the users does not exist and nothing was written
+    if result:
+        change_bus.publish(FriendshipAdded(friendship.user1, friendship.user2))
+    return result
 
 async def list_friends(username: str, driver=None) -> list[str]:
     """Asynchronously return list of friends for given user."""
+    # Either direction, so the same query serves both storage modes and a
+    # graph halfway through the migration; DISTINCT drops the second
+    # relationship of a pair stored both ways
     query = """
-    MATCH (u:User {username: $username})-[:FRIEND_WITH]->(f:User)
-    RETURN f.username AS friend
-    ORDER BY f.username
+    MATCH (u:User {username: $username})-[:FRIEND_WITH]-(f:User)
+    RETURN DISTINCT f.username AS friend
+    ORDER BY friend
     """
-    result = await _run_query(query, {"username": username}, driver)
+    result = await read_coalescer.do(
+        ("list_friends", username, driver),
+        lambda: _run_query(query, {"username": username}, driver, read_only=True),
+    )
     return [r["friend"] for r in result]
 
 # Internal helper, not for external use.
-async def _run_query(query: str, params: dict[str, Any], driver=None):
+async def _run_query(query: str, params: dict[str, Any], driver=None, read_only: bool = False):
     """
     Execute a Cypher query asynchronously using the provided or default Neo4j driver.
-    Always returns a list of result dicts.
+    Pass read_only=True for reads, so they can be routed to readers and
+    hedged. Always returns a list of result dicts.
     """
     if driver is None:
         driver = get_driver()
-    return await driver.run_query(query, params)
+    return await driver.run_query(query, params, read_only=read_only)
@@ -0,0 +1,62 @@
+"""
+Request coalescing (single-flight) for identical concurrent async reads.
+
+While a call for a key is in flight, later callers with the same key await
+the same task instead of issuing their own query. Nothing is cached: once
+the task finishes, the next call starts a fresh one.
+
+The shared task is shielded, so one caller being cancelled does not cancel
+the query the other callers are waiting on.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+class SingleFlight:
+    """
+    Deduplicate concurrent async calls by key.
+
+    Attributes:
+        calls: total calls to do().
+        deduplicated: calls that joined an in-flight task instead of starting one.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.deduplicated = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Await `fn()`, sharing the result with concurrent calls for `key`.
+
+        All callers receive the same result object (or exception); callers
+        that may mutate it should copy it.
+        """
+        self.calls += 1
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+        else:
+            self.deduplicated += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return call, deduplication and in-flight counters."""
+        return {
+            "calls": self.calls,
+            "deduplicated": self.deduplicated,
+            "in_flight": len(self._in_flight),
+            "dedup_ratio": round(self.deduplicated / self.calls, 4) if self.calls else 0.0,
+        }
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Mark the exception as retrieved when every caller was cancelled
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,266 @@
+"""
+Compact CSR snapshot of the friendship graph.
+
+Overview
+--------
+A GraphSnapshot stores the undirected friendship graph as integer ids plus
+CSR (compressed sparse row) arrays, so it can be shared with worker
+processes without pickling a NetworkX graph.
+
+- usernames: id -> username table, sorted ascending (id order == name order)
+- indptr:    int64 array of length n + 1, row offsets into `indices`
+- indices:   int32 array of neighbour ids, sorted within each row
+
+Each undirected friendship appears twice in `indices` (once per endpoint).
+
+On-disk format
+--------------
+`save()` writes a versioned little-endian binary file that `open()` maps
+read-only with np.memmap, so many processes share the same page cache and
+open in milliseconds:
+
+    header   magic "SGSNAP01", format version, n, len(indices),
+             len(name blob), len(version string)
+    version  UTF-8 database version string (see analytics_local)
+    indptr   int64[n + 1]
+    indices  int32[len(indices)]
+    offsets  int64[n + 1]   username offsets into the blob
+    blob     uint8[...]     UTF-8 usernames, sorted
+
+Every section starts on an 8-byte boundary.
+"""
+
+import bisect
+import os
+import struct
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+SNAPSHOT_MAGIC = b"SGSNAP01"
+SNAPSHOT_FORMAT_VERSION = 1
+
+# magic, format version, n, indices length, blob length, version length
+_HEADER = struct.Struct("<8sIQQQI")
+
+class UsernameTable(Sequence[str]):
+    """
+    Read-only id -> username table backed by a UTF-8 blob and offsets.
+
+    Names are decoded on access, so the table can wrap shared-memory or
+    memory-mapped buffers without materializing every string up front.
+    """
+
+    __slots__ = ("offsets", "blob")
+
+    def __init__(self, offsets: np.ndarray, blob: np.ndarray):
+        self.offsets = offsets
+        self.blob = blob
+
+    @classmethod
+    def from_names(cls, names: Iterable[str]) -> "UsernameTable":
+        """Encode usernames into an offsets array and a single UTF-8 blob."""
+        encoded = [name.encode("utf-8") for name in names]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        if encoded:
+            np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        return cls(offsets, blob)
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("username id out of range")
+        start, end = int(self.offsets[index]), int(self.offsets[index + 1])
+        return bytes(self.blob[start:end]).decode("utf-8")
+
+@dataclass(slots=True)
+class GraphSnapshot:
+    """Immutable CSR view of the undirected friendship graph."""
+    usernames: Sequence[str]
+    indptr: np.ndarray
+    indices: np.ndarray
+    version: Optional[str] = None
+    path: Optional[str] = None
+
+    @classmethod
+    def from_edges(
+        cls,
+        nodes: Iterable[str],
+        edges: Iterable[Tuple[str, str]],
+        version: Optional[str] = None,
+    ) -> "GraphSnapshot":
+        """
+        Build a snapshot from usernames and undirected (src, dst) edges.
+
+        Edge endpoints missing from `nodes` are added; self-loops and
+        duplicate edges are dropped.
+        """
+        edge_list = [(s, d) for s, d in edges if s and d and s != d]
+        names = set(nodes)
+        for src, dst in edge_list:
+            names.add(src)
+            names.add(dst)
+        usernames = sorted(names)
+        ids = {name: i for i, name in enumerate(usernames)}
+        n = len(usernames)
+
+        src = np.fromiter((ids[s] for s, _ in edge_list), dtype=np.int64, count=len(edge_list))
+        dst = np.fromiter((ids[d] for _, d in edge_list), dtype=np.int64, count=len(edge_list))
+
+        # Store both directions, then sort + dedupe by (row, col)
+        keys = np.unique(np.concatenate([src * n + dst, dst * n + src]))
+        rows = keys // max(n, 1)
+        cols = keys % max(n, 1)
+
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+        return cls(
+            usernames=UsernameTable.from_names(usernames),
+            indptr=indptr,
+            indices=cols.astype(np.int32),
+            version=version,
+        )
+
+    @classmethod
+    def open(cls, path: str) -> "GraphSnapshot":
+        """
+        Memory-map a snapshot file written by save().
+
+        Raises:
+            ValueError: if the file is not a snapshot or uses another format version.
+        """
+        data = np.memmap(path, dtype=np.uint8, mode="r")
+        if len(data) < _HEADER.size:
+            raise ValueError(f"{path}: not a graph snapshot file")
+        magic, fmt, n, m, blob_len, version_len = _HEADER.unpack(
+            bytes(data[:_HEADER.size])
+        )
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError(f"{path}: not a graph snapshot file")
+        if fmt != SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(f"{path}: unsupported snapshot format version {fmt}")
+
+        layout = _layout(n, m, blob_len, version_len)
+        if len(data) < layout[-1]:
+            raise ValueError(f"{path}: truncated graph snapshot file")
+        version_at, indptr_at, indices_at, offsets_at, blob_at, _ = layout
+
+        version = bytes(data[version_at:version_at + version_len]).decode("utf-8")
+        return cls(
+            usernames=UsernameTable(
+                data[offsets_at:offsets_at + 8 * (n + 1)].view(np.int64),
+                data[blob_at:blob_at + blob_len],
+            ),
+            indptr=data[indptr_at:indptr_at + 8 * (n + 1)].view(np.int64),
+            indices=data[indices_at:indices_at + 4 * m].view(np.int32),
+            version=version or None,
+            path=os.fspath(path),
+        )
+
+    def save(self, path: str) -> None:
+        """
+        Write the snapshot to `path` in the on-disk format.
+
+        The file is written next to `path` and renamed into place, so readers
+        never observe a partially written snapshot.
+        """
+        names = self.usernames
+        if not isinstance(names, UsernameTable):
+            names = UsernameTable.from_names(names)
+        version = (self.version or "").encode("utf-8")
+        n, m, blob_len = self.num_nodes, len(self.indices), len(names.blob)
+        layout = _layout(n, m, blob_len, len(version))
+
+        sections: List[Tuple[int, bytes]] = [
+            (0, _HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_FORMAT_VERSION, n, m, blob_len, len(version))),
+            (layout[0], version),
+            (layout[1], np.ascontiguousarray(self.indptr, dtype="<i8").tobytes()),
+            (layout[2], np.ascontiguousarray(self.indices, dtype="<i4").tobytes()),
+            (layout[3], np.ascontiguousarray(names.offsets, dtype="<i8").tobytes()),
+            (layout[4], np.ascontiguousarray(names.blob, dtype=np.uint8).tobytes()),
+        ]
+
+        tmp_path = f"{os.fspath(path)}.tmp.{os.getpid()}"
+        try:
+            with open(tmp_path, "wb") as f:
+                for offset, payload in sections:
+                    f.write(b"\0" * (offset - f.tell()))
+                    f.write(payload)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.indptr) - 1
+
+    @property
+    def num_edges(self) -> int:
+        """Number of undirected friendships."""
+        return len(self.indices) // 2
+
+    def id_of(self, username: str) -> Optional[int]:
+        """Return the integer id of a username, or None if absent."""
+        i = bisect.bisect_left(self.usernames, username)
+        if i < len(self.usernames) and self.usernames[i] == username:
+            return i
+        return None
+
+    def neighbors(self, node_id: int) -> np.ndarray:
+        """Return the sorted neighbour ids of a node."""
+        return self.indices[self.indptr[node_id]:self.indptr[node_id + 1]]
+
+    def degrees(self) -> np.ndarray:
+        """Return the degree of every node as an int64 array."""
+        return np.diff(self.indptr)
+
+    def edge_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (src, dst) id arrays with each undirected edge once (src < dst)."""
+        src = np.repeat(np.arange(self.num_nodes, dtype=np.int64), self.degrees())
+        dst = self.indices.astype(np.int64)
+        mask = src < dst
+        return src[mask], dst[mask]
+
+    def adjacency_matrix(self):
+        """Return the symmetric adjacency as a SciPy CSR matrix of ones."""
+        from scipy.sparse import csr_matrix
+
+        n = self.num_nodes
+        data = np.ones(len(self.indices), dtype=np.float64)
+        return csr_matrix((data, self.indices, self.indptr), shape=(n, n))
+
+    def to_networkx(self):
+        """Build a NetworkX graph keyed by username."""
+        import networkx as nx
+
+        names = list(self.usernames)
+        G = nx.Graph()
+        G.add_nodes_from(names)
+        src, dst = self.edge_arrays()
+        G.add_edges_from((names[s], names[d]) for s, d in zip(src.tolist(), dst.tolist()))
+        return G
+
+def _align8(offset: int) -> int:
+    return (offset + 7) & ~7
+
+def _layout(n: int, m: int, blob_len: int, version_len: int) -> Tuple[int, ...]:
+    """
+    Return byte offsets of (version, indptr, indices, offsets, blob, end)
+    for a snapshot file with the given section sizes.
+    """
+    version_at = _HEADER.size
+    indptr_at = _align8(version_at + version_len)
+    indices_at = _align8(indptr_at + 8 * (n + 1))
+    offsets_at = _align8(indices_at + 4 * m)
+    blob_at = _align8(offsets_at + 8 * (n + 1))
+    return version_at, indptr_at, indices_at, offsets_at, blob_at, blob_at + blob_len
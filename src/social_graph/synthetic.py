@@ -0,0 +1,74 @@
+"""
+Seeded synthetic social graphs for benchmarks and load tests.
+
+Overview
+--------
+power_law_graph() grows a Barabási–Albert style graph (preferential
+attachment), which yields the heavy-tailed degree distribution typical of
+social networks, and can optionally add "supernodes" (celebrity accounts)
+connected to a large fraction of all users.
+
+Output uses the same (nodes, edges) shape as
+analytics_local._fetch_graph_snapshot(), so it can feed GraphSnapshot,
+NetworkX or the in-memory driver directly.
+"""
+
+import random
+from typing import List, Set, Tuple
+
+def power_law_graph(
+    num_users: int,
+    edges_per_user: int = 3,
+    num_supernodes: int = 0,
+    supernode_fraction: float = 0.1,
+    seed: int = 0,
+) -> Tuple[List[str], List[Tuple[str, str]]]:
+    """
+    Generate a deterministic preferential-attachment friendship graph.
+
+    Args:
+        num_users: number of users to create.
+        edges_per_user: friendships each new user forms on arrival.
+        num_supernodes: users additionally befriended by a large random sample.
+        supernode_fraction: fraction of all users each supernode connects to.
+        seed: random seed; the same arguments always yield the same graph.
+
+    Returns:
+        (usernames, edges) with each undirected edge listed once as (a, b), a < b.
+        Usernames are zero-padded ("user00042") so sort order == creation order.
+    """
+    if num_users < 0 or edges_per_user < 1:
+        raise ValueError("num_users must be >= 0 and edges_per_user >= 1")
+
+    rng = random.Random(seed)
+    width = len(str(max(num_users - 1, 0)))
+    usernames = [f"user{i:0{width}d}" for i in range(num_users)]
+    edges: Set[Tuple[int, int]] = set()
+
+    # Each endpoint appears once per incident edge, so sampling from this
+    # list picks targets proportionally to their degree.
+    endpoints: List[int] = []
+    seed_size = min(edges_per_user + 1, num_users)
+
+    # Start from a small clique so every early node has a non-zero degree
+    for a in range(seed_size):
+        for b in range(a + 1, seed_size):
+            edges.add((a, b))
+            endpoints += (a, b)
+
+    for new in range(seed_size, num_users):
+        targets: Set[int] = set()
+        while len(targets) < min(edges_per_user, new):
+            targets.add(rng.choice(endpoints))
+        for target in targets:
+            edges.add((target, new))
+            endpoints += (target, new)
+
+    if num_supernodes and num_users > 1:
+        sample_size = max(1, int(supernode_fraction * (num_users - 1)))
+        for hub in rng.sample(range(num_users), min(num_supernodes, num_users)):
+            others = [u for u in range(num_users) if u != hub]
+            for other in rng.sample(others, min(sample_size, len(others))):
+                edges.add((min(hub, other), max(hub, other)))
+
+    return usernames, [(usernames[a], usernames[b]) for a, b in sorted(edges)]
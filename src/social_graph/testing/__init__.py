@@ -0,0 +1,10 @@
+"""
+Test and benchmarking aids; not used by the production code paths.
+
+- InMemoryAsyncDriver: in-process stand-in for AsyncNeo4jDriver that
+  answers this package's Cypher statements from adjacency sets.
+"""
+
+from .inmemory_driver import InMemoryAsyncDriver, UnsupportedQueryError
+
+__all__ = ["InMemoryAsyncDriver", "UnsupportedQueryError"]
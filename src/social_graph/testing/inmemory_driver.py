@@ -0,0 +1,297 @@
+"""
+In-process stand-in for AsyncNeo4jDriver.
+
+Overview
+--------
+InMemoryAsyncDriver keeps the friendship graph in Python adjacency sets and
+answers the Cypher statements issued by this package (service_async,
+Recommender, analytics, analytics_local snapshot fetch). It lets benchmarks
+and load tests exercise the real call paths without a Neo4j instance.
+
+Statements are recognized by distinctive fragments of their text, not by
+parsing Cypher; an unknown statement raises UnsupportedQueryError naming
+it, so a new query is never silently answered wrong.
+
+This is a test and benchmarking aid, not a production driver.
+"""
+
+import asyncio
+import itertools
+import math
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+class UnsupportedQueryError(ValueError):
+    """
+    Raised for a statement InMemoryAsyncDriver has no handler for.
+
+    Attributes:
+        query: the statement, whitespace-normalized.
+    """
+
+    def __init__(self, query: str):
+        super().__init__(f"InMemoryAsyncDriver has no handler for query: {query}")
+        self.query = query
+
+class InMemoryAsyncDriver:
+    """
+    Async driver stand-in backed by an in-memory adjacency map.
+
+    Attributes:
+        adjacency: username -> set of friend usernames.
+        properties: username -> stored node properties (e.g. precomputed
+            recommendations).
+        latency: simulated round-trip time in seconds per query.
+        query_count: number of statements executed so far.
+        user_stamp, friendship_stamp: newest created_at stamps (see
+            graph_version.py), from a logical clock that only moves forward.
+    """
+
+    def __init__(
+        self,
+        nodes: Iterable[str] = (),
+        edges: Iterable[Tuple[str, str]] = (),
+        latency: float = 0.0,
+    ):
+        self.adjacency: Dict[str, Set[str]] = {}
+        self.properties: Dict[str, Dict[str, Any]] = {}
+        self.latency = latency
+        self.query_count = 0
+        self.user_stamp = 0
+        self.friendship_stamp = 0
+        self._clock = itertools.count(1)
+        for username in nodes:
+            self.adjacency.setdefault(username, set())
+        for a, b in edges:
+            self._link(a, b)
+
+    async def run_query(
+        self, query: str, params: Optional[dict] = None, read_only: bool = False
+    ) -> list[dict]:
+        """
+        Answer a known Cypher statement from the in-memory graph.
+        `read_only` is accepted for AsyncNeo4jDriver parity and ignored.
+
+        Raises:
+            UnsupportedQueryError: no handler recognizes the statement.
+        """
+        self.query_count += 1
+        # Always yield to the loop, like a real network round trip would
+        await asyncio.sleep(self.latency)
+
+        text = " ".join(query.split())
+        for marker, handler in _ROUTES:
+            if marker in text:
+                return handler(self, params or {})
+        raise UnsupportedQueryError(" ".join(query.split()))
+
+    async def execute_read(self, query: str, params: Optional[dict] = None) -> list[dict]:
+        """Same as run_query(); present for AsyncNeo4jDriver parity."""
+        return await self.run_query(query, params)
+
+    async def execute_write(self, query: str, params: Optional[dict] = None) -> list[dict]:
+        """Same as run_query(); present for AsyncNeo4jDriver parity."""
+        return await self.run_query(query, params)
+
+    @asynccontextmanager
+    async def unit_of_work(self, read_only: bool = False) -> AsyncIterator["_InMemoryUnitOfWork"]:
+        """
+        Statements run directly against the shared graph; there is no
+        isolation or rollback.
+        """
+        yield _InMemoryUnitOfWork(self)
+
+    async def close(self) -> None:
+        """Nothing to release; present for API parity."""
+
+    # -------------------------------
+    # Statement handlers
+    # -------------------------------
+
+    def _clear(self, params: dict) -> list[dict]:
+        self.adjacency.clear()
+        self.properties.clear()
+        # The stamps go with the data; the clock keeps running
+        self.user_stamp = self.friendship_stamp = 0
+        return []
+
+    def _add_user(self, params: dict) -> list[dict]:
+        if params["username"] not in self.adjacency:
+            self.adjacency[params["username"]] = set()
+            self.user_stamp = next(self._clock)
+        return [{"username": params["username"]}]
+
+    def _add_friendship(self, params: dict) -> list[dict]:
+        a, b = params["user1"], params["user2"]
+        if a not in self.adjacency or b not in self.adjacency:
+            return []
+        if b not in self.adjacency[a]:
+            self._link(a, b)
+            self.friendship_stamp = next(self._clock)
+        return [{"user1": a, "user2": b}]
+
+    def _list_friends(self, params: dict) -> list[dict]:
+        friends = self.adjacency.get(params["username"], set())
+        return [{"friend": f} for f in sorted(friends)]
+
+    def _mutual_friends(self, params: dict) -> Set[str]:
+        a, b = params["user_a"], params["user_b"]
+        if a == b:
+            return set()
+        return self.adjacency.get(a, set()) & self.adjacency.get(b, set())
+
+    def _mutual_count(self, params: dict) -> list[dict]:
+        a, b = params["user_a"], params["user_b"]
+        if a not in self.adjacency or b not in self.adjacency:
+            return []
+        return [{"mutual_count": len(self._mutual_friends(params))}]
+
+    def _list_mutual(self, params: dict) -> list[dict]:
+        return [{"mutual_friend": f} for f in sorted(self._mutual_friends(params))]
+
+    def _mutual_many(self, params: dict) -> list[dict]:
+        rows = []
+        for pair in params["pairs"]:
+            names = sorted(self._mutual_friends(pair))
+            rows.append({
+                "idx": pair["idx"],
+                "mutual_count": len(names),
+                "mutual_friends": names[:params["names_limit"]],
+            })
+        return rows
+
+    def _suggest(self, params: dict) -> list[dict]:
+        user = params["username"]
+        friends = self.adjacency.get(user, set())
+        counts: Dict[str, int] = {}
+        for friend in friends:
+            for fof in self.adjacency[friend]:
+                if fof != user and fof not in friends:
+                    counts[fof] = counts.get(fof, 0) + 1
+        ranked = sorted(counts.items(), key=lambda it: (-it[1], it[0]))
+        return [
+            {"username": u, "mutual_count": c} for u, c in ranked[:params["limit"]]
+        ]
+
+    def _candidate_features(self, params: dict) -> list[dict]:
+        user = params["username"]
+        if user not in self.adjacency:
+            return []
+        friends = self.adjacency[user]
+        rows = []
+        for row in self._suggest(params):
+            mutual = friends & self.adjacency[row["username"]]
+            rows.append({
+                **row,
+                "degree": len(self.adjacency[row["username"]]),
+                "user_degree": len(friends),
+                "adamic_adar": sum(1.0 / math.log(len(self.adjacency[f])) for f in sorted(mutual)),
+                "resource_allocation": sum(1.0 / len(self.adjacency[f]) for f in sorted(mutual)),
+            })
+        return rows
+
+    def _degree(self, params: dict) -> list[dict]:
+        return [{"degree": len(self.adjacency.get(params["username"], ()))}]
+
+    def _degrees(self, params: dict) -> list[dict]:
+        return [
+            {"username": u, "degree": len(self.adjacency.get(u, ()))}
+            for u in params["usernames"]
+        ]
+
+    def _pagerank(self, params: dict) -> list[dict]:
+        ranked = sorted(
+            ((u, len(f)) for u, f in self.adjacency.items() if f),
+            key=lambda it: (-it[1], it[0]),
+        )
+        return [{"username": u, "degree": d} for u, d in ranked[:params["top_n"]]]
+
+    def _snapshot_version(self, params: dict) -> list[dict]:
+        directed = sum(len(f) for f in self.adjacency.values())
+        return [{
+            "users": len(self.adjacency),
+            "friendships": directed,
+            "user_stamp": [self.user_stamp] if self.user_stamp else [],
+            "friendship_stamp": [self.friendship_stamp] if self.friendship_stamp else [],
+        }]
+
+    def _nodes(self, params: dict) -> list[dict]:
+        return [{"username": u} for u in self.adjacency]
+
+    def _edges(self, params: dict) -> list[dict]:
+        return [
+            {"src": u, "dst": v}
+            for u, friends in self.adjacency.items()
+            for v in friends
+            if u < v
+        ]
+
+    def _duplicate_friendships(self, params: dict) -> list[dict]:
+        # Friendships are held once per pair, so there is never a duplicate
+        return [{"duplicates": 0}]
+
+    def _collapse_duplicates(self, params: dict) -> list[dict]:
+        after = params.get("after")
+        batch = sorted(u for u in self.adjacency if after is None or u > after)
+        batch = batch[:params["batch_size"]]
+        return [{"updated": len(batch), "last": batch[-1] if batch else None, "removed": 0}]
+
+    def _store_recommendations(self, params: dict) -> list[dict]:
+        written = 0
+        for row in params["rows"]:
+            if row["username"] in self.adjacency:
+                self.properties.setdefault(row["username"], {}).update(
+                    recommendations=row["recommendations"],
+                    recommendation_scores=row["scores"],
+                    recommendation_mutuals=row["mutuals"],
+                )
+                written += 1
+        return [{"written": written}]
+
+    def _stored_recommendations(self, params: dict) -> list[dict]:
+        if params["username"] not in self.adjacency:
+            return []
+        props = self.properties.get(params["username"], {})
+        return [{
+            "usernames": props.get("recommendations"),
+            "scores": props.get("recommendation_scores"),
+            "mutuals": props.get("recommendation_mutuals"),
+        }]
+
+    def _link(self, a: str, b: str) -> None:
+        self.adjacency.setdefault(a, set()).add(b)
+        self.adjacency.setdefault(b, set()).add(a)
+
+class _InMemoryUnitOfWork:
+    """unit_of_work() handle: forwards statements to the driver."""
+
+    def __init__(self, driver: InMemoryAsyncDriver):
+        self._driver = driver
+
+    async def run(self, query: str, params: Optional[dict] = None) -> list[dict]:
+        return await self._driver.run_query(query, params)
+
+# Ordered (fragment, handler) routes; more specific fragments come first.
+_ROUTES: List[Tuple[str, Callable[[InMemoryAsyncDriver, dict], List[Dict[str, Any]]]]] = [
+    ("DETACH DELETE", InMemoryAsyncDriver._clear),
+    ("MERGE (u:User {username: $username})", InMemoryAsyncDriver._add_user),
+    ("MERGE (a)-[ab:FRIEND_WITH]->(b)", InMemoryAsyncDriver._add_friendship),
+    ("MERGE (a)-[r:FRIEND_WITH]-(b)", InMemoryAsyncDriver._add_friendship),
+    ("f.username AS friend", InMemoryAsyncDriver._list_friends),
+    ("UNWIND $pairs", InMemoryAsyncDriver._mutual_many),
+    ("AS mutual_friend", InMemoryAsyncDriver._list_mutual),
+    ("AS resource_allocation", InMemoryAsyncDriver._candidate_features),
+    ("(fof:User)", InMemoryAsyncDriver._suggest),
+    ("AS mutual_count", InMemoryAsyncDriver._mutual_count),
+    ("UNWIND $usernames", InMemoryAsyncDriver._degrees),
+    ("RETURN count(DISTINCT f) AS degree", InMemoryAsyncDriver._degree),
+    ("RETURN u.username AS username, count(DISTINCT f) AS degree", InMemoryAsyncDriver._pagerank),
+    ("COUNT { (:User) }", InMemoryAsyncDriver._snapshot_version),
+    ("RETURN u.username AS src, v.username AS dst", InMemoryAsyncDriver._edges),
+    ("END AS dst", InMemoryAsyncDriver._edges),
+    ("FOREACH (r IN duplicates | DELETE r)", InMemoryAsyncDriver._collapse_duplicates),
+    ("AS duplicates", InMemoryAsyncDriver._duplicate_friendships),
+    ("MATCH (u:User) RETURN u.username AS username", InMemoryAsyncDriver._nodes),
+    ("SET u.recommendations = row.recommendations", InMemoryAsyncDriver._store_recommendations),
+    ("RETURN u.recommendations AS usernames", InMemoryAsyncDriver._stored_recommendations),
+]
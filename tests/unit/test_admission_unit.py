@@ -0,0 +1,141 @@
+import asyncio
+
+import pytest
+from social_graph.admission import (
+    AdmissionController, AdmissionPolicy, Overloaded, Priority, batch_priority, priority,
+)
+from social_graph.db_async import AsyncNeo4jDriver
+
+async def hold(controller, read_only, release, log=None, name=None):
+    async with controller.slot(read_only):
+        if log is not None:
+            log.append(name)
+        await release.wait()
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+@pytest.mark.asyncio
+async def test_read_and_write_lanes_have_separate_limits():
+    controller = AdmissionController(AdmissionPolicy(max_reads=2, max_writes=1))
+    release = asyncio.Event()
+    tasks = [asyncio.create_task(hold(controller, True, release)) for _ in range(4)]
+    tasks += [asyncio.create_task(hold(controller, False, release)) for _ in range(2)]
+    await settle()
+
+    stats = controller.stats()
+    assert (stats["read"]["active"], stats["read"]["queued"]) == (2, 2)
+    assert (stats["write"]["active"], stats["write"]["queued"]) == (1, 1)
+
+    release.set()
+    await asyncio.gather(*tasks)
+    stats = controller.stats()
+    assert stats["read"]["active"] == stats["write"]["active"] == 0
+    assert stats["read"]["admitted"] == 4 and stats["read"]["max_queued"] == 2
+
+@pytest.mark.asyncio
+async def test_interactive_waiters_go_before_batch_waiters():
+    controller = AdmissionController(AdmissionPolicy(max_reads=1))
+    blocker, release = asyncio.Event(), asyncio.Event()
+    release.set()
+    log = []
+    first = asyncio.create_task(hold(controller, True, blocker))
+    await settle()
+
+    @batch_priority
+    async def batch_job(name):
+        await hold(controller, True, release, log, name)
+
+    tasks = [asyncio.create_task(batch_job("batch-1")), asyncio.create_task(batch_job("batch-2"))]
+    await settle()
+    tasks.append(asyncio.create_task(hold(controller, True, release, log, "interactive")))
+    await settle()
+
+    blocker.set()
+    await asyncio.gather(first, *tasks)
+    assert log == ["interactive", "batch-1", "batch-2"]
+
+@pytest.mark.asyncio
+async def test_full_queue_sheds_batch_work_first():
+    controller = AdmissionController(AdmissionPolicy(max_reads=1, max_queue=1))
+    release = asyncio.Event()
+    running = asyncio.create_task(hold(controller, True, release))
+    await settle()
+    with priority(Priority.BATCH):
+        batch = asyncio.create_task(hold(controller, True, release))
+    await settle()
+
+    # An interactive query evicts the queued batch query...
+    interactive = asyncio.create_task(hold(controller, True, release))
+    await settle()
+    with pytest.raises(Overloaded):
+        await batch
+    # ...and the next one is rejected at once: nothing less important is queued
+    with pytest.raises(Overloaded):
+        await hold(controller, True, release)
+
+    release.set()
+    await asyncio.gather(running, interactive)
+    stats = controller.stats()["read"]
+    assert (stats["evicted"], stats["rejected"], stats["active"]) == (1, 1, 0)
+
+@pytest.mark.asyncio
+async def test_queue_timeout_and_cancellation_release_the_queue():
+    controller = AdmissionController(AdmissionPolicy(max_reads=1, queue_timeout=0.01))
+    release = asyncio.Event()
+    running = asyncio.create_task(hold(controller, True, release))
+    await settle()
+
+    with pytest.raises(Overloaded):
+        await hold(controller, True, release)
+    waiter = asyncio.create_task(hold(controller, True, release))
+    await settle()
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+
+    release.set()
+    await running
+    stats = controller.stats()["read"]
+    assert (stats["timed_out"], stats["queued"], stats["active"]) == (1, 0, 0)
+    # The slot was not leaked
+    await hold(controller, True, release)
+
+@pytest.mark.asyncio
+async def test_driver_gates_queries_when_enabled(mocker):
+    mocker.patch("neo4j.AsyncGraphDatabase.driver")
+    plain = AsyncNeo4jDriver()
+    assert plain.admission is None and plain.admission_stats() == {}
+
+    driver = AsyncNeo4jDriver(admission_policy=AdmissionPolicy(max_reads=1, max_queue=0))
+    sessions = []
+    started, release = asyncio.Event(), asyncio.Event()
+
+    async def execute(query, params, read_only):
+        sessions.append(read_only)
+        started.set()
+        await release.wait()
+        return [{"n": 1}]
+
+    mocker.patch.object(driver, "_session", lambda read_only: _NullSession())
+    mocker.patch("social_graph.db_async._collect", lambda tx, q, p: execute(q, p, True))
+    first = asyncio.create_task(driver.execute_read("MATCH (n) RETURN 1 AS n"))
+    await started.wait()
+
+    with pytest.raises(Overloaded):
+        await driver.execute_read("MATCH (n) RETURN 1 AS n")
+    release.set()
+    assert await first == [{"n": 1}]
+    assert driver.admission_stats()["read"]["rejected"] == 1
+    assert sessions == [True]
+
+class _NullSession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return None
+
+    async def execute_read(self, work, *args):
+        return await work(None, *args)
@@ -148,3 +148,106 @@ async def test_detect_communities_local_empty_graph(mocker):
 
     communities = await analytics_local.detect_communities_local()
     assert communities == []
+
+@pytest.mark.asyncio
+async def test_analytics_report_single_snapshot(mocker):
+    """
+    analytics_report(): one snapshot fetch feeds every stage.
+
+    Graph:
+        a -- b -- c      x -- y      z (isolated)
+    """
+    fetch = mocker.patch.object(
+        analytics_local,
+        "_fetch_graph_snapshot",
+        return_value=(["a", "b", "c", "x", "y", "z"], [("a", "b"), ("b", "c"), ("x", "y")]),
+    )
+
+    to_networkx = mocker.spy(analytics_local.GraphSnapshot, "to_networkx")
+
+    report = await analytics_local.analytics_report(top_n=2)
+
+    fetch.assert_called_once()
+    to_networkx.assert_called_once()
+    assert report.num_users == 6
+    assert report.num_friendships == 3
+    assert report.degree_distribution == {0: 1, 1: 4, 2: 1}
+    assert len(report.pagerank) == 2
+    assert report.pagerank[0][0] == "b"
+    assert report.communities[:2] == [{"a", "b", "c"}, {"x", "y"}]
+    assert report.community_sizes == [len(c) for c in report.communities]
+    assert report.modularity > 0
+    assert report.num_components == 3
+    assert report.largest_component == 3
+    assert set(report.timings) == {
+        "snapshot", "graph", "degrees", "pagerank", "communities", "components", "total",
+    }
+
+@pytest.mark.asyncio
+async def test_analytics_report_empty_graph(mocker):
+    mocker.patch.object(analytics_local, "_fetch_graph_snapshot", return_value=([], []))
+
+    report = await analytics_local.analytics_report()
+
+    assert report.num_users == 0
+    assert report.pagerank == []
+    assert report.communities == []
+    assert "total" in report.timings
+
+@pytest.mark.asyncio
+async def test_clustering_local_matches_networkx():
+    import networkx as nx
+    from social_graph.snapshot import GraphSnapshot
+    from social_graph.synthetic import power_law_graph
+
+    nodes, edges = power_law_graph(400, edges_per_user=4, num_supernodes=1, seed=2)
+    G = nx.Graph(edges)
+    snapshot = GraphSnapshot.from_edges(nodes, edges)
+
+    report = await analytics_local.clustering_local(top_n=5, bins=4, snapshot=snapshot)
+
+    triangles = nx.triangles(G)
+    expected_top = sorted(triangles.items(), key=lambda it: (-it[1], it[0]))[:5]
+    assert report.top_triangles == expected_top
+    assert report.total_triangles == sum(triangles.values()) // 3
+    assert report.average_clustering == round(nx.average_clustering(G), 4)
+    assert report.transitivity == round(nx.transitivity(G), 4)
+    assert sum(report.triangle_distribution.values()) == len(nodes)
+    assert list(report.clustering_distribution) == [0.0, 0.25, 0.5, 0.75]
+    assert not report.approximate
+
+@pytest.mark.asyncio
+async def test_clustering_local_wedge_sampling_is_close():
+    from social_graph.snapshot import GraphSnapshot
+
+    # Triangle a-b-c with a pendant d on c: c has 1 of 3 wedges closed
+    snapshot = GraphSnapshot.from_edges([], [("a", "b"), ("b", "c"), ("a", "c"), ("c", "d")])
+
+    exact = await analytics_local.clustering_local(snapshot=snapshot)
+    sampled = await analytics_local.clustering_local(snapshot=snapshot, wedge_samples=2000, seed=1)
+
+    assert exact.top_clustering == [("a", 1.0), ("b", 1.0), ("c", 0.3333)]
+    assert sampled.approximate
+    assert dict(sampled.top_clustering)["a"] == 1.0
+    assert abs(dict(sampled.top_clustering)["c"] - 1 / 3) < 0.05
+    assert sampled.total_triangles == exact.total_triangles == 1
+
+@pytest.mark.asyncio
+async def test_clustering_local_computes_off_the_event_loop(mocker):
+    import threading
+    from social_graph.snapshot import GraphSnapshot
+
+    snapshot = GraphSnapshot.from_edges([], [("a", "b"), ("b", "c"), ("a", "c")])
+    compute = analytics_local._clustering_task
+    threads = []
+
+    def task(*args):
+        threads.append(threading.current_thread())
+        return compute(*args)
+
+    mocker.patch.object(analytics_local, "_clustering_task", side_effect=task)
+
+    report = await analytics_local.clustering_local(snapshot=snapshot)
+
+    assert report.total_triangles == 1
+    assert threads and threads[0] is not threading.main_thread()
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+import pytest_asyncio
+from social_graph import analytics_local
+from social_graph.analytics_runner import AnalyticsRunner
+from social_graph.snapshot import GraphSnapshot
+
+@pytest.fixture(autouse=True)
+def block_database_access(mocker):
+    """Ensure no real DB driver is created by the tests in this module."""
+    mocker.patch.object(
+        analytics_local,
+        "get_driver",
+        side_effect=AssertionError("get_driver() should not be called in unit tests"),
+    )
+
+@pytest_asyncio.fixture
+async def runner():
+    async with AnalyticsRunner(max_workers=1) as r:
+        yield r
+
+def test_snapshot_from_edges_builds_sorted_symmetric_csr():
+    # Duplicate edge, reversed duplicate and self-loop are dropped
+    snapshot = GraphSnapshot.from_edges(
+        ["c", "a"],
+        [("b", "a"), ("a", "b"), ("b", "c"), ("c", "c")],
+    )
+
+    assert list(snapshot.usernames) == ["a", "b", "c"]
+    assert snapshot.num_nodes == 3
+    assert snapshot.num_edges == 2
+    assert snapshot.indptr.tolist() == [0, 1, 3, 4]
+    assert snapshot.neighbors(1).tolist() == [0, 2]
+    assert snapshot.id_of("c") == 2
+    assert snapshot.id_of("zed") is None
+    assert np.array_equal(snapshot.degrees(), [1, 2, 1])
+
+@pytest.mark.asyncio
+async def test_pagerank_local_in_runner_matches_inline(mocker, runner):
+    mocker.patch.object(
+        analytics_local,
+        "_fetch_graph_snapshot",
+        return_value=(["a", "b", "c", "d"], [("a", "b"), ("b", "c"), ("c", "d"), ("b", "d")]),
+    )
+
+    inline = await analytics_local.pagerank_local(top_n=3)
+    pooled = await analytics_local.pagerank_local(top_n=3, runner=runner, timeout=60)
+
+    assert pooled == inline
+
+@pytest.mark.asyncio
+async def test_detect_communities_local_in_runner(mocker, runner):
+    mocker.patch.object(
+        analytics_local,
+        "_fetch_graph_snapshot",
+        return_value=(["a", "b", "c", "x", "y"], [("a", "b"), ("b", "c"), ("x", "y")]),
+    )
+
+    communities = await analytics_local.detect_communities_local(runner=runner, timeout=60)
+
+    assert communities == [{"a", "b", "c"}, {"x", "y"}]
+
+@pytest.mark.asyncio
+async def test_runner_skips_pool_for_empty_graph(mocker):
+    mocker.patch.object(analytics_local, "_fetch_graph_snapshot", return_value=([], []))
+    runner = AnalyticsRunner()
+    run = mocker.spy(runner, "run")
+
+    assert await analytics_local.pagerank_local(runner=runner) == []
+    run.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_analytics_report_exports_snapshot_once(mocker, runner):
+    from social_graph import analytics_runner
+
+    mocker.patch.object(
+        analytics_local,
+        "_fetch_graph_snapshot",
+        return_value=(["a", "b", "c", "d"], [("a", "b"), ("b", "c"), ("c", "a"), ("c", "d")]),
+    )
+    export = mocker.spy(analytics_runner, "_export_snapshot")
+    release = mocker.spy(analytics_runner, "_release_blocks")
+
+    inline = await analytics_local.analytics_report(top_n=2)
+    pooled = await analytics_local.analytics_report(top_n=2, runner=runner, timeout=60)
+
+    assert export.call_count == 1
+    assert release.call_count == 1
+    assert pooled.pagerank == inline.pagerank
+    assert pooled.communities == inline.communities
+    assert pooled.degree_distribution == inline.degree_distribution
@@ -0,0 +1,150 @@
+import pytest
+from social_graph import analytics
+
+class RecordingDriver:
+    """Mock async driver returning canned rows and recording queries."""
+    def __init__(self, *responses: list[dict]):
+        self.responses = list(responses)
+        self.calls: list[tuple[str, dict]] = []
+        self.modes: list[str] = []
+
+    async def run_query(self, query: str, params: dict) -> list[dict]:
+        self.calls.append((query, params))
+        return self.responses.pop(0) if self.responses else []
+
+    async def execute_read(self, query: str, params: dict) -> list[dict]:
+        self.modes.append("read")
+        return await self.run_query(query, params)
+
+    async def execute_write(self, query: str, params: dict) -> list[dict]:
+        self.modes.append("write")
+        return await self.run_query(query, params)
+
+@pytest.mark.asyncio
+async def test_degrees_batches_users_in_one_query():
+    driver = RecordingDriver([
+        {"username": "alice", "degree": 3},
+        {"username": "bob", "degree": 1},
+        {"username": "ghost", "degree": 0},
+    ])
+
+    result = await analytics.degrees(["alice", "bob", "alice", "ghost"], driver=driver)
+
+    assert result == {"alice": 3, "bob": 1, "ghost": 0}
+    assert len(driver.calls) == 1
+    query, params = driver.calls[0]
+    assert "UNWIND $usernames" in query
+    assert params == {"usernames": ["alice", "bob", "ghost"]}
+
+@pytest.mark.asyncio
+async def test_degrees_empty_input_skips_database():
+    driver = RecordingDriver()
+    assert await analytics.degrees([], driver=driver) == {}
+    assert driver.calls == []
+
+@pytest.mark.asyncio
+async def test_degree_distribution_returns_histogram():
+    driver = RecordingDriver([
+        {"degree": 0, "users": 2},
+        {"degree": 1, "users": 4},
+        {"degree": 3, "users": 1},
+    ])
+
+    assert await analytics.degree_distribution(driver=driver) == {0: 2, 1: 4, 3: 1}
+
+VERSION_ROW = {"users": 3, "friendships": 4, "user_stamp": [1], "friendship_stamp": [2]}
+VERSION = "users=3;friendships=4;last_write=2"
+
+@pytest.mark.asyncio
+async def test_refresh_degree_index_pages_through_users():
+    driver = RecordingDriver(
+        [],                                   # CREATE INDEX
+        [],                                   # CREATE CONSTRAINT
+        [VERSION_ROW],                        # graph version before the refresh
+        [{"updated": 2, "last": "bob"}],      # full batch
+        [{"updated": 1, "last": "carol"}],    # short batch -> done
+        [],                                   # record the indexed version
+    )
+
+    total = await analytics.refresh_degree_index(batch_size=2, driver=driver)
+
+    assert total == 3
+    assert [params for _, params in driver.calls[3:5]] == [
+        {"after": None, "batch_size": 2},
+        {"after": "bob", "batch_size": 2},
+    ]
+    assert driver.calls[5] == (
+        'MERGE (m:DegreeIndex {id: "degree"}) SET m.version = $version',
+        {"version": VERSION},
+    )
+    assert driver.modes == ["write", "write", "read", "write", "write", "write"]
+
+@pytest.mark.asyncio
+async def test_pagerank_reads_degree_index():
+    driver = RecordingDriver(
+        [{"version": VERSION}],               # indexed at the current version
+        [VERSION_ROW],
+        [{"username": "alice", "degree": 4}, {"username": "bob", "degree": 2}],
+    )
+
+    result = await analytics.pagerank(top_n=2, driver=driver, use_degree_index=True)
+
+    assert result == [("alice", 1.0), ("bob", 0.5)]
+    query, _ = driver.calls[2]
+    assert "u.degree" in query
+    assert "FRIEND_WITH" not in query
+    assert driver.modes == ["read"] * 3
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("checks", [
+    [[{"version": None}]],                                    # never refreshed
+    [[{"version": "users=3;friendships=2;last_write=1"}], [VERSION_ROW]],  # graph changed since
+])
+async def test_pagerank_counts_live_when_degree_index_is_stale(checks):
+    driver = RecordingDriver(*checks, [{"username": "alice", "degree": 3}])
+
+    assert await analytics.pagerank(top_n=1, driver=driver, use_degree_index=True) == [
+        ("alice", 1.0)
+    ]
+    query, _ = driver.calls[-1]
+    assert "FRIEND_WITH" in query and "u.degree" not in query
+
+@pytest.mark.asyncio
+async def test_community_detection_stops_when_labels_converge():
+    driver = RecordingDriver(
+        [{"updated": 3, "last": "c"}],                 # init labels
+        [{"updated": 3, "last": "c", "changed": 2}],   # sweep 1
+        [{"updated": 3, "last": "c", "changed": 0}],   # sweep 2 -> converged
+        [
+            {"username": "a", "community": "a"},
+            {"username": "b", "community": "a"},
+            {"username": "c", "community": "a"},
+        ],
+    )
+
+    communities = await analytics.community_detection(
+        driver=driver, max_iterations=10, batch_size=10
+    )
+
+    assert communities == {"a": "a", "b": "a", "c": "a"}
+    # init + 2 sweeps + final read
+    assert len(driver.calls) == 4
+    assert driver.modes == ["write", "write", "write", "read"]
+    assert driver.calls[1][1] == {"sample_rate": 1.0, "after": None, "batch_size": 10}
+
+@pytest.mark.asyncio
+async def test_community_detection_respects_iteration_cap():
+    driver = RecordingDriver(
+        [{"updated": 2, "last": "b"}],
+        [{"updated": 2, "last": "b", "changed": 2}],
+        [{"username": "a", "community": "b"}, {"username": "b", "community": "a"}],
+    )
+
+    await analytics.community_detection(driver=driver, max_iterations=1, batch_size=10)
+
+    assert len(driver.calls) == 3
+
+@pytest.mark.asyncio
+async def test_community_detection_rejects_bad_sample_rate():
+    with pytest.raises(ValueError):
+        await analytics.community_detection(driver=RecordingDriver(), sample_rate=0)
@@ -0,0 +1,165 @@
+import pytest
+from social_graph.admission import Priority, _priority
+from social_graph.db_async import AsyncNeo4jDriver, run_batched
+from social_graph.testing import InMemoryAsyncDriver
+from social_graph.recommender import Recommender
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def __aiter__(self):
+        return self._iter()
+
+    async def _iter(self):
+        for row in self.rows:
+            yield FakeRecord(row)
+
+class FakeRecord:
+    def __init__(self, row):
+        self.row = row
+
+    def data(self):
+        return dict(self.row)
+
+class FakeTx:
+    def __init__(self, log):
+        self.log = log
+
+    async def run(self, query, params):
+        self.log.append(("run", query))
+        return FakeResult([{"n": 1}])
+
+    async def commit(self):
+        self.log.append(("commit",))
+
+    async def close(self):
+        self.log.append(("close",))
+
+class FakeSession:
+    def __init__(self, log, access_mode):
+        self.log = log
+        self.log.append(("session", access_mode))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.log.append(("session_closed",))
+
+    async def begin_transaction(self):
+        return FakeTx(self.log)
+
+    async def execute_read(self, work, *args):
+        self.log.append(("managed", "read"))
+        return await work(FakeTx(self.log), *args)
+
+    async def execute_write(self, work, *args):
+        self.log.append(("managed", "write"))
+        return await work(FakeTx(self.log), *args)
+
+@pytest.fixture
+def driver(mocker):
+    mocker.patch("neo4j.AsyncGraphDatabase.driver")
+    d = AsyncNeo4jDriver()
+    d.log = []
+    d.driver.session = lambda default_access_mode, bookmark_manager: FakeSession(
+        d.log, default_access_mode
+    )
+    return d
+
+@pytest.mark.asyncio
+async def test_execute_read_and_write_use_routed_managed_transactions(driver):
+    assert await driver.execute_read("MATCH (n) RETURN 1 AS n") == [{"n": 1}]
+    assert await driver.execute_write("CREATE (n) RETURN 1 AS n") == [{"n": 1}]
+
+    assert [e for e in driver.log if e[0] in ("session", "managed")] == [
+        ("session", "READ"), ("managed", "read"),
+        ("session", "WRITE"), ("managed", "write"),
+    ]
+
+@pytest.mark.asyncio
+async def test_write_unit_of_work_commits_once_for_all_statements(driver):
+    async with driver.unit_of_work() as uow:
+        await uow.run("CREATE (a)")
+        await uow.run("CREATE (b)")
+
+    assert driver.log == [
+        ("session", "WRITE"), ("run", "CREATE (a)"), ("run", "CREATE (b)"),
+        ("commit",), ("close",), ("session_closed",),
+    ]
+
+@pytest.mark.asyncio
+async def test_failed_unit_of_work_is_not_committed(driver):
+    with pytest.raises(RuntimeError):
+        async with driver.unit_of_work() as uow:
+            await uow.run("CREATE (a)")
+            raise RuntimeError("boom")
+
+    assert ("commit",) not in driver.log
+    assert ("close",) in driver.log
+
+@pytest.mark.asyncio
+async def test_read_unit_of_work_never_commits(driver):
+    async with driver.unit_of_work(read_only=True) as uow:
+        await uow.run("MATCH (n) RETURN n")
+
+    assert driver.log[0] == ("session", "READ")
+    assert ("commit",) not in driver.log
+
+class CountingDriver(InMemoryAsyncDriver):
+    """Counts units of work and per-statement reads."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.units = 0
+        self.single_reads = 0
+
+    def unit_of_work(self, read_only=False):
+        assert read_only
+        self.units += 1
+        return super().unit_of_work(read_only)
+
+    async def execute_read(self, query, params=None):
+        self.single_reads += 1
+        return await super().execute_read(query, params)
+
+GRAPH = (["A", "B", "C", "D"], [("A", "B"), ("B", "C"), ("B", "D")])
+
+@pytest.mark.asyncio
+async def test_recommender_runs_a_request_in_one_read_unit():
+    driver = CountingDriver(*GRAPH)
+
+    results = await Recommender(driver=driver).recommend_top_k("A", k=5)
+
+    assert [r["username"] for r in results] == ["C", "D"]
+    # 1 candidate query + 2 degree lookups share one unit of work
+    assert driver.units == 1
+    assert driver.query_count == 3
+    assert driver.single_reads == 0
+
+@pytest.mark.asyncio
+async def test_recommender_reads_statement_by_statement_when_hedging():
+    driver = CountingDriver(*GRAPH)
+    driver.hedger = object()
+
+    await Recommender(driver=driver).recommend_top_k("A", k=5)
+
+    assert driver.units == 0
+    assert driver.single_reads == 3
+
+@pytest.mark.asyncio
+async def test_run_batched_pages_until_short_batch_at_batch_priority():
+    calls = []
+
+    class BatchDriver:
+        async def execute_write(self, query, params):
+            calls.append((params, _priority.get()))
+            return [[{"updated": 2, "last": "b"}], [{"updated": 2, "last": "d"}], []][len(calls) - 1]
+
+    rows = await run_batched("QUERY", {"x": 1}, 2, BatchDriver())
+
+    assert rows == [{"updated": 2, "last": "b"}, {"updated": 2, "last": "d"}, {"updated": 0, "last": None}]
+    assert [params["after"] for params, _ in calls] == [None, "b", "d"]
+    assert all(params["x"] == 1 and params["batch_size"] == 2 for params, _ in calls)
+    assert {level for _, level in calls} == {Priority.BATCH}
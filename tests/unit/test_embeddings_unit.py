@@ -0,0 +1,77 @@
+import asyncio
+
+import numpy as np
+import pytest
+from social_graph.embeddings import (
+    EmbeddingCandidateSource,
+    RandomProjectionIndex,
+    spectral_embeddings,
+)
+from social_graph.testing import InMemoryAsyncDriver
+from social_graph.recommender import Recommender
+from social_graph.recommender_local import LocalRecommender
+from social_graph.snapshot import GraphSnapshot
+
+def two_cliques_with_bridge():
+    # Two 6-cliques joined by a single a5 - b0 edge, plus an isolated user;
+    # a1 - a2 is the only missing edge inside a clique
+    edges = []
+    for prefix in ("a", "b"):
+        members = [f"{prefix}{i}" for i in range(6)]
+        edges += [(x, y) for i, x in enumerate(members) for y in members[i + 1:]]
+    edges.remove(("a1", "a2"))
+    edges.append(("a5", "b0"))
+    return GraphSnapshot.from_edges(["lonely"], edges)
+
+def test_spectral_embeddings_separate_communities():
+    snapshot = two_cliques_with_bridge()
+    E = spectral_embeddings(snapshot, dim=4)
+
+    assert E.shape == (13, 4) and E.dtype == np.float32
+    assert not E[snapshot.id_of("lonely")].any()
+    a1, a2, b1 = (E[snapshot.id_of(u)] for u in ("a1", "a2", "b1"))
+    assert a1 @ a2 > a1 @ b1
+    assert np.array_equal(E, spectral_embeddings(snapshot, dim=4))
+
+def test_random_projection_index_batch_query():
+    rng = np.random.default_rng(0)
+    E = rng.standard_normal((500, 16)).astype(np.float32)
+    E /= np.linalg.norm(E, axis=1, keepdims=True)
+    index = RandomProjectionIndex(E, num_tables=24, num_bits=6)
+
+    results = index.query(E[:20], limit=5, exclude=[np.array([i]) for i in range(20)])
+
+    assert len(results) == 20
+    hits = 0
+    for q, (ids, sims) in enumerate(results):
+        assert q not in ids
+        assert np.all(np.diff(sims) <= 0)
+        exact = np.argsort(-(E @ E[q]))[1:6]
+        hits += len(set(ids.tolist()) & set(exact.tolist()))
+    assert hits / 100 > 0.5
+
+@pytest.mark.asyncio
+async def test_embedding_source_feeds_recommender_and_batches_calls(mocker):
+    snapshot = two_cliques_with_bridge()
+    source = EmbeddingCandidateSource(snapshot, spectral_embeddings(snapshot, dim=4))
+    query_many = mocker.spy(source, "query_many")
+
+    rows = source("a1", 3)
+    assert rows[0]["username"] == "a2"
+    assert rows[0]["mutual_count"] == 4
+    assert {"username", "degree", "user_degree", "similarity"} <= set(rows[0])
+    assert source("nobody", 3) == []
+
+    query_many.reset_mock()
+    batched = await asyncio.gather(*(source.batched(u, 3) for u in ("a0", "a1", "b2")))
+    assert query_many.call_count == 1
+    assert batched[1] == rows
+
+    edges = [(snapshot.usernames[s], snapshot.usernames[d]) for s, d in zip(*snapshot.edge_arrays())]
+    remote = Recommender(
+        driver=InMemoryAsyncDriver(edges=edges), scorer="embedding", candidate_source=source.batched
+    )
+    local = LocalRecommender(snapshot, scorer="embedding", candidate_source=source)
+    ranked = local.recommend_top_k("a1", k=2)
+    assert ranked[0]["username"] == "a2"
+    assert await remote.recommend_top_k("a1", k=2) == ranked
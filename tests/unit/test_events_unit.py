@@ -0,0 +1,130 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+from social_graph import service_async
+from social_graph.events import ChangeBus, UserAdded
+from social_graph.testing import InMemoryAsyncDriver
+from social_graph.live import LiveSnapshot, RecommendationCache
+from social_graph.models import Friendship, User
+from social_graph.recommender import Recommender
+from social_graph.snapshot import GraphSnapshot
+
+EDGES = [("alice", "bob"), ("bob", "carol"), ("carol", "dave"), ("erin", "frank")]
+NODES = ["alice", "bob", "carol", "dave", "erin", "frank"]
+
+@pytest_asyncio.fixture
+async def bus():
+    yield service_async.change_bus
+    await service_async.change_bus.close()
+
+@pytest.mark.asyncio
+async def test_events_are_delivered_in_order_and_in_batches():
+    bus = ChangeBus(max_batch=4, max_delay=0)
+    batches = []
+    bus.subscribe(lambda events: batches.append([e.username for e in events]))
+
+    for i in range(10):
+        bus.publish(UserAdded(f"user{i}"))
+    await bus.flush()
+
+    assert batches == [
+        ["user0", "user1", "user2", "user3"],
+        ["user4", "user5", "user6", "user7"],
+        ["user8", "user9"],
+    ]
+    assert bus.stats()["subscriptions"][0]["batches"] == 3
+    await bus.close()
+
+@pytest.mark.asyncio
+async def test_failing_and_slow_subscribers_do_not_affect_others():
+    bus = ChangeBus(max_delay=0, max_pending=2)
+    received = []
+
+    async def failing(events):
+        raise RuntimeError("boom")
+
+    failures = bus.subscribe(failing)
+    bus.subscribe(received.extend)
+    for i in range(2):
+        bus.publish(UserAdded(f"user{i}"))
+    await bus.flush()
+    bus.publish(UserAdded("user2"))
+    await bus.flush()
+
+    assert [e.username for e in received] == ["user0", "user1", "user2"]
+    assert failures.errors == 2 and isinstance(failures.last_error, RuntimeError)
+
+    # A full buffer drops events instead of blocking the publisher
+    for i in range(5):
+        bus.publish(UserAdded(f"burst{i}"))
+    assert failures.dropped == 3
+    await bus.close()
+
+def test_module_bus_delivers_across_event_loops():
+    bus = service_async.change_bus
+    driver = InMemoryAsyncDriver(NODES, EDGES)
+    received = []
+    bus.subscribe(lambda events: received.extend(e.username for e in events))
+
+    async def write(username):
+        await service_async.add_user(User(username=username), driver=driver)
+        await bus.flush()
+
+    try:
+        asyncio.run(write("gina"))
+        # A second loop: the first loop's queue and delivery task are gone
+        asyncio.run(write("hank"))
+        assert received == ["gina", "hank"]
+    finally:
+        asyncio.run(bus.close())
+
+@pytest.mark.asyncio
+async def test_service_writes_update_live_snapshot(bus):
+    driver = InMemoryAsyncDriver(NODES, EDGES)
+    live = LiveSnapshot(GraphSnapshot.from_edges(NODES, EDGES))
+    bus.subscribe(live.handle)
+    published = bus.published
+
+    await service_async.add_user(User(username="gina"), driver=driver)
+    await service_async.add_friendship(Friendship(user1="gina", user2="alice"), driver=driver)
+    # Existing friendship and unknown user: no degree change
+    await service_async.add_friendship(Friendship(user1="bob", user2="alice"), driver=driver)
+    await service_async.add_friendship(Friendship(user1="ghost", user2="alice"), driver=driver)
+    await bus.flush()
+
+    assert bus.published - published == 3
+    assert live.degree("alice") == 2 and live.degree("gina") == 1
+    assert live.neighbors("alice") == ["bob", "gina"]
+    assert live.pending == 2
+
+    expected = GraphSnapshot.from_edges(NODES + ["gina"], EDGES + [("gina", "alice")])
+    rebuilt = live.snapshot()
+    assert list(rebuilt.usernames) == list(expected.usernames)
+    assert rebuilt.indptr.tolist() == expected.indptr.tolist()
+    assert rebuilt.indices.tolist() == expected.indices.tolist()
+    assert live.pending == 0 and live.degree("gina") == 1
+
+@pytest.mark.asyncio
+async def test_recommendation_cache_invalidates_affected_users(bus):
+    driver = InMemoryAsyncDriver(NODES, EDGES)
+    recommender = Recommender(driver=driver)
+    live = LiveSnapshot(GraphSnapshot.from_edges(NODES, EDGES))
+    cache = RecommendationCache(recommender, neighbors=live.neighbors)
+    bus.subscribe(live.handle)
+    bus.subscribe(cache.handle)
+
+    for username in NODES:
+        await cache.recommend_top_k(username, k=3)
+    assert await cache.recommend_top_k("alice", k=3) == await recommender.recommend_top_k("alice", k=3)
+    assert cache.hits == 1 and len(cache) == 6
+
+    await service_async.add_friendship(Friendship(user1="dave", user2="erin"), driver=driver)
+    await bus.flush()
+
+    # dave, erin, their friends (carol, frank) and bob, whose list has dave
+    assert sorted(u for u, _ in cache._entries) == ["alice"]
+    for username in NODES:
+        assert await cache.recommend_top_k(username, k=3) == await recommender.recommend_top_k(
+            username, k=3
+        )
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+from social_graph.exclusion import BloomFilter, IdBitset, dismissal_filter
+from social_graph.recommender_local import LocalRecommender
+from social_graph.snapshot import GraphSnapshot
+from social_graph.synthetic import power_law_graph
+
+def test_id_bitset_matches_set_membership():
+    rng = np.random.default_rng(1)
+    ids = rng.integers(0, 1_000, size=300)
+    bitset = IdBitset.from_ids(1_000, ids)
+
+    probe = np.arange(1_000)
+    assert bitset.contains(probe).tolist() == [i in set(ids.tolist()) for i in probe]
+    assert bitset.nbytes == 125
+
+def test_bloom_filter_has_no_false_negatives_and_bounded_false_positives():
+    bloom = BloomFilter.from_keys(np.arange(0, 20_000, 2), false_positive_rate=0.01)
+
+    assert bloom.contains(np.arange(0, 20_000, 2)).all()
+    assert bloom.contains(np.arange(1, 40_001, 2)).mean() < 0.02
+    assert bloom.contains(np.array([], dtype=np.int64)).tolist() == []
+
+def test_bloom_filter_rejects_invalid_rate():
+    with pytest.raises(ValueError):
+        BloomFilter(10, false_positive_rate=1.0)
+
+def test_local_recommender_skips_dismissed_candidates():
+    nodes, edges = power_law_graph(200, edges_per_user=3, num_supernodes=1, seed=5)
+    snapshot = GraphSnapshot.from_edges(nodes, edges)
+    plain = LocalRecommender(snapshot)
+    user = nodes[7]
+    before = [r["username"] for r in plain.recommend_top_k(user, k=5)]
+
+    dismissed = dismissal_filter(snapshot, [(user, before[0]), (user, "ghost")])
+    rec = LocalRecommender(snapshot, dismissed=dismissed)
+    after = [r["username"] for r in rec.recommend_top_k(user, k=5)]
+
+    assert before[0] not in after
+    assert len(after) == 5 and after[0] == before[1]
+    # Other users are unaffected
+    assert rec.recommend_top_k(nodes[8], k=5) == plain.recommend_top_k(nodes[8], k=5)
+    assert rec.memory_usage() == {
+        "friend_bitset_bytes": 25,
+        "dismissed_filter_bytes": dismissed.nbytes,
+    }
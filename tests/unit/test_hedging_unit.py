@@ -0,0 +1,138 @@
+import asyncio
+
+import pytest
+from social_graph.db_async import AsyncNeo4jDriver
+from social_graph.hedging import Hedger, HedgePolicy
+
+def _policy(**overrides):
+    values = dict(initial_delay=0.01, min_samples=1_000, budget=1.0)
+    values.update(overrides)
+    return HedgePolicy(**values)
+
+class Attempts:
+    """attempt() factory: the n-th attempt sleeps delays[n] and returns n."""
+
+    def __init__(self, *delays, fail=()):
+        self.delays = delays
+        self.fail = fail
+        self.started = 0
+        self.cancelled = []
+
+    def __call__(self):
+        n = self.started
+        self.started += 1
+        return self._attempt(n)
+
+    async def _attempt(self, n):
+        try:
+            await asyncio.sleep(self.delays[n])
+        except asyncio.CancelledError:
+            self.cancelled.append(n)
+            raise
+        if n in self.fail:
+            raise RuntimeError(f"attempt {n} failed")
+        return n
+
+@pytest.mark.asyncio
+async def test_fast_read_is_not_hedged():
+    hedger = Hedger(_policy())
+    attempts = Attempts(0.0)
+
+    assert await hedger.run(attempts) == 0
+    assert attempts.started == 1
+    assert hedger.stats()["hedged"] == 0
+
+@pytest.mark.asyncio
+async def test_slow_read_is_hedged_and_loser_cancelled():
+    hedger = Hedger(_policy())
+    attempts = Attempts(1.0, 0.0)
+
+    assert await hedger.run(attempts) == 1
+    await asyncio.sleep(0)
+    assert attempts.cancelled == [0]
+    stats = hedger.stats()
+    assert stats["hedged"] == 1 and stats["hedge_wins"] == 1
+    assert stats["hedge_rate"] == 1.0 and stats["win_rate"] == 1.0
+
+@pytest.mark.asyncio
+async def test_original_can_still_win_after_hedging():
+    hedger = Hedger(_policy())
+    attempts = Attempts(0.02, 1.0)
+
+    assert await hedger.run(attempts) == 0
+    await asyncio.sleep(0)
+    assert attempts.cancelled == [1]
+    assert hedger.stats()["hedge_wins"] == 0
+
+@pytest.mark.asyncio
+async def test_failed_winner_falls_back_to_other_attempt():
+    hedger = Hedger(_policy())
+    attempts = Attempts(0.03, 0.0, fail={1})
+
+    assert await hedger.run(attempts) == 0
+
+@pytest.mark.asyncio
+async def test_budget_limits_hedges():
+    hedger = Hedger(_policy(budget=0.5, initial_delay=0.001))
+
+    for _ in range(4):
+        await hedger.run(Attempts(0.005, 0.005))
+
+    stats = hedger.stats()
+    assert stats["reads"] == 4
+    assert stats["hedged"] == 2
+    assert stats["budget_denied"] == 2
+
+@pytest.mark.asyncio
+async def test_delay_tracks_latency_percentile():
+    hedger = Hedger(HedgePolicy(percentile=50, min_samples=4, refresh_every=4, min_delay=0.0))
+    for _ in range(4):
+        await hedger.run(Attempts(0.0))
+    assert hedger.delay() < 0.01
+
+@pytest.mark.asyncio
+async def test_delay_learns_from_primary_attempts_only():
+    hedger = Hedger(_policy())
+
+    # The primary fails at 50ms; the hedge started at 10ms answers at ~310ms
+    assert await hedger.run(Attempts(0.05, 0.3, fail={0})) == 1
+    assert 0.05 <= hedger.latencies.percentile(100) < 0.2
+
+    # The hedge wins at ~10ms; the abandoned primary counts as running that long
+    assert await hedger.run(Attempts(1.0, 0.0)) == 1
+    assert hedger.latencies.count == 2
+    assert 0.01 <= hedger.latencies.percentile(0) < 0.05
+
+@pytest.mark.asyncio
+async def test_driver_hedges_only_read_only_queries(mocker):
+    mocker.patch("neo4j.AsyncGraphDatabase.driver")
+    driver = AsyncNeo4jDriver(hedge_policy=_policy())
+    # Third attempt is a write slower than the hedge delay
+    attempts = Attempts(1.0, 0.0, 0.03)
+    driver._run = lambda *args: attempts()
+
+    assert await driver.run_query("MATCH (n) RETURN n", read_only=True) == 1
+    assert driver.hedge_stats()["hedged"] == 1
+
+    assert await driver.run_query("CREATE (n)") == 2
+    assert attempts.started == 3
+    assert driver.hedge_stats()["reads"] == 1
+
+@pytest.mark.asyncio
+async def test_service_reads_are_read_only_so_they_can_be_hedged():
+    from social_graph import service_async
+    from social_graph.models import User
+
+    modes = []
+
+    class RecordingDriver:
+        async def run_query(self, query, params, read_only=False):
+            modes.append(read_only)
+            return [{"friend": "bob"}] if read_only else [{"username": "gina"}]
+
+    driver = RecordingDriver()
+    assert await service_async.list_friends("alice", driver=driver) == ["bob"]
+    await service_async.add_user(User(username="gina"), driver=driver)
+    await service_async.change_bus.close()
+
+    assert modes == [True, False]
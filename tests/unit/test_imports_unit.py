@@ -0,0 +1,60 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SRC = str(Path(__file__).resolve().parents[2] / "src")
+HEAVY = ["neo4j", "networkx", "numpy", "scipy", "dotenv"]
+
+def _loaded_after_import(module):
+    """Import `module` in a fresh interpreter; return the heavy modules it loaded."""
+    code = (
+        "import json, sys\n"
+        f"import {module}\n"
+        f"print(json.dumps([m for m in {HEAVY!r} if m in sys.modules]))\n"
+    )
+    env = {**os.environ, "PYTHONPATH": SRC}
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, env=env, check=True
+    )
+    return json.loads(out.stdout)
+
+@pytest.mark.parametrize("module", [
+    "social_graph",
+    "social_graph.config",
+    "social_graph.models",
+    "social_graph.db",
+    "social_graph.db_async",
+    "social_graph.service",
+    "social_graph.service_async",
+    "social_graph.analytics",
+    "social_graph.recommender",
+])
+def test_light_modules_do_not_import_heavy_dependencies(module):
+    assert _loaded_after_import(module) == []
+
+def test_analytics_local_defers_networkx_and_scipy():
+    # numpy backs GraphSnapshot itself; graph libraries load on first use
+    assert _loaded_after_import("social_graph.analytics_local") == ["numpy"]
+
+def test_lazy_package_attributes_resolve():
+    import social_graph
+    from social_graph.db import Neo4jDriver
+
+    assert social_graph.Neo4jDriver is Neo4jDriver
+    with pytest.raises(AttributeError):
+        social_graph.missing_attribute
+
+def test_config_settings_load_on_first_access():
+    code = (
+        "import sys\n"
+        "from social_graph import config\n"
+        "assert 'dotenv' not in sys.modules\n"
+        "assert config.single_edge_storage()\n"
+        "assert 'dotenv' in sys.modules\n"
+    )
+    env = {**os.environ, "PYTHONPATH": SRC, "FRIENDSHIP_STORAGE": "single"}
+    subprocess.run([sys.executable, "-c", code], env=env, check=True)
@@ -0,0 +1,51 @@
+import asyncio
+import pytest
+from social_graph.loadgen import Operation, run_load
+
+async def _ok(rng):
+    await asyncio.sleep(0)
+
+async def _fail(rng):
+    raise RuntimeError("boom")
+
+@pytest.mark.asyncio
+async def test_closed_loop_counts_successes_and_errors():
+    result = await run_load(
+        [Operation("ok", 1.0, _ok), Operation("fail", 1.0, _fail)],
+        duration=0.1,
+        concurrency=4,
+    )
+
+    summary = result.summary()
+    assert summary["ok"]["count"] > 0
+    assert summary["ok"]["error_rate"] == 0.0
+    assert summary["fail"]["count"] == 0
+    assert summary["fail"]["error_rate"] == 1.0
+    assert result.completed == summary["ok"]["count"]
+
+@pytest.mark.asyncio
+async def test_open_loop_sheds_beyond_in_flight_cap():
+    async def slow(rng):
+        await asyncio.sleep(0.2)
+
+    progress = []
+    result = await run_load(
+        [Operation("slow", 1.0, slow)],
+        duration=0.1,
+        concurrency=2,
+        rate=500,
+        on_progress=progress.append,
+        progress_interval=0.05,
+    )
+
+    # Only two requests fit in flight; every other arrival is shed
+    assert result.completed == 2
+    assert result.shed > 0
+    # Latency includes the full service time of the slow operation
+    assert result.latency["slow"].percentile(50) >= 0.2
+    assert progress and progress[-1] is result
+
+@pytest.mark.asyncio
+async def test_run_load_requires_operations():
+    with pytest.raises(ValueError):
+        await run_load([], duration=0.1)
@@ -0,0 +1,80 @@
+import pytest
+from social_graph import analytics, config, service_async
+from social_graph.analytics_local import _fetch_graph_snapshot
+from social_graph.testing import InMemoryAsyncDriver
+from social_graph.migrations import (
+    collapse_duplicate_friendships, count_duplicate_friendships, create_version_indexes,
+)
+from social_graph.models import Friendship
+from social_graph.recommender import Recommender
+
+class RecordingDriver:
+    """Returns scripted rows for the batched migration query."""
+
+    def __init__(self, rows):
+        self.rows = list(rows)
+        self.calls = []
+        self.modes = []
+
+    async def run_query(self, query, params):
+        self.calls.append((query, params))
+        return [self.rows.pop(0)] if self.rows else []
+
+    async def execute_read(self, query, params):
+        self.modes.append("read")
+        return await self.run_query(query, params)
+
+    async def execute_write(self, query, params):
+        self.modes.append("write")
+        return await self.run_query(query, params)
+
+@pytest.mark.asyncio
+async def test_collapse_duplicate_friendships_paginates_and_sums_removed():
+    driver = RecordingDriver([
+        {"updated": 2, "last": "bob", "removed": 1},
+        {"updated": 2, "last": "dave", "removed": 2},
+        {"updated": 1, "last": "erin", "removed": 0},
+    ])
+
+    removed = await collapse_duplicate_friendships(batch_size=2, driver=driver)
+
+    assert removed == 3
+    assert [params["after"] for _, params in driver.calls] == [None, "bob", "dave"]
+    assert driver.modes == ["write"] * 3
+    query = driver.calls[0][0]
+    # Only the higher -> lower relationship of a two-way pair is deleted
+    assert "u.username > v.username" in query
+    assert "EXISTS { (v)-[:FRIEND_WITH]->(u) }" in query
+
+@pytest.mark.asyncio
+async def test_create_version_indexes_indexes_stamps_and_drops_graph_meta():
+    driver = RecordingDriver([])
+    await create_version_indexes(driver=driver)
+
+    queries = [query for query, _ in driver.calls]
+    assert driver.modes == ["write"] * 3
+    assert "FOR (u:User) ON (u.created_at)" in queries[0]
+    assert "FOR ()-[r:FRIEND_WITH]-() ON (r.created_at)" in queries[1]
+    assert queries[2] == "MATCH (meta:GraphMeta) DETACH DELETE meta"
+
+@pytest.mark.asyncio
+async def test_count_duplicate_friendships():
+    driver = RecordingDriver([{"duplicates": 4}])
+    assert await count_duplicate_friendships(driver=driver) == 4
+    assert driver.modes == ["read"]
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("storage", ["double", "single"])
+async def test_storage_modes_read_the_same_graph(monkeypatch, storage):
+    monkeypatch.setattr(config, "FRIENDSHIP_STORAGE", storage)
+    driver = InMemoryAsyncDriver(["alice", "bob", "carol"])
+    await service_async.add_friendship(Friendship(user1="carol", user2="alice"), driver=driver)
+    await service_async.add_friendship(Friendship(user1="alice", user2="bob"), driver=driver)
+
+    assert await service_async.list_friends("alice", driver=driver) == ["bob", "carol"]
+    assert await service_async.list_friends("carol", driver=driver) == ["alice"]
+    _, edges = await _fetch_graph_snapshot(driver)
+    assert sorted(edges) == [("alice", "bob"), ("alice", "carol")]
+    assert await analytics.degrees(["alice", "bob"], driver=driver) == {"alice": 2, "bob": 1}
+    assert await Recommender(driver=driver).mutual_friend_count("bob", "carol") == 1
+    assert await collapse_duplicate_friendships(batch_size=2, driver=driver) == 0
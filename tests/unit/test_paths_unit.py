@@ -0,0 +1,67 @@
+import networkx as nx
+import pytest
+from social_graph import paths
+from social_graph.snapshot import GraphSnapshot
+from social_graph.synthetic import power_law_graph
+
+class RecordingDriver:
+    """Mock async driver returning canned rows and recording queries."""
+    def __init__(self, *responses: list[dict]):
+        self.responses = list(responses)
+        self.calls: list[tuple[str, dict]] = []
+
+    async def run_query(self, query: str, params: dict) -> list[dict]:
+        self.calls.append((query, params))
+        return self.responses.pop(0) if self.responses else []
+
+    execute_read = execute_write = run_query
+
+@pytest.fixture
+def chain():
+    # a - b - c - d - e, plus a shortcut a - x - d and an isolated user
+    return GraphSnapshot.from_edges(
+        ["lonely"],
+        [("a", "b"), ("b", "c"), ("c", "d"), ("d", "e"), ("a", "x"), ("x", "d")],
+    )
+
+@pytest.mark.asyncio
+async def test_shortest_path_inlines_validated_hop_bound():
+    driver = RecordingDriver([{"path": ["alice", "bob", "carol"]}])
+
+    path = await paths.shortest_path("alice", "carol", max_hops=4, driver=driver)
+
+    assert path == ["alice", "bob", "carol"]
+    query, params = driver.calls[0]
+    assert "shortestPath((a)-[:FRIEND_WITH*..4]-(b))" in query
+    assert params == {"source": "alice", "target": "carol"}
+
+@pytest.mark.asyncio
+async def test_shortest_path_no_path_and_bad_bound():
+    driver = RecordingDriver()
+    assert await paths.shortest_path("alice", "zed", driver=driver) is None
+    with pytest.raises(ValueError):
+        await paths.shortest_path("alice", "zed", max_hops="3) DETACH DELETE a //", driver=driver)
+    assert len(driver.calls) == 1
+
+def test_shortest_path_local_basic_cases(chain):
+    assert paths.shortest_path_local(chain, "a", "e") == ["a", "x", "d", "e"]
+    assert paths.shortest_path_local(chain, "b", "b") == ["b"]
+    assert paths.shortest_path_local(chain, "a", "lonely") is None
+    assert paths.shortest_path_local(chain, "a", "nobody") is None
+    # Cut off beyond max_hops
+    assert paths.shortest_path_local(chain, "a", "e", max_hops=2) is None
+    assert paths.shortest_path_local(chain, "a", "e", max_hops=3) == ["a", "x", "d", "e"]
+
+def test_shortest_paths_local_batch_matches_networkx():
+    nodes, edges = power_law_graph(300, edges_per_user=2, seed=5)
+    snapshot = GraphSnapshot.from_edges(nodes, edges)
+    G = nx.Graph(edges)
+    pairs = [(nodes[i], nodes[(i * 37 + 11) % len(nodes)]) for i in range(0, 300, 7)]
+
+    results = paths.shortest_paths_local(snapshot, pairs, max_hops=10)
+
+    assert len(results) == len(pairs)
+    for (source, target), path in zip(pairs, results):
+        assert path[0] == source and path[-1] == target
+        assert len(path) - 1 == nx.shortest_path_length(G, source, target)
+        assert all(G.has_edge(u, v) for u, v in zip(path, path[1:]))
@@ -0,0 +1,72 @@
+import networkx as nx
+import pytest
+from social_graph.testing import InMemoryAsyncDriver
+from social_graph.ppr import PPRCandidateSource, WalkIndex, personalized_pagerank
+from social_graph.recommender import Recommender
+from social_graph.recommender_local import LocalRecommender
+from social_graph.snapshot import GraphSnapshot
+from social_graph.synthetic import power_law_graph
+
+# a's only friend-of-friend is c; d and e are three and four hops away
+CHAIN = [("a", "b"), ("b", "c"), ("c", "d"), ("d", "e")]
+
+@pytest.fixture(scope="module")
+def graph():
+    nodes, edges = power_law_graph(300, edges_per_user=2, seed=9)
+    return nodes, edges, GraphSnapshot.from_edges(nodes, edges)
+
+@pytest.mark.parametrize("use_index", [False, True])
+def test_personalized_pagerank_close_to_networkx(graph, use_index):
+    nodes, edges, snapshot = graph
+    source = 17
+    index = WalkIndex.build(snapshot, segments_per_node=16, segment_length=6, seed=1) if use_index else None
+
+    ids, scores = personalized_pagerank(
+        snapshot, source, num_walks=20_000, max_steps=60, index=index, seed=2
+    )
+
+    exact = nx.pagerank(nx.Graph(edges), alpha=0.85, personalization={nodes[source]: 1})
+    estimated = dict(zip((nodes[i] for i in ids.tolist()), scores.tolist()))
+    assert ids[0] == source
+    for user in sorted(exact, key=lambda u: -exact[u])[:5]:
+        assert estimated.get(user, 0.0) == pytest.approx(exact[user], abs=0.02)
+
+def test_walk_index_shape_and_isolated_nodes():
+    snapshot = GraphSnapshot.from_edges(["lonely"], CHAIN)
+    index = WalkIndex.build(snapshot, segments_per_node=3, segment_length=4)
+
+    assert index.segments.shape == (6, 3, 4)
+    lonely = snapshot.id_of("lonely")
+    assert (index.segments[lonely] == -1).all()
+    assert (index.segments[snapshot.id_of("a"), :, 0] == snapshot.id_of("b")).all()
+    with pytest.raises(ValueError):
+        personalized_pagerank(snapshot, lonely, restart=0.0)
+
+@pytest.mark.asyncio
+async def test_ppr_source_extends_sparse_users_beyond_two_hops():
+    snapshot = GraphSnapshot.from_edges([], CHAIN)
+    source = PPRCandidateSource(snapshot, num_walks=5_000, max_steps=30)
+
+    async def async_source(username, limit):
+        return source(username, limit)
+
+    plain = await Recommender(driver=InMemoryAsyncDriver(edges=CHAIN)).recommend_top_k("a", k=3)
+    remote = await Recommender(
+        driver=InMemoryAsyncDriver(edges=CHAIN), candidate_source=async_source
+    ).recommend_top_k("a", k=3)
+    local = LocalRecommender(snapshot, candidate_source=source).recommend_top_k("a", k=3)
+
+    assert [r["username"] for r in plain] == ["c"]
+    # Extra candidates have no mutual friends, so they rank after c
+    assert remote[0]["username"] == "c"
+    assert {r["username"] for r in remote} == {"c", "d", "e"}
+    assert remote == local
+
+def test_ppr_scorer_ranks_by_walk_score():
+    snapshot = GraphSnapshot.from_edges([], CHAIN)
+    source = PPRCandidateSource(snapshot, num_walks=5_000, max_steps=30)
+
+    ranked = LocalRecommender(snapshot, scorer="ppr", candidate_source=source).recommend_top_k("a", k=3)
+
+    assert [r["username"] for r in ranked] == ["c", "d", "e"]
+    assert ranked[0]["score"] > ranked[1]["score"] > ranked[2]["score"] > 0
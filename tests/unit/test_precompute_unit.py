@@ -0,0 +1,90 @@
+import json
+
+import pytest
+import pytest_asyncio
+from social_graph import analytics_local
+from social_graph.analytics_runner import AnalyticsRunner
+from social_graph.testing import InMemoryAsyncDriver
+from social_graph.precompute import partition_ranges, precompute_recommendations
+from social_graph.recommender import Recommender
+from social_graph.recommender_local import LocalRecommender
+from social_graph.snapshot import GraphSnapshot
+from social_graph.synthetic import power_law_graph
+
+@pytest.fixture
+def graph():
+    return power_law_graph(120, edges_per_user=3, num_supernodes=1, seed=3)
+
+@pytest_asyncio.fixture
+async def runner():
+    async with AnalyticsRunner(max_workers=1) as r:
+        yield r
+
+@pytest.mark.asyncio
+async def test_local_recommender_matches_cypher_recommender(graph):
+    nodes, edges = graph
+    local = LocalRecommender(GraphSnapshot.from_edges(nodes, edges))
+    remote = Recommender(driver=InMemoryAsyncDriver(nodes, edges))
+
+    for username in nodes[::10]:
+        assert local.recommend_top_k(username, k=5) == await remote.recommend_top_k(username, k=5)
+        assert local.suggest_friends_2nd_degree(username, limit=7) == (
+            await remote.suggest_friends_2nd_degree(username, limit=7)
+        )
+    assert local.recommend_top_k("nobody") == []
+
+def test_partition_ranges_cover_all_ids():
+    assert partition_ranges(10, 3) == [(0, 4), (4, 7), (7, 10)]
+    assert partition_ranges(2, 16) == [(0, 1), (1, 2)]
+    assert partition_ranges(0, 4) == []
+
+@pytest.mark.asyncio
+async def test_precompute_writes_and_resumes_from_checkpoint(graph, runner, tmp_path):
+    nodes, edges = graph
+    driver = InMemoryAsyncDriver(nodes, edges)
+    snapshot = await analytics_local.load_snapshot(str(tmp_path / "graph.snap"), driver=driver)
+    checkpoint = tmp_path / "progress.json"
+
+    stats = await precompute_recommendations(
+        snapshot, k=5, partitions=4, batch_size=25,
+        checkpoint_path=str(checkpoint), driver=driver, runner=runner,
+    )
+
+    assert (stats.partitions, stats.skipped_partitions, stats.users_written) == (4, 0, len(nodes))
+    assert json.loads(checkpoint.read_text())["completed"] == [0, 1, 2, 3]
+    recommender = Recommender(driver=driver)
+    for username in nodes[::15]:
+        assert await recommender.stored_recommendations(username) == (
+            await recommender.recommend_top_k(username, k=5)
+        )
+
+    # Same snapshot and parameters: everything is already done
+    resumed = await precompute_recommendations(
+        snapshot, k=5, partitions=4,
+        checkpoint_path=str(checkpoint), driver=driver, runner=runner,
+    )
+    assert (resumed.skipped_partitions, resumed.users_written) == (4, 0)
+
+    # Changed parameters invalidate the checkpoint
+    rerun = await precompute_recommendations(
+        snapshot, k=3, partitions=4,
+        checkpoint_path=str(checkpoint), driver=driver, runner=runner,
+    )
+    assert (rerun.skipped_partitions, rerun.users_written) == (0, len(nodes))
+
+@pytest.mark.asyncio
+async def test_precompute_exports_in_memory_snapshot_once(graph, runner, mocker):
+    from social_graph import analytics_runner
+
+    nodes, edges = graph
+    driver = InMemoryAsyncDriver(nodes, edges)
+    export = mocker.spy(analytics_runner, "_export_snapshot")
+    release = mocker.spy(analytics_runner, "_release_blocks")
+
+    stats = await precompute_recommendations(
+        GraphSnapshot.from_edges(nodes, edges), k=5, partitions=4, driver=driver, runner=runner,
+    )
+
+    assert stats.users_written == len(nodes)
+    assert export.call_count == 1
+    assert release.call_count == 1
@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+from social_graph.testing import InMemoryAsyncDriver
+from social_graph.recommender import Recommender
+
+class StallingDriver(InMemoryAsyncDriver):
+    """Answers from memory, but queries mentioning `stall_on` never finish."""
+
+    def __init__(self, *args, stall_on=None, stall_param=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stall_on = stall_on
+        self.stall_param = stall_param
+        self.cancelled = 0
+
+    async def run_query(self, query, params=None):
+        params = params or {}
+        if self.stall_on and self.stall_on in query and (
+            self.stall_param is None or self.stall_param in params.values()
+        ):
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                self.cancelled += 1
+                raise
+        return await super().run_query(query, params)
+
+def _graph():
+    # A---B---C,  A---D---F,  A---E---F
+    return (
+        ["A", "B", "C", "D", "E", "F"],
+        [("A", "B"), ("B", "C"), ("A", "D"), ("D", "F"), ("A", "E"), ("E", "F")],
+    )
+
+@pytest.mark.asyncio
+async def test_budget_returns_best_so_far_and_cancels_pending_query():
+    # F (2 mutuals) is scored first; C's degree lookup never returns
+    driver = StallingDriver(*_graph(), stall_on="AS degree", stall_param="C")
+    rec = Recommender(driver=driver)
+
+    results = await rec.recommend_top_k("A", k=5, time_budget=0.05)
+
+    assert results.partial is True
+    assert [r["username"] for r in results] == ["F"]
+    assert driver.cancelled == 1
+
+@pytest.mark.asyncio
+async def test_budget_expiring_during_discovery_returns_empty_partial():
+    driver = StallingDriver(*_graph(), stall_on="(fof:User)")
+    rec = Recommender(driver=driver)
+
+    results = await rec.recommend_top_k("A", k=5, time_budget=0.02)
+
+    assert results == [] and results.partial is True
+    assert driver.cancelled == 1
+
+@pytest.mark.asyncio
+async def test_slow_async_candidate_source_is_skipped():
+    async def stalled_source(username, limit):
+        await asyncio.Event().wait()
+
+    rec = Recommender(driver=InMemoryAsyncDriver(*_graph()), candidate_source=stalled_source)
+
+    results = await rec.recommend_top_k("A", k=5, time_budget=0.05)
+
+    assert [r["username"] for r in results] == ["F", "C"]
+    assert results.partial is True
+
+@pytest.mark.asyncio
+async def test_budget_not_reached_gives_complete_result():
+    rec = Recommender(driver=InMemoryAsyncDriver(*_graph()), scorer="jaccard")
+
+    budgeted = await rec.recommend_top_k("A", k=5, time_budget=5.0)
+    unbudgeted = await rec.recommend_top_k("A", k=5)
+
+    assert budgeted == unbudgeted
+    assert budgeted.partial is False and unbudgeted.partial is False
@@ -1,6 +1,10 @@
 import pytest
 import pytest_asyncio
 from src.social_graph.recommender import Recommender
+from social_graph.testing import InMemoryAsyncDriver
+from social_graph.recommender_local import LocalRecommender
+from social_graph.snapshot import GraphSnapshot
+from social_graph.synthetic import power_law_graph
 
 class MockDriver:
     """Mock async driver to simulate Neo4j query results."""
@@ -11,6 +15,8 @@ class MockDriver:
             return [{"mutual_count": 0}]
         return []
 
+    execute_read = execute_write = run_query
+
 @pytest_asyncio.fixture
 async def recommender():
     return Recommender(driver=MockDriver())
@@ -29,3 +35,37 @@ async def test_mutual_friend_count_zero(recommender):
 async def test_mutual_friend_count_no_result(recommender):
     count = await recommender.mutual_friend_count("foo", "bar")
     assert count == 0
+
+@pytest.mark.asyncio
+async def test_mutual_friends_many_is_one_query_and_matches_local():
+    nodes, edges = power_law_graph(120, edges_per_user=4, num_supernodes=2, seed=9)
+    driver = InMemoryAsyncDriver(nodes, edges)
+    remote = Recommender(driver=driver)
+    local = LocalRecommender(GraphSnapshot.from_edges(nodes, edges))
+    pairs = [(a, b) for a in nodes[:10] for b in nodes[::12]] + [("ghost", nodes[0])]
+
+    before = driver.query_count
+    result = await remote.mutual_friends_many(pairs, names_limit=2)
+    assert driver.query_count - before == 1
+    assert result == local.mutual_friends_many(pairs, names_limit=2)
+
+    for row, (a, b) in zip(result, pairs):
+        assert (row["user_a"], row["user_b"]) == (a, b)
+        names = await remote.list_mutual_friends(a, b)
+        assert row["mutual_count"] == len(names)
+        assert row["mutual_friends"] == names[:2]
+
+@pytest.mark.asyncio
+async def test_mutual_friends_many_dedups_pairs_and_keeps_order():
+    edges = [("alice", "carol"), ("bob", "carol"), ("alice", "dave"), ("bob", "dave")]
+    driver = InMemoryAsyncDriver(["alice", "bob", "carol", "dave"], edges)
+    rec = Recommender(driver=driver)
+    result = await rec.mutual_friends_many(
+        [("alice", "bob"), ("alice", "alice"), ("alice", "bob")]
+    )
+    assert result == [
+        {"user_a": "alice", "user_b": "bob", "mutual_count": 2, "mutual_friends": []},
+        {"user_a": "alice", "user_b": "alice", "mutual_count": 0, "mutual_friends": []},
+        {"user_a": "alice", "user_b": "bob", "mutual_count": 2, "mutual_friends": []},
+    ]
+    assert await rec.mutual_friends_many([]) == []
@@ -0,0 +1,56 @@
+import pytest
+from social_graph.testing import InMemoryAsyncDriver
+from social_graph.recommender import Recommender, Recommendations
+
+def _driver():
+    # A---B---C
+    # A---D---F
+    # A---E---F
+    return InMemoryAsyncDriver(
+        ["A", "B", "C", "D", "E", "F"],
+        [("A", "B"), ("B", "C"), ("A", "D"), ("D", "F"), ("A", "E"), ("E", "F")],
+    )
+
+@pytest.mark.asyncio
+async def test_profile_records_stages_queries_and_rows():
+    rec = Recommender(driver=_driver())
+
+    results = await rec.recommend_top_k("A", k=5, profile=True)
+
+    assert [r["username"] for r in results] == ["F", "C"]
+    profile = results.profile
+    assert profile.username == "A"
+    assert profile.candidates == 2
+    # 1 candidate query + 1 degree lookup per candidate
+    assert profile.queries == 3
+    assert profile.rows == 4
+    assert set(profile.stage_seconds) == {
+        "candidate_discovery", "scoring", "degree_lookup", "heap_selection",
+    }
+    assert profile.stage_seconds["degree_lookup"] <= profile.stage_seconds["scoring"]
+    assert profile.total_seconds >= sum(
+        v for name, v in profile.stage_seconds.items() if name != "degree_lookup"
+    )
+
+@pytest.mark.asyncio
+async def test_profile_off_by_default():
+    rec = Recommender(driver=_driver())
+
+    results = await rec.recommend_top_k("A", k=5)
+
+    assert isinstance(results, Recommendations)
+    assert results.profile is None
+
+@pytest.mark.asyncio
+async def test_profile_hook_collects_without_attaching():
+    collected = []
+    rec = Recommender(driver=_driver(), profile_hook=collected.append)
+
+    results = await rec.recommend_top_k("Z", k=5)
+
+    assert results == []
+    assert results.profile is None
+    assert len(collected) == 1
+    assert collected[0].username == "Z"
+    assert collected[0].candidates == 0
+    assert collected[0].queries == 1
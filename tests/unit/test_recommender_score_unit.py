@@ -9,7 +9,7 @@ async def test_compute_score_math_only(mocker):
     rec = Recommender(alpha=0.7, beta=0.3)
 
     # Spy on driver to ensure it's never used
-    mock_driver = mocker.spy(rec.driver, "run_query")
+    mock_driver = mocker.spy(rec.driver, "execute_read")
 
     mocker.patch.object(rec, "mutual_friend_count", return_value=3)
     mocker.patch.object(rec, "_get_degree", return_value=50)
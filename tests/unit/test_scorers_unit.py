@@ -0,0 +1,66 @@
+import math
+
+import pytest
+from social_graph.testing import InMemoryAsyncDriver
+from social_graph.recommender import Recommender
+from social_graph.recommender_local import LocalRecommender
+from social_graph.scorers import SCORERS, JaccardScorer, get_scorer
+from social_graph.snapshot import GraphSnapshot
+from social_graph.synthetic import power_law_graph
+
+# alice's friends: bob, carol. dave is a friend of both; erin only of carol.
+EDGES = [
+    ("alice", "bob"), ("alice", "carol"),
+    ("bob", "dave"), ("carol", "dave"), ("carol", "erin"), ("dave", "frank"),
+]
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("name", sorted(SCORERS))
+async def test_scorer_costs_one_query_and_matches_local(name):
+    nodes, edges = power_law_graph(150, edges_per_user=3, num_supernodes=1, seed=4)
+    driver = InMemoryAsyncDriver(nodes, edges)
+    remote = Recommender(driver=driver, scorer=name)
+    local = LocalRecommender(GraphSnapshot.from_edges(nodes, edges), scorer=name)
+
+    for username in nodes[::15]:
+        before = driver.query_count
+        result = await remote.recommend_top_k(username, k=5)
+        assert driver.query_count - before == 1
+        assert result == local.recommend_top_k(username, k=5)
+
+@pytest.mark.asyncio
+async def test_scorer_values_on_small_graph():
+    driver = InMemoryAsyncDriver(edges=EDGES)
+
+    jaccard = await Recommender(driver=driver, scorer="jaccard").recommend_top_k("alice")
+    adamic_adar = await Recommender(driver=driver, scorer="adamic_adar").recommend_top_k("alice")
+    resource = await Recommender(driver=driver, scorer="resource_allocation").recommend_top_k("alice")
+
+    # dave: 2 mutuals, N(alice) ∪ N(dave) = {bob, carol, frank}; erin: 1 of {bob, carol}
+    assert jaccard == [
+        {"username": "dave", "score": round(2 / 3, 4), "mutuals": 2},
+        {"username": "erin", "score": 0.5, "mutuals": 1},
+    ]
+    # bob has degree 2, carol degree 3
+    assert adamic_adar[0] == {
+        "username": "dave", "score": round(1 / math.log(2) + 1 / math.log(3), 4), "mutuals": 2,
+    }
+    assert resource == [
+        {"username": "dave", "score": round(1 / 2 + 1 / 3, 4), "mutuals": 2},
+        {"username": "erin", "score": round(1 / 3, 4), "mutuals": 1},
+    ]
+
+@pytest.mark.asyncio
+async def test_degree_penalty_scorer_matches_compute_score_path():
+    driver = InMemoryAsyncDriver(edges=EDGES)
+    default = await Recommender(driver=driver).recommend_top_k("alice")
+    scored = await Recommender(driver=driver, scorer="degree_penalty").recommend_top_k("alice")
+    assert scored == default
+
+def test_get_scorer_resolution():
+    scorer = JaccardScorer()
+    assert get_scorer(scorer) is scorer
+    penalty = get_scorer("degree_penalty", alpha=1.0, beta=0.5)
+    assert (penalty.alpha, penalty.beta) == (1.0, 0.5)
+    with pytest.raises(ValueError):
+        get_scorer("cosine")
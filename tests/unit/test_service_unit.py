@@ -1,6 +1,11 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import MagicMock
+
+import pytest
 from social_graph.models import User, Friendship
-from social_graph import service
+from social_graph import db, service
 
 def test_add_user_with_injected_driver():
     mock_driver = MagicMock()
@@ -26,8 +31,10 @@ def test_add_friendship_executes_expected_query():
     mock_driver.run_query.assert_called_once_with(
         """
     MATCH (a:User {username: $user1}), (b:User {username: $user2})
-    MERGE (a)-[:FRIEND_WITH]->(b)
-    MERGE (b)-[:FRIEND_WITH]->(a)
+    MERGE (a)-[ab:FRIEND_WITH]->(b)
+    ON CREATE SET ab.created_at = timestamp()
+    MERGE (b)-[ba:FRIEND_WITH]->(a)
+    ON CREATE SET ba.created_at = timestamp()
     RETURN a.username AS user1, b.username AS user2
     """,
         {"user1": "alice", "user2": "bob"},
@@ -48,10 +55,100 @@ def test_list_friends_returns_sorted_list():
     # Assert
     mock_driver.run_query.assert_called_once_with(
         """
-    MATCH (u:User {username: $username})-[:FRIEND_WITH]->(f:User)
-    RETURN f.username AS friend
-    ORDER BY f.username
+    MATCH (u:User {username: $username})-[:FRIEND_WITH]-(f:User)
+    RETURN DISTINCT f.username AS friend
+    ORDER BY friend
     """,
         {"username": "alice"},
     )
     assert result == ["bob", "charlie"]
+
+def test_add_friendship_single_edge_storage(monkeypatch):
+    monkeypatch.setattr(service.config, "FRIENDSHIP_STORAGE", "single")
+    mock_driver = MagicMock()
+    mock_driver.run_query.return_value = [{"user1": "bob", "user2": "alice"}]
+
+    result = service.add_friendship(Friendship(user1="bob", user2="alice"), driver=mock_driver)
+
+    query, params = mock_driver.run_query.call_args.args
+    # One undirected MERGE, anchored lower -> higher username
+    assert query.count("FRIEND_WITH") == 1
+    assert "MERGE (a)-[r:FRIEND_WITH]-(b)" in query
+    # Only the new relationship is stamped; no shared node is written
+    assert "ON CREATE SET r.created_at = timestamp()" in query
+    assert "GraphMeta" not in query
+    assert params == {"user1": "bob", "user2": "alice", "low": "alice", "high": "bob"}
+    assert result == [{"user1": "bob", "user2": "alice"}]
+
+@pytest.mark.parametrize("storage", ["double", "single"])
+def test_list_friends_matches_both_directions_in_every_storage_mode(monkeypatch, storage):
+    # A double-mode reader must not lose friends once the migration has
+    # collapsed a pair to one relationship, nor see a pair stored both
+    # ways twice before it has
+    monkeypatch.setattr(service.config, "FRIENDSHIP_STORAGE", storage)
+    mock_driver = MagicMock()
+    mock_driver.run_query.return_value = [{"friend": "bob"}]
+
+    assert service.list_friends("alice", driver=mock_driver) == ["bob"]
+
+    query = mock_driver.run_query.call_args.args[0]
+    assert "-[:FRIEND_WITH]-(f:User)" in query
+    assert "RETURN DISTINCT" in query
+
+def test_unknown_friendship_storage_is_rejected(monkeypatch):
+    monkeypatch.setattr(service.config, "FRIENDSHIP_STORAGE", "triple")
+    with pytest.raises(ValueError, match="FRIENDSHIP_STORAGE"):
+        service.add_friendship(Friendship(user1="alice", user2="bob"), driver=MagicMock())
+
+def test_batch_executor_runs_calls_in_parallel_and_keeps_order():
+    barrier = threading.Barrier(4, timeout=5)
+    mock_driver = MagicMock()
+
+    def run_query(query, params):
+        # Every worker must be in flight at once for the barrier to open
+        barrier.wait()
+        return [{"friend": params["username"] + "-friend"}]
+
+    mock_driver.run_query.side_effect = run_query
+
+    with service.ServiceBatchExecutor(max_workers=4, driver=mock_driver) as executor:
+        result = executor.list_friends_many(["d", "a", "c", "b", "a"])
+
+    assert list(result) == ["d", "a", "c", "b"]
+    assert result["a"] == ["a-friend"]
+    assert mock_driver.run_query.call_count == 4
+
+def test_batch_executor_covers_writes():
+    mock_driver = MagicMock()
+    mock_driver.run_query.side_effect = lambda query, params: [dict(params)]
+
+    with service.ServiceBatchExecutor(max_workers=2, driver=mock_driver) as executor:
+        users = executor.add_users([User(username="alice"), User(username="bob")])
+        friendships = executor.add_friendships([Friendship(user1="alice", user2="bob")])
+
+    assert users == [[{"username": "alice"}], [{"username": "bob"}]]
+    assert friendships == [[{"user1": "alice", "user2": "bob"}]]
+
+def test_list_friends_many_propagates_errors():
+    mock_driver = MagicMock()
+    mock_driver.run_query.side_effect = RuntimeError("db down")
+
+    with pytest.raises(RuntimeError, match="db down"):
+        service.list_friends_many(["alice"], driver=mock_driver, max_workers=2)
+
+def test_get_driver_creates_one_instance_across_threads(mocker):
+    created = []
+
+    def slow_driver():
+        time.sleep(0.01)
+        created.append(object())
+        return created[-1]
+
+    mocker.patch.object(db, "_driver_instance", None)
+    mocker.patch.object(db, "Neo4jDriver", side_effect=slow_driver)
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        drivers = list(pool.map(lambda _: db.get_driver(), range(8)))
+
+    assert len(created) == 1
+    assert all(d is created[0] for d in drivers)
@@ -0,0 +1,89 @@
+import asyncio
+import pytest
+from social_graph import service_async
+from social_graph.testing import InMemoryAsyncDriver
+from social_graph.recommender import Recommender
+from social_graph.singleflight import SingleFlight
+
+def _driver():
+    return InMemoryAsyncDriver(
+        ["A", "B", "C", "D"],
+        [("A", "B"), ("B", "C"), ("A", "D"), ("D", "C")],
+        latency=0.01,
+    )
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_calls_share_one_execution():
+    flight = SingleFlight()
+    executions = 0
+
+    async def work():
+        nonlocal executions
+        executions += 1
+        await asyncio.sleep(0.01)
+        return "value"
+
+    results = await asyncio.gather(*(flight.do("key", work) for _ in range(5)))
+
+    assert results == ["value"] * 5
+    assert executions == 1
+    assert flight.stats() == {"calls": 5, "deduplicated": 4, "in_flight": 0, "dedup_ratio": 0.8}
+
+    # Nothing is cached once the call has completed
+    await flight.do("key", work)
+    assert executions == 2
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_waiter():
+    flight = SingleFlight()
+
+    async def boom():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("db down")
+
+    results = await asyncio.gather(
+        flight.do("k", boom), flight.do("k", boom), return_exceptions=True
+    )
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_shared_call():
+    flight = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.02)
+        return 42
+
+    first = asyncio.create_task(flight.do("k", work))
+    second = asyncio.create_task(flight.do("k", work))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == 42
+
+@pytest.mark.asyncio
+async def test_list_friends_coalesces_identical_reads():
+    driver = _driver()
+
+    results = await asyncio.gather(
+        *(service_async.list_friends("A", driver=driver) for _ in range(10))
+    )
+
+    assert results == [["B", "D"]] * 10
+    assert driver.query_count == 1
+    # Each caller gets its own list
+    results[0].append("mutated")
+    assert results[1] == ["B", "D"]
+
+@pytest.mark.asyncio
+async def test_recommend_top_k_coalesces_identical_requests():
+    driver = _driver()
+    rec = Recommender(driver=driver)
+
+    results = await asyncio.gather(*(rec.recommend_top_k("A", k=3) for _ in range(8)))
+
+    assert all(r == results[0] for r in results)
+    assert [r["username"] for r in results[0]] == ["C"]
+    assert rec.coalescer.stats()["deduplicated"] == 7
+    # suggest + one degree lookup, issued once for all eight callers
+    assert driver.query_count == 2
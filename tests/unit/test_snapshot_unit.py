@@ -0,0 +1,115 @@
+import pytest
+from social_graph import analytics_local
+from social_graph.testing import InMemoryAsyncDriver
+from social_graph.snapshot import GraphSnapshot
+
+@pytest.fixture(autouse=True)
+def block_database_access(mocker):
+    """Ensure no real DB driver is created by the tests in this module."""
+    mocker.patch.object(
+        analytics_local,
+        "get_driver",
+        side_effect=AssertionError("get_driver() should not be called in unit tests"),
+    )
+
+class VersionDriver:
+    """Mock async driver answering only the snapshot version query."""
+    def __init__(self, users: int, friendships: int, stamp: int = 1):
+        self.row = {
+            "users": users,
+            "friendships": friendships,
+            "user_stamp": [1],
+            "friendship_stamp": [stamp],
+        }
+
+    async def run_query(self, query: str, params: dict) -> list[dict]:
+        assert "created_at" in query
+        return [self.row]
+
+    execute_read = execute_write = run_query
+
+def test_save_and_open_round_trip(tmp_path):
+    path = tmp_path / "graph.snap"
+    original = GraphSnapshot.from_edges(
+        ["zoë", "alice", "bob", "lonely"],
+        [("alice", "bob"), ("bob", "zoë")],
+        version="users=4;friendships=4",
+    )
+    original.save(path)
+
+    mapped = GraphSnapshot.open(path)
+
+    assert mapped.path == str(path)
+    assert mapped.version == "users=4;friendships=4"
+    assert list(mapped.usernames) == ["alice", "bob", "lonely", "zoë"]
+    assert mapped.indptr.tolist() == original.indptr.tolist()
+    assert mapped.indices.tolist() == original.indices.tolist()
+    assert mapped.id_of("zoë") == 3
+    assert sorted(mapped.to_networkx().edges()) == sorted(original.to_networkx().edges())
+
+def test_open_rejects_foreign_file(tmp_path):
+    path = tmp_path / "not-a-snapshot"
+    path.write_bytes(b"hello world, definitely not a graph snapshot")
+
+    with pytest.raises(ValueError):
+        GraphSnapshot.open(path)
+
+@pytest.mark.asyncio
+async def test_load_snapshot_refreshes_only_when_stale(mocker, tmp_path):
+    path = str(tmp_path / "graph.snap")
+    fetch = mocker.patch.object(
+        analytics_local,
+        "_fetch_graph_snapshot",
+        return_value=(["a", "b"], [("a", "b")]),
+    )
+
+    # Missing file -> fetched and written
+    first = await analytics_local.load_snapshot(path, driver=VersionDriver(2, 2))
+    assert first.version == "users=2;friendships=2;last_write=1"
+    assert fetch.call_count == 1
+
+    # Same version -> reopened from disk
+    await analytics_local.load_snapshot(path, driver=VersionDriver(2, 2))
+    assert fetch.call_count == 1
+
+    # Database changed -> refreshed
+    fetch.return_value = (["a", "b", "c"], [("a", "b"), ("b", "c")])
+    refreshed = await analytics_local.load_snapshot(path, driver=VersionDriver(3, 4, stamp=3))
+    assert fetch.call_count == 2
+    assert refreshed.num_edges == 2
+
+    # One friendship removed and another added: same counts, newer stamp
+    fetch.return_value = (["a", "b", "c"], [("a", "b"), ("a", "c")])
+    swapped = await analytics_local.load_snapshot(path, driver=VersionDriver(3, 4, stamp=5))
+    assert fetch.call_count == 3
+    assert sorted(swapped.to_networkx().edges()) == [("a", "b"), ("a", "c")]
+
+@pytest.mark.asyncio
+async def test_snapshot_version_changes_on_every_graph_write():
+    from social_graph import service_async
+    from social_graph.models import Friendship, User
+
+    driver = InMemoryAsyncDriver(["a", "b", "c"], [("a", "b")])
+    before = await analytics_local.fetch_snapshot_version(driver)
+    await service_async.add_friendship(Friendship(user1="b", user2="c"), driver=driver)
+    after = await analytics_local.fetch_snapshot_version(driver)
+    assert after != before
+
+    # Writes that change nothing (existing friendship, unknown user) leave it alone
+    await service_async.add_friendship(Friendship(user1="a", user2="b"), driver=driver)
+    await service_async.add_friendship(Friendship(user1="a", user2="ghost"), driver=driver)
+    assert await analytics_local.fetch_snapshot_version(driver) == after
+
+    # Wiping and rebuilding the same graph still yields a new version
+    await driver.run_query("MATCH (n) DETACH DELETE n")
+    for username in "abc":
+        await service_async.add_user(User(username=username), driver=driver)
+    for a, b in [("a", "b"), ("b", "c")]:
+        await service_async.add_friendship(Friendship(user1=a, user2=b), driver=driver)
+    rebuilt = await analytics_local.fetch_snapshot_version(driver)
+    assert rebuilt.split(";")[:2] == after.split(";")[:2] and rebuilt != after
+
+@pytest.mark.asyncio
+async def test_list_usernames_includes_isolated_users():
+    driver = InMemoryAsyncDriver(["carol", "bob", "alice"], [("alice", "bob")])
+    assert sorted(await analytics_local.list_usernames(driver)) == ["alice", "bob", "carol"]
@@ -0,0 +1,69 @@
+import pytest
+from social_graph.testing import InMemoryAsyncDriver, UnsupportedQueryError
+from social_graph.metrics import LatencyRecorder
+from social_graph.recommender import Recommender
+from social_graph.synthetic import power_law_graph
+
+def test_power_law_graph_is_deterministic():
+    first = power_law_graph(200, edges_per_user=3, num_supernodes=1, seed=7)
+    second = power_law_graph(200, edges_per_user=3, num_supernodes=1, seed=7)
+    other = power_law_graph(200, edges_per_user=3, num_supernodes=1, seed=8)
+
+    assert first == second
+    assert first != other
+
+def test_power_law_graph_shape_and_supernodes():
+    nodes, edges = power_law_graph(500, edges_per_user=2, num_supernodes=1, supernode_fraction=0.5, seed=1)
+
+    assert len(nodes) == 500
+    assert nodes == sorted(nodes)
+    assert all(a < b for a, b in edges)
+    assert len(set(edges)) == len(edges)
+
+    degree = {u: 0 for u in nodes}
+    for a, b in edges:
+        degree[a] += 1
+        degree[b] += 1
+    # Supernode touches at least half of the graph; typical users stay small
+    assert max(degree.values()) >= 249
+    assert min(degree.values()) >= 1
+
+@pytest.mark.asyncio
+async def test_inmemory_driver_serves_recommender_queries():
+    # Same graph as the recommender integration tests:
+    # A---B---C
+    # A---D---F
+    # A---E---F
+    driver = InMemoryAsyncDriver(
+        ["A", "B", "C", "D", "E", "F"],
+        [("A", "B"), ("B", "C"), ("A", "D"), ("D", "F"), ("A", "E"), ("E", "F")],
+    )
+    recommender = Recommender(driver=driver)
+
+    assert await recommender.suggest_friends_2nd_degree("A") == [
+        {"username": "F", "mutual_count": 2},
+        {"username": "C", "mutual_count": 1},
+    ]
+    assert await recommender.mutual_friend_count("A", "F") == 2
+    assert await recommender.list_mutual_friends("F", "A") == ["D", "E"]
+    results = await recommender.recommend_top_k("A", k=5)
+    assert [r["username"] for r in results] == ["F", "C"]
+
+@pytest.mark.asyncio
+async def test_inmemory_driver_rejects_unknown_queries():
+    driver = InMemoryAsyncDriver()
+    with pytest.raises(UnsupportedQueryError, match=r"MATCH \(n:Unknown\) RETURN n") as exc:
+        await driver.run_query("MATCH (n:Unknown)\n    RETURN n", {})
+    assert exc.value.query == "MATCH (n:Unknown) RETURN n"
+
+def test_latency_recorder_percentiles():
+    recorder = LatencyRecorder()
+    for ms in range(1, 101):
+        recorder.record(ms / 1000)
+
+    summary = recorder.summary()
+    assert summary["count"] == 100
+    assert summary["p50_ms"] == 50.0
+    assert summary["p99_ms"] == 99.0
+    assert summary["max_ms"] == 100.0
+    assert recorder.percentile(95) == pytest.approx(0.095)